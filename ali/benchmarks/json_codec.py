@@ -0,0 +1,87 @@
+"""Compare the JSON codec configurations on a set of submission files.
+
+Usage: python benchmarks/json_codec.py [--files 120]
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from alina.shared.codec import JsonCodec, orjson, zstd
+
+
+def build_submission(rng: random.Random) -> list[dict]:
+    submission = []
+    for persona_id in range(1, 101):
+        predicted_type = rng.choice(["jobs+trainings", "trainings_only", "awareness"])
+        entry: dict = {
+            "persona_id": f"persona_{persona_id:03d}",
+            "predicted_type": predicted_type,
+        }
+        if predicted_type == "jobs+trainings":
+            entry["jobs"] = [
+                {
+                    "job_id": f"j{rng.randint(1, 400):03d}",
+                    "suggested_trainings": [
+                        f"tr{rng.randint(1, 900):03d}" for _ in range(rng.randint(0, 5))
+                    ],
+                }
+                for _ in range(rng.randint(1, 5))
+            ]
+        elif predicted_type == "trainings_only":
+            entry["trainings"] = [
+                f"tr{rng.randint(1, 900):03d}" for _ in range(rng.randint(1, 10))
+            ]
+        else:
+            entry["predicted_items"] = rng.choice(["info", "too_young"])
+        submission.append(entry)
+    return submission
+
+
+def run(codec: JsonCodec, submissions: list[list[dict]], folder: Path) -> str:
+    folder.mkdir()
+    files = [
+        folder / f"submission_{i:03d}.json" for i in range(1, len(submissions) + 1)
+    ]
+
+    start = time.perf_counter()
+    for submission, file_path in zip(submissions, files):
+        codec.save(submission, file_path)
+    write_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for file_path in files:
+        codec.load(file_path)
+    read_time = time.perf_counter() - start
+
+    size = sum(codec.find_file(file_path).stat().st_size for file_path in files)
+    return f"write {write_time * 1000:8.1f} ms   read {read_time * 1000:8.1f} ms   size {size / 1024:8.0f} KiB"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=120)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    submissions = [build_submission(rng) for _ in range(args.files)]
+
+    configurations = [("json", False, "none"), ("json", True, "none")]
+    if orjson is not None:
+        configurations += [("orjson", False, "none"), ("orjson", True, "none")]
+    configurations += [("auto", True, "gzip")]
+    if zstd is not None:
+        configurations += [("auto", True, "zstd")]
+
+    print(f"{args.files} submission files (100 personas each)")
+    with tempfile.TemporaryDirectory() as temp_folder:
+        for i, (backend, compact, compression) in enumerate(configurations):
+            codec = JsonCodec(backend=backend, compact=compact, compression=compression)
+            label = f"{codec.backend:6} {'compact' if compact else 'indented':8} {compression:4}"
+            print(f"{label}   {run(codec, submissions, Path(temp_folder) / str(i))}")
+
+
+if __name__ == "__main__":
+    main()
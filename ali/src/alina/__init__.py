@@ -23,9 +23,12 @@ from .cli.interview_full import app as interview_full_app
 from .cli.interview_job import app as interview_job_app
 from .cli.interview_training import app as interview_training_app
 from .cli.merge import app as merge_app
+from .cli.pack_data import app as pack_data_app
 from .cli.presuggest import app as presuggest_app
 from .cli.rank import app as rank_app
+from .cli.rebuild_manifests import app as rebuild_manifests_app
 from .cli.status import app as status_app
+from .cli.store import app as store_app
 from .cli.submissions import app as submissions_app
 from .cli.submit import app as submit_app
 from .cli.suggest import app as suggest_app
@@ -45,9 +48,12 @@ app.add_typer(interview_full_app)
 app.add_typer(interview_job_app)
 app.add_typer(interview_training_app)
 app.add_typer(merge_app)
+app.add_typer(pack_data_app)
 app.add_typer(presuggest_app)
 app.add_typer(rank_app)
+app.add_typer(rebuild_manifests_app)
 app.add_typer(status_app)
+app.add_typer(store_app)
 app.add_typer(submissions_app)
 app.add_typer(submit_app)
 app.add_typer(suggest_app)
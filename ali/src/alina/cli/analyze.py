@@ -1,22 +1,36 @@
-import asyncio
+import hashlib
 import logging
 from functools import partial
 from pathlib import Path
 from typing import Any, Callable
 from typing import Coroutine as CoroutineType
-from typing import TypeVar
+from typing import Dict, Sequence, TypeVar
 
 import typer
 from asyncer import syncify
 from typing_extensions import Annotated, Optional
 
 from alina.services.analysis.ai.job import AIJobAnalyzer
+from alina.services.analysis.ai.suggest import (
+    describe_job_for_retrieval,
+    describe_training_for_retrieval,
+)
 from alina.services.analysis.ai.training import AITrainingAnalyzer
 from alina.services.analysis.mock.job import MockJobAnalyzer
 from alina.services.analysis.mock.training import MockTrainingAnalyzer
 from alina.services.utils.ai import AIProvider, get_ai_manager
-from alina.shared.database import save_job_analysis, save_training_analysis
-from alina.shared.workspace import Workspace
+from alina.services.utils.embedding import update_embeddings
+from alina.shared.config import Configuration
+from alina.shared.database import (
+    read_analysis_hashes,
+    read_jobs_analysis,
+    read_trainings_analysis,
+    save_analysis_hashes,
+    save_job_analysis,
+    save_training_analysis,
+)
+from alina.shared.executor import ItemResult, run_concurrently
+from alina.shared.workspace import get_workspace
 
 app = typer.Typer()
 
@@ -24,34 +38,100 @@ T = TypeVar("T")
 
 
 async def analyze_markdown_folder(
-    path: Path, analyze_function: Callable[[Path], CoroutineType[Any, Any, T]]
-) -> list[T]:
-    """Analyze all markdown files in the given folder."""
+    path: Path,
+    analyze_function: Callable[[Path], CoroutineType[Any, Any, T]],
+    files: Optional[list[Path]] = None,
+) -> list[ItemResult[Path, T]]:
+    """Analyze all markdown files in the given folder (or only the given files).
+
+    Returns the outcome of each file, in file order (a file whose analysis
+    failed does not stop the others).
+    """
     if not path.exists() or not path.is_dir():
         logging.error(f"The path {path} does not exist or is not a directory.")
         raise typer.Exit(code=1)
 
     logging.info(f"Analyzing Markdown files in {path}")
-    results = []
+    all_files = list(path.glob("*.md")) if files is None else files
+    logging.info(f"Found {len(all_files)} markdown files to analyze.")
 
-    async def record_result(p: Path):
-        result = await analyze_function(p)
-        results.append(result)
+    # Largest files first, they take the longest to analyze
+    return await run_concurrently(
+        all_files,
+        analyze_function,
+        Configuration().ALINA_LLM_CONCURRENCY,
+        size=lambda md_file: md_file.stat().st_size,
+        description="files",
+    )
+
+
+def _hash_file(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+async def analyze_markdown_folder_incrementally(
+    path: Path,
+    analyze_function: Callable[[Path], CoroutineType[Any, Any, T]],
+    kind: str,
+    version: str,
+    existing_results: Sequence[T],
+    force: bool = False,
+) -> Optional[tuple[list[T], Dict[str, Dict[str, str]]]]:
+    """Analyze the new or modified markdown files of a folder.
+
+    Files are identified by the hash of their content and the version of the
+    analyzer. Returns the existing results merged with the new ones (in file
+    order, without the results of deleted files) along with the hashes of the
+    files, or None when nothing changed since the last analysis. Files whose
+    analysis failed keep their previous result, and get no hash so that they
+    are analyzed again on the next run. With force, every file is analyzed
+    again without comparing hashes, failed files still keep their previous
+    result.
+    """
+    if not path.exists() or not path.is_dir():
+        logging.error(f"The path {path} does not exist or is not a directory.")
+        raise typer.Exit(code=1)
+
+    results_by_id: Dict[str, T] = {result.id: result for result in existing_results}
+    previous_hashes = {} if force else read_analysis_hashes(kind)
+    hashes: Dict[str, Dict[str, str]] = {}
+    files_to_analyze = []
+    for md_file in sorted(path.glob("*.md")):
+        file_hash = {"sha256": _hash_file(md_file), "version": version}
+        hashes[md_file.stem] = file_hash
+        if (
+            md_file.stem not in results_by_id
+            or previous_hashes.get(md_file.stem) != file_hash
+        ):
+            files_to_analyze.append(md_file)
+    deleted_ids = results_by_id.keys() - hashes.keys()
+    logging.info(
+        f"{len(files_to_analyze)} new or modified files out of {len(hashes)} in {path}"
+        f" ({len(deleted_ids)} deleted)"
+    )
+    if not files_to_analyze and not deleted_ids:
+        return None
+
+    file_ids = list(hashes)
+    for outcome in await analyze_markdown_folder(
+        path, analyze_function, files_to_analyze
+    ):
+        if outcome.succeeded:
+            results_by_id[outcome.result.id] = outcome.result
+        else:
+            # Analyze the file again on the next run
+            hashes.pop(outcome.item.stem)
+    results = [
+        results_by_id[item_id] for item_id in file_ids if item_id in results_by_id
+    ]
+    return results, hashes
 
-    all_files = list(path.glob("*.md"))
-    logging.info(f"Found {len(all_files)} markdown files to analyze.")
 
-    chunk_size = 10
-    for i in range(0, len(all_files), chunk_size):
-        chunk = all_files[i : i + chunk_size]
-        async with asyncio.TaskGroup() as tg:
-            for md_file in chunk:
-                tg.create_task(record_result(md_file))
-        logging.info(
-            f"Processed files {i + 1} to {min(i + chunk_size, len(all_files))}"
-        )
-        await asyncio.sleep(0.5)
-    return results
+def _read_existing(read_function: Callable[[], Sequence[T]]) -> Sequence[T]:
+    try:
+        return read_function()
+    except FileNotFoundError:
+        return []
 
 
 @app.command()
@@ -61,9 +141,10 @@ async def analyze(
     jobs_only: Annotated[bool, typer.Option("--jobs-only")] = False,
     trainings_only: Annotated[bool, typer.Option("--trainings-only")] = False,
     only_element: Annotated[str, typer.Option("--only")] = "",
+    force: Annotated[bool, typer.Option("--force")] = False,
 ):
-    """Analyze input data"""
-    path = Workspace().get_data_folder()
+    """Analyze input data (only the files that changed since the last run, unless --force is set)"""
+    path = get_workspace().get_data_folder()
     if not path.exists() or not path.is_dir():
         logging.error(f"The path {path} does not exist or is not a directory.")
         raise typer.Exit(code=1)
@@ -108,15 +189,38 @@ async def analyze(
         # Analyze all elements
         logging.info(f"Analyzing input data in {path}")
         if not trainings_only:
-            job_results = await analyze_markdown_folder(
+            job_analysis = await analyze_markdown_folder_incrementally(
                 path / "jobs",
                 lambda p: job_analyzer.analyze(p),
+                "jobs",
+                job_analyzer.version,
+                _read_existing(read_jobs_analysis),
+                force,
+            )
+            if job_analysis:
+                job_results, job_hashes = job_analysis
+                save_job_analysis(job_results)
+                save_analysis_hashes("jobs", job_hashes)
+            # Also computes the embeddings missing after a previous run without them
+            update_embeddings(
+                "jobs", _read_existing(read_jobs_analysis), describe_job_for_retrieval
             )
-            save_job_analysis(job_results)
 
         if not jobs_only:
-            training_results = await analyze_markdown_folder(
+            training_analysis = await analyze_markdown_folder_incrementally(
                 path / "trainings",
                 lambda p: training_analyzer.analyze(p),
+                "trainings",
+                training_analyzer.version,
+                _read_existing(read_trainings_analysis),
+                force,
+            )
+            if training_analysis:
+                training_results, training_hashes = training_analysis
+                save_training_analysis(training_results)
+                save_analysis_hashes("trainings", training_hashes)
+            update_embeddings(
+                "trainings",
+                _read_existing(read_trainings_analysis),
+                describe_training_for_retrieval,
             )
-            save_training_analysis(training_results)
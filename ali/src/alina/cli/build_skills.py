@@ -4,12 +4,14 @@ from strands import Agent
 from typing_extensions import Annotated, Optional
 
 from alina.models.referential import SkillReferential, TrainingReferential
+from alina.services.chat.ai.catalog import describe_skill_for_retrieval
 from alina.services.utils.ai import AIProvider, get_ai_manager
+from alina.services.utils.embedding import update_embeddings
 from alina.shared.database import read_trainings_analysis, save_skills
-from alina.shared.workspace import Workspace
+from alina.shared.workspace import get_workspace
 
 app = typer.Typer()
-workspace = Workspace()
+workspace = get_workspace()
 
 
 class SkillTaxonomy(BaseModel):
@@ -67,3 +69,4 @@ def build_skills(
             )
         )
     save_skills(skills)
+    update_embeddings("skills", skills, describe_skill_for_retrieval)
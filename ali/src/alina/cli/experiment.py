@@ -1,4 +1,3 @@
-import json
 import logging
 
 import typer
@@ -6,18 +5,16 @@ from pydantic import BaseModel, Field
 from strands.types.content import ContentBlock, Message
 
 from alina.services.utils import ai
-from alina.shared.workspace import Workspace
+from alina.shared.database import read_submission
 
 app = typer.Typer()
 
 
 @app.command()
 def experiment():
-    workspace = Workspace()
-
-    source_file = workspace.get_submission_file(108)
-    with open(source_file, "r", encoding="utf-8") as file:
-        suggestions = json.load(file)
+    suggestions = read_submission(108)
+    if suggestions is None:
+        raise FileNotFoundError("Submission #108 does not exist.")
 
     for suggestion in suggestions:
         persona_id_string = suggestion["persona_id"]
@@ -1,11 +1,9 @@
-import json
 import random
 
 import typer
 from typing_extensions import Annotated
 
-from alina.shared.database import save_suggestions
-from alina.shared.workspace import Workspace
+from alina.shared.database import read_submission, save_suggestions
 
 app = typer.Typer()
 
@@ -20,10 +18,9 @@ def fuzzy(
     seed: Annotated[str, typer.Option("--seed")],
 ):
     random.seed(seed)
-    workspace = Workspace()
-    submission_file = workspace.get_submission_file(submission_id)
-    with open(submission_file, "r", encoding="utf-8") as file:
-        suggestions = json.load(file)
+    suggestions = read_submission(submission_id)
+    if suggestions is None:
+        raise FileNotFoundError(f"Submission #{submission_id} does not exist.")
 
     for suggestion in suggestions:
         if suggestion["predicted_type"] == "trainings_only":
@@ -1,10 +1,7 @@
-import json
-
 import typer
 from typing_extensions import Annotated
 
-from alina.shared.database import save_suggestions
-from alina.shared.workspace import Workspace
+from alina.shared.database import read_submission, save_suggestions
 
 app = typer.Typer()
 
@@ -16,23 +13,19 @@ def merge(
 ):
     """Merge two submissions into one (one for jobs, one for trainings)."""
 
-    workspace = Workspace()
-    job_submission = workspace.get_submission_file(jobs_submission)
-    training_submission = workspace.get_submission_file(trainings_submission)
-    if not job_submission.exists():
-        print(f"Job submission file {job_submission} does not exist.")
+    job_data = read_submission(jobs_submission)
+    training_data = read_submission(trainings_submission)
+    if job_data is None:
+        print(f"Job submission #{jobs_submission} does not exist.")
         return
-    if not training_submission.exists():
-        print(f"Training submission file {training_submission} does not exist.")
+    if training_data is None:
+        print(f"Training submission #{trainings_submission} does not exist.")
         return
-    with open(job_submission, "r", encoding="utf-8") as f:
-        job_data = json.load(f)
 
     training_dict = {}
-    with open(training_submission, "r", encoding="utf-8") as f:
-        for entry in json.load(f):
-            persona_id = entry["persona_id"]
-            training_dict[persona_id] = entry
+    for entry in training_data:
+        persona_id = entry["persona_id"]
+        training_dict[persona_id] = entry
 
     merged_results = []
     for job_entry in job_data:
@@ -0,0 +1,26 @@
+import logging
+from pathlib import Path
+
+import typer
+from typing_extensions import Annotated, Optional
+
+from alina.shared.corpus import pack_markdown_folder
+from alina.shared.workspace import get_workspace
+
+app = typer.Typer()
+
+
+@app.command()
+def pack_data(
+    path: Optional[Annotated[Path, typer.Option("--path")]] = None,
+):
+    """Pack the training markdown files into a single indexed file."""
+    workspace = get_workspace()
+    if path is None:
+        path = workspace.get_data_folder()
+    # Only suggest-training reads the markdown files again after analyze
+    folder = path / "trainings"
+    if not folder.is_dir():
+        logging.error(f"The path {folder} does not exist or is not a directory.")
+        raise typer.Exit(code=1)
+    pack_markdown_folder(folder, workspace.get_data_pack_file("trainings"))
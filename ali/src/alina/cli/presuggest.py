@@ -1,21 +1,26 @@
-import asyncio
-import logging
 from functools import partial
+from pathlib import Path
 
 import typer
 from asyncer import syncify
 from typing_extensions import Annotated, Optional
 
+from alina.models.referential import PersonaReferential
 from alina.services.analysis.ai.persona import AIPersonaAnalyzer
 from alina.services.analysis.mock.persona import MockPersonaAnalyzer
 from alina.services.utils.ai import AIProvider
 from alina.services.utils.persona_range import PersonaRange, parse_persona_range
+from alina.shared.config import Configuration
 from alina.shared.database import (
+    clear_in_progress_personas_analysis,
+    read_in_progress_personas_analysis,
     read_manual_intents,
     read_personas_analysis,
+    save_in_progress_persona_analysis,
     save_personas_analysis,
 )
-from alina.shared.workspace import Workspace
+from alina.shared.executor import run_concurrently
+from alina.shared.workspace import get_workspace
 
 app = typer.Typer()
 
@@ -30,41 +35,66 @@ async def presuggest(
 ):
     """Preprocess suggestions for each persona."""
 
-    workspace = Workspace()
+    workspace = get_workspace()
     personas_to_process = persona_range.range()
-    chunk_size = 5
     results = read_personas_analysis()
     if results is None:
         results = []
     manual_intents = read_manual_intents()
 
-    async def record_result(pid: int):
-        if ai:
-            analyzer = AIPersonaAnalyzer(ai)
-        else:
-            analyzer = MockPersonaAnalyzer()
-        pid_string = f"persona_{pid:03d}"
-        manual_intent = manual_intents.get(pid_string)
+    def merge_result(result: PersonaReferential):
+        for i, existing_result in enumerate(results):
+            if existing_result.id == result.id:
+                results[i] = result
+                return
+        results.append(result)
+
+    # Resume an interrupted run from its checkpoint log
+    in_progress_results = read_in_progress_personas_analysis()
+    for result in in_progress_results.values():
+        merge_result(result)
+
+    def get_interview_files(pid: int) -> list[Path]:
         files = []
         files.append(workspace.get_interview_file(pid))
         if workspace.get_interview_job_file(pid).exists():
             files.append(workspace.get_interview_job_file(pid))
         if workspace.get_interview_training_file(pid).exists():
             files.append(workspace.get_interview_training_file(pid))
-        result = await analyzer.analyze(pid_string, files, manual_intent)
-        for i, existing_result in enumerate(results):
-            if existing_result.id == pid_string:
-                results[i] = result
-                return
-        results.append(result)
+        return files
 
-    for i in range(0, len(personas_to_process), chunk_size):
-        chunk = personas_to_process[i : i + chunk_size]
-        async with asyncio.TaskGroup() as tg:
-            for persona_id in chunk:
-                tg.create_task(record_result(persona_id))
-        logging.info(
-            f"Processed files {i + 1} to {min(i + chunk_size, len(personas_to_process))}"
+    def get_interviews_size(pid: int) -> int:
+        return sum(
+            file.stat().st_size for file in get_interview_files(pid) if file.exists()
         )
-        save_personas_analysis(results)
-        await asyncio.sleep(0.5)
+
+    async def record_result(pid: int) -> PersonaReferential:
+        if ai:
+            analyzer = AIPersonaAnalyzer(ai)
+        else:
+            analyzer = MockPersonaAnalyzer()
+        pid_string = f"persona_{pid:03d}"
+        manual_intent = manual_intents.get(pid_string)
+        files = get_interview_files(pid)
+        result = await analyzer.analyze(pid_string, files, manual_intent)
+        save_in_progress_persona_analysis(result)
+        return result
+
+    # Personas with the longest interviews first, they take the longest to analyze
+    outcomes = await run_concurrently(
+        [
+            pid
+            for pid in personas_to_process
+            if f"persona_{pid:03d}" not in in_progress_results
+        ],
+        record_result,
+        Configuration().ALINA_LLM_CONCURRENCY,
+        size=get_interviews_size,
+        description="personas",
+    )
+    for outcome in outcomes:
+        if outcome.succeeded:
+            merge_result(outcome.result)
+
+    save_personas_analysis(results)
+    clear_in_progress_personas_analysis()
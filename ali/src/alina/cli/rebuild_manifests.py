@@ -0,0 +1,11 @@
+import typer
+
+from alina.shared.database import rebuild_workspace_manifests
+
+app = typer.Typer()
+
+
+@app.command()
+def rebuild_manifests():
+    """Rebuild the manifests of the suggestion and submission folders."""
+    rebuild_workspace_manifests()
@@ -0,0 +1,31 @@
+import logging
+
+import typer
+
+from alina.shared.database import (
+    export_store_to_json_files,
+    get_workspace_store,
+    import_json_files_to_store,
+)
+
+app = typer.Typer()
+
+
+def _check_store_enabled():
+    if not get_workspace_store():
+        logging.error("The SQLite store is not enabled (set ALINA_STORE=sqlite).")
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def store_import():
+    """Load the workspace JSON files into the SQLite store."""
+    _check_store_enabled()
+    import_json_files_to_store()
+
+
+@app.command()
+def store_export():
+    """Write the content of the SQLite store to the workspace JSON files."""
+    _check_store_enabled()
+    export_store_to_json_files()
@@ -1,4 +1,3 @@
-import json
 import logging
 from datetime import datetime
 from pathlib import Path
@@ -10,21 +9,27 @@ from rich import print
 
 from alina.models.suggestion import PredictionType
 from alina.services.utils.submission import SubmissionHistoryEntry, get_submissions
-from alina.shared.workspace import Workspace
+from alina.shared.database import (
+    get_submission_indexes,
+    read_submission,
+    read_submissions_history,
+    save_submissions_history,
+)
 
 app = typer.Typer()
 
 
-def read_submission_file(submission_file: Path):
-    with open(submission_file) as f:
-        submission_data = json.load(f)
+def read_submission_file(submission_index: int):
+    submission_data = read_submission(submission_index)
+    if submission_data is None:
+        raise FileNotFoundError(f"Submission #{submission_index} does not exist.")
     return submission_data
 
 
-def build_matrix(files: list[Path]):
+def build_matrix(submission_indexes: list[int]):
     matrix = []
-    for submission_file in files:
-        submission_data = read_submission_file(submission_file)
+    for submission_index in submission_indexes:
+        submission_data = read_submission_file(submission_index)
         submission_data_entries: Dict[int, Dict] = {}
         for entry in submission_data:
             submission_data_entries[
@@ -56,16 +61,12 @@ def build_matrix(files: list[Path]):
     return matrix
 
 
-def read_or_get_submissions(folder: Path) -> Sequence[SubmissionHistoryEntry]:
-    expected_submissions = len(list(folder.glob("submission_*.json")))
-    submissions_file = Workspace().get_submissions_file()
-    if submissions_file.exists():
-        with open(submissions_file) as f:
-            submissions_json = json.load(f)
-            current_submissions_in_cache = len(submissions_json)
-            submissions = [
-                SubmissionHistoryEntry(**entry) for entry in submissions_json
-            ]
+def read_or_get_submissions() -> Sequence[SubmissionHistoryEntry]:
+    expected_submissions = len(get_submission_indexes())
+    submissions_json = read_submissions_history()
+    if submissions_json is not None:
+        current_submissions_in_cache = len(submissions_json)
+        submissions = [SubmissionHistoryEntry(**entry) for entry in submissions_json]
     else:
         current_submissions_in_cache = 0
         submissions = []
@@ -74,13 +75,7 @@ def read_or_get_submissions(folder: Path) -> Sequence[SubmissionHistoryEntry]:
         logging.info(f"Difference in submissions count, reloading...")
         submissions = get_submissions()
         # Write the cache
-        with open(submissions_file, "w") as f:
-            json.dump(
-                [entry for entry in submissions],
-                f,
-                indent=4,
-                default=lambda x: getattr(x, "__dict__", str(x)),
-            )
+        save_submissions_history(submissions)
     else:
         logging.info(f"Loading submissions from cache...")
 
@@ -90,7 +85,7 @@ def read_or_get_submissions(folder: Path) -> Sequence[SubmissionHistoryEntry]:
 def generate_intent_worksheet(
     workbook: xlsxwriter.Workbook,
     first_id: int,
-    submissions_files: list[Path],
+    submission_indexes: list[int],
     scored_submissions_by_date: Sequence[SubmissionHistoryEntry],
 ):
     center_bold_format = workbook.add_format({"align": "center", "bold": True})
@@ -106,7 +101,7 @@ def generate_intent_worksheet(
 
     for persona_id in range(1, 101):
         worksheet.write(persona_id + 1, 0, f"P{persona_id:03d}", center_bold_format)
-    matrix = build_matrix(submissions_files)
+    matrix = build_matrix(submission_indexes)
     for sub_index, submission_dict in enumerate(matrix):
         worksheet.write(
             0,
@@ -165,7 +160,7 @@ def generate_intent_worksheet(
 
 def generate_trainings_worksheet(
     workbook: xlsxwriter.Workbook,
-    submissions_file: Path,
+    submission_index: int,
 ):
     center_bold_format = workbook.add_format({"align": "center", "bold": True})
     center_format = workbook.add_format(
@@ -175,7 +170,7 @@ def generate_trainings_worksheet(
     )
     worksheet = workbook.add_worksheet("Trainings Only")
 
-    submission_data = read_submission_file(submissions_file)
+    submission_data = read_submission_file(submission_index)
     row = 0
     for submission_entry in submission_data:
         if submission_entry.get("predicted_type", "") != PredictionType.TRAININGS_ONLY:
@@ -194,7 +189,7 @@ def generate_trainings_worksheet(
 
 def generate_job_trainings_worksheet(
     workbook: xlsxwriter.Workbook,
-    submissions_file: Path,
+    submission_index: int,
 ):
     center_bold_format = workbook.add_format({"align": "center", "bold": True})
     center_format = workbook.add_format(
@@ -204,7 +199,7 @@ def generate_job_trainings_worksheet(
     )
     worksheet = workbook.add_worksheet("Jobs + Trainings")
 
-    submission_data = read_submission_file(submissions_file)
+    submission_data = read_submission_file(submission_index)
     row = 0
     for submission_entry in submission_data:
         if (
@@ -245,10 +240,7 @@ def submissions(
 ):
     """Generate an Excel file of all submissions"""
 
-    workspace = Workspace()
-    submissions_folder = workspace.get_submissions_folder()
-
-    scored_submissions = read_or_get_submissions(submissions_folder)
+    scored_submissions = read_or_get_submissions()
     scored_submissions_by_date = sorted(
         scored_submissions, key=lambda entry: entry.date
     )
@@ -262,32 +254,28 @@ def submissions(
 
     workbook = xlsxwriter.Workbook(output_xls_file)
 
-    all_submissions_files = sorted(
-        list(submissions_folder.glob("submission_*.json")), key=lambda p: p.name
-    )
+    all_submission_indexes = get_submission_indexes()
     if tail is not None:
-        submissions_files = all_submissions_files[-tail:]
+        submission_indexes = all_submission_indexes[-tail:]
         scored_submissions_by_date = scored_submissions_by_date[-tail:]
     else:
-        submissions_files = all_submissions_files
+        submission_indexes = all_submission_indexes
 
     generate_intent_worksheet(
         workbook,
-        first_id=(len(all_submissions_files) - tail if tail is not None else 0),
-        submissions_files=submissions_files,
+        first_id=(len(all_submission_indexes) - tail if tail is not None else 0),
+        submission_indexes=submission_indexes,
         scored_submissions_by_date=scored_submissions_by_date,
     )
 
     if inspect:
-        inspected_submission_file = (
-            workspace.get_submissions_folder() / f"submission_{inspect:03d}.json"
-        )
+        inspected_submission_index = inspect
     else:
-        inspected_submission_file = submissions_files[-1]
-    generate_trainings_worksheet(workbook, submissions_file=inspected_submission_file)
+        inspected_submission_index = submission_indexes[-1]
+    generate_trainings_worksheet(workbook, submission_index=inspected_submission_index)
 
     generate_job_trainings_worksheet(
-        workbook, submissions_file=inspected_submission_file
+        workbook, submission_index=inspected_submission_index
     )
 
     workbook.close()
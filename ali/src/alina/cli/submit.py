@@ -3,10 +3,10 @@ from rich import print
 
 from alina.services.utils.submission import make_submission, validate_submission_format
 from alina.shared.database import read_last_suggestions, save_submission
-from alina.shared.workspace import Workspace
+from alina.shared.workspace import get_workspace
 
 app = typer.Typer()
-workspace = Workspace()
+workspace = get_workspace()
 
 
 @app.command()
@@ -1,8 +1,12 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import typer
 from typing_extensions import Annotated, Optional
 
 from alina.models.referential import UserIntent
 from alina.models.suggestion import (
+    BaseSuggestionResult,
     JobsAndTrainingsSuggestionResult,
     JobSuggestionResult,
     TrainingsOnlySuggestionResult,
@@ -14,17 +18,18 @@ from alina.services.utils.ai import AIProvider
 from alina.services.utils.persona_range import PersonaRange, parse_persona_range
 from alina.shared.database import (
     clear_in_progress_suggestions,
+    get_persona,
+    get_referential_stamp,
     read_in_progress_suggestions,
     read_jobs_analysis,
-    read_persona_analysis,
     read_trainings_analysis,
     save_in_progress_suggestions,
     save_suggestions,
 )
-from alina.shared.workspace import Workspace
+from alina.shared.workspace import get_workspace
 
 app = typer.Typer()
-workspace = Workspace()
+workspace = get_workspace()
 
 
 def compute_persona_recommendations(
@@ -43,7 +48,7 @@ def compute_persona_recommendations(
     with open(persona_interview_file, "r", encoding="utf-8") as f:
         interview_content = f.read()
 
-    persona_analysis = read_persona_analysis(persona_id_string)
+    persona_analysis = get_persona(persona_id_string)
     if not persona_analysis:
         raise ValueError(f"Persona analysis for {persona_id_string} not found.")
 
@@ -65,32 +70,50 @@ def suggest(
     ] = PersonaRange(),
     skip_jobs: Annotated[bool, typer.Option("--skip-jobs")] = False,
     skip_trainings: Annotated[bool, typer.Option("--skip-trainings")] = False,
+    workers: Annotated[int, typer.Option("--workers", min=1)] = 1,
 ):
     """Suggest job/training matches for each persona."""
 
+    # Stamps taken first: if a referential changes meanwhile, its index is
+    # only built again
+    jobs_stamp = get_referential_stamp("jobs")
+    trainings_stamp = get_referential_stamp("trainings")
     jobs = read_jobs_analysis()
     trainings = read_trainings_analysis()
 
-    in_progress_folder = workspace.get_in_progress_suggestion_folder()
-    if not in_progress_folder.exists():
-        in_progress_folder.mkdir(parents=True, exist_ok=True)
-
-    if ai:
-        suggestion_analyzer = AISuggestionAnalyzer(jobs, trainings, ai)
-    else:
-        suggestion_analyzer = MockSuggestionAnalyzer(jobs, trainings)
-
-    results = []
-    for persona_id in persona_range.range():
-        persona_suggestions_from_file = read_in_progress_suggestions(persona_id)
-        if persona_suggestions_from_file:
-            results.append(persona_suggestions_from_file)
-            continue
+    def build_analyzer() -> BaseSuggestionAnalyzer:
+        if ai:
+            return AISuggestionAnalyzer(
+                jobs,
+                trainings,
+                ai,
+                jobs_stamp=jobs_stamp,
+                trainings_stamp=trainings_stamp,
+            )
+        return MockSuggestionAnalyzer(jobs, trainings)
+
+    # Each worker thread has its own analyzer (and so its own agent), the LLM
+    # limiter is shared by all of them
+    worker_state = threading.local()
+
+    def get_persona_suggestions(persona_id: int) -> BaseSuggestionResult:
+        persona_suggestions_from_log = in_progress_suggestions.get(
+            f"persona_{persona_id:03d}"
+        )
+        if persona_suggestions_from_log:
+            return persona_suggestions_from_log
+        if not hasattr(worker_state, "analyzer"):
+            worker_state.analyzer = build_analyzer()
         persona_suggestions = compute_persona_recommendations(
-            suggestion_analyzer, persona_id, skip_jobs, skip_trainings
+            worker_state.analyzer, persona_id, skip_jobs, skip_trainings
         )
-        save_in_progress_suggestions(persona_id, persona_suggestions)
-        results.append(persona_suggestions)
+        save_in_progress_suggestions(persona_suggestions)
+        return persona_suggestions
+
+    in_progress_suggestions = read_in_progress_suggestions()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Results are collected in persona order, whatever the order of completion
+        results = list(executor.map(get_persona_suggestions, persona_range.range()))
 
     if persona_range.full_range:
         save_suggestions(results)
@@ -1,4 +1,3 @@
-import json
 import logging
 from pathlib import Path
 
@@ -20,18 +19,30 @@ from alina.models.suggestion import (
     PredictedItems,
     TrainingsOnlySuggestionResult,
 )
+from alina.services.analysis.ai.suggest import describe_training_for_retrieval
 from alina.services.utils.ai import AIProvider, get_ai_manager
 from alina.services.utils.persona_range import PersonaRange
+from alina.services.utils.retrieval import get_candidate_index
+from alina.shared.config import Configuration
+from alina.shared.corpus import MarkdownCorpus, get_markdown_corpus
 from alina.shared.database import (
+    clear_in_progress_training_suggestions,
+    get_persona,
+    get_referential_stamp,
+    get_skill,
+    read_in_progress_training_suggestions,
     read_manual_intents,
-    read_persona_analysis,
     read_skills,
+    read_training_suggestions,
+    read_trainings_analysis,
+    save_in_progress_training_suggestion,
     save_suggestions,
+    save_training_suggestions,
 )
-from alina.shared.workspace import Workspace
+from alina.shared.workspace import get_workspace
 
 app = typer.Typer()
-workspace = Workspace()
+workspace = get_workspace()
 
 
 def get_interviews_content(persona_id: int) -> tuple[Optional[str], Optional[str]]:
@@ -128,18 +139,16 @@ def get_relevant_trainings(
     ai: AIProvider,
     training_ids: list[str],
     summary_of_interviews: str,
-    trainings_path: Path,
+    trainings: MarkdownCorpus,
     expected_count: int,
 ) -> list[int]:
     ai_manager = get_ai_manager(ai)
 
     trainings_prompt = ""
     for tid in training_ids:
-        training_file = trainings_path / f"{tid}.md"
-        if training_file.exists():
+        training_content = trainings.get(tid)
+        if training_content is not None:
             trainings_prompt += f"# TRAINING {tid[2:]}\n"
-            with open(training_file, "r", encoding="utf-8") as f:
-                training_content = f.read()
             trainings_prompt += training_content + "\n\n"
     if not trainings_prompt:
         return []
@@ -177,16 +186,16 @@ def resolve_training_conflict(
     training_ids: list[int],
     summary_of_interviews: str,
     ai: AIProvider,
-    trainings_path: Path,
+    trainings: MarkdownCorpus,
 ) -> int:
     ai_manager = get_ai_manager(ai)
 
     trainings_prompt = ""
     for tid in training_ids:
         trainings_prompt += f"# TRAINING id={tid}\n"
-        training_file = trainings_path / f"tr{tid}.md"
-        with open(training_file, "r", encoding="utf-8") as f:
-            training_content = f.read()
+        training_content = trainings.get(f"tr{tid}")
+        if training_content is None:
+            raise FileNotFoundError(f"Training tr{tid} not found in {trainings.folder}")
         trainings_prompt += training_content + "\n\n"
     agent = ai_manager.build_agent(
         system_prompt="""
@@ -220,18 +229,44 @@ def resolve_training_conflict(
     return agent_response.training_id
 
 
+def get_candidate_trainings(
+    training_ids: list[str], interview_summary: str, count: int
+) -> list[str]:
+    """Keep the count trainings that best match the interview summary (BM25, and embeddings when enabled)."""
+    stamp = get_referential_stamp("trainings")
+    trainings = read_trainings_analysis()
+    index = get_candidate_index(
+        "trainings", trainings, describe_training_for_retrieval, "trainings", stamp
+    )
+    trainings_by_id = {training.id: training for training in trainings}
+    candidates = [
+        trainings_by_id[training_id]
+        for training_id in dict.fromkeys(training_ids)
+        if training_id in trainings_by_id
+    ]
+    selected = {
+        training.id for training in index.top(interview_summary, count, candidates)
+    }
+    # Trainings missing from the referential cannot be ranked, they are kept
+    return [
+        training_id
+        for training_id in dict.fromkeys(training_ids)
+        if training_id in selected or training_id not in trainings_by_id
+    ]
+
+
 def _get_chunked_relevant_trainings(
     chunk_size: int,
     training_ids: list[str],
     ai: AIProvider,
     interview_summary: str,
-    trainings_path: Path,
+    trainings: MarkdownCorpus,
 ) -> list[int]:
     raw_trainings = []
     for i in range(0, len(training_ids), chunk_size):
         chunk = training_ids[i : i + chunk_size]
         chunk_raw_trainings = get_relevant_trainings(
-            ai, chunk, interview_summary, trainings_path, chunk_size // 2
+            ai, chunk, interview_summary, trainings, chunk_size // 2
         )
         raw_trainings.extend(chunk_raw_trainings)
     return raw_trainings
@@ -245,17 +280,15 @@ def suggest_training(
     """Suggest trainings for each person"""
 
     skills = read_skills()
-    trainings_path = path / "trainings"
+    trainings = get_markdown_corpus(
+        path / "trainings", get_workspace().get_data_pack_file("trainings")
+    )
 
-    training_suggestions_file = Workspace().get_training_suggestions_file()
-    if not training_suggestions_file.exists():
-        training_suggestions = {}
-    else:
-        with open(training_suggestions_file, "r", encoding="utf-8") as f:
-            training_suggestions = json.load(f)
+    training_suggestions = read_training_suggestions()
+    # Resume an interrupted run from its checkpoint log
+    training_suggestions.update(read_in_progress_training_suggestions())
 
     manual_intents = read_manual_intents()
-    workspace = Workspace()
     for persona_id_string, manual_user_intent in manual_intents.items():
         if manual_user_intent != ManualUserIntent.TRAININGS_ONLY:
             continue
@@ -312,13 +345,20 @@ def suggest_training(
                 for training_id in skill.trainings
             ]
 
+            # Only the best matches enter the tournament, fewer rounds are needed
+            candidates = Configuration().ALINA_SUGGEST_CANDIDATES
+            if candidates and len(training_ids) > candidates:
+                training_ids = get_candidate_trainings(
+                    training_ids, interview_summary, candidates
+                )
+
             chunk_size = 12
             raw_trainings = _get_chunked_relevant_trainings(
                 chunk_size=chunk_size,
                 training_ids=training_ids,
                 ai=ai,
                 interview_summary=interview_summary,
-                trainings_path=trainings_path,
+                trainings=trainings,
             )
             while len(raw_trainings) > chunk_size // 2:
                 raw_trainings = _get_chunked_relevant_trainings(
@@ -326,7 +366,7 @@ def suggest_training(
                     training_ids=[f"tr{tid}" for tid in raw_trainings],
                     ai=ai,
                     interview_summary=interview_summary,
-                    trainings_path=trainings_path,
+                    trainings=trainings,
                 )
             raw_trainings = sorted(set(raw_trainings))
             existing_training_suggestion["raw_trainings"] = raw_trainings
@@ -338,7 +378,7 @@ def suggest_training(
             # Looking for conflicts
             resolved_trainings = []
             for skill in relevant_skill_ids:
-                skill_object = next((s for s in skills if s.id == skill), None)
+                skill_object = get_skill(skill)
                 if not skill_object or not skill_object.trainings:
                     continue
                 trainings_of_skill = [int(tid[2:]) for tid in skill_object.trainings]
@@ -352,7 +392,7 @@ def suggest_training(
                         selected_trainings_of_skill,
                         interview_summary,
                         ai,
-                        trainings_path,
+                        trainings,
                     )
                     resolved_trainings.append(resolved_training_id)
                 else:
@@ -364,7 +404,7 @@ def suggest_training(
                     ai,
                     [f"tr{tid}" for tid in resolved_trainings],
                     interview_summary,
-                    trainings_path,
+                    trainings,
                     max_trainings_in_output,
                 )
             resolved_trainings = sorted(set(resolved_trainings))
@@ -372,15 +412,19 @@ def suggest_training(
 
         training_suggestions[persona_id_string] = existing_training_suggestion
 
-        # Write the file again (after each persona) to avoid losing progress
-        with open(training_suggestions_file, "w", encoding="utf-8") as f:
-            json.dump(training_suggestions, f, indent=4)
+        # Record progress (after each persona) to avoid losing it
+        save_in_progress_training_suggestion(
+            persona_id_string, existing_training_suggestion
+        )
+
+    save_training_suggestions(training_suggestions)
+    clear_in_progress_training_suggestions()
 
     # Finally, generate the next suggestion based on that
     results = []
     for persona_id in PersonaRange().range():
         persona_id_string = f"persona_{persona_id:03d}"
-        persona_analysis = read_persona_analysis(persona_id_string)
+        persona_analysis = get_persona(persona_id_string)
         if not persona_analysis:
             raise ValueError(f"Persona analysis for {persona_id_string} not found.")
 
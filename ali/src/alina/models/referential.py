@@ -59,6 +59,19 @@ SKILL_LEVELS = {
 
 
 class TrainingReferential:
+    __slots__ = (
+        "id",
+        "city",
+        "online",
+        "locale",
+        "duration_weeks",
+        "certification",
+        "domain",
+        "skills_description",
+        "level_change",
+        "target_job",
+    )
+
     id: str
     city: Optional[str]
     online: bool
@@ -94,8 +107,24 @@ class TrainingReferential:
         self.target_job = target_job
         self.city = city
 
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "online": self.online,
+            "locale": self.locale,
+            "duration_weeks": self.duration_weeks,
+            "certification": self.certification,
+            "domain": self.domain,
+            "skills_description": self.skills_description,
+            "level_change": self.level_change,
+            "target_job": self.target_job,
+            "city": self.city,
+        }
+
 
 class JobSkillRequirementLevel:
+    __slots__ = ("skill", "level", "required")
+
     skill: str
     level: int
     required: bool
@@ -105,8 +134,27 @@ class JobSkillRequirementLevel:
         self.level = level
         self.required = required
 
+    def to_dict(self) -> dict:
+        return {
+            "skill": self.skill,
+            "level": self.level,
+            "required": self.required,
+        }
+
 
 class JobReferential:
+    __slots__ = (
+        "id",
+        "city",
+        "remote",
+        "domain",
+        "education_level",
+        "languages",
+        "experience",
+        "description",
+        "skills",
+    )
+
     id: str
     city: Optional[str]
     remote: bool
@@ -139,6 +187,19 @@ class JobReferential:
         self.description = description
         self.city = city
 
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "remote": self.remote,
+            "domain": self.domain,
+            "education_level": self.education_level,
+            "languages": self.languages,
+            "experience": self.experience,
+            "skills": [skill.to_dict() for skill in self.skills],
+            "description": self.description,
+            "city": self.city,
+        }
+
 
 class UserIntent(str, Enum):
     AWARENESS = "awareness"
@@ -154,6 +215,22 @@ class ManualUserIntent(str, Enum):
 
 
 class PersonaReferential:
+    __slots__ = (
+        "id",
+        "age",
+        "city",
+        "intent",
+        "willing_to_relocate",
+        "education_level",
+        "domain",
+        "job_experience",
+        "job_description",
+        "training_description",
+        "current_skills",
+        "growth_skills",
+        "new_skills",
+    )
+
     id: str
     age: int
     city: Optional[str]
@@ -198,8 +275,27 @@ class PersonaReferential:
         self.growth_skills = growth_skills
         self.new_skills = new_skills
 
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "age": self.age,
+            "city": self.city,
+            "intent": self.intent,
+            "willing_to_relocate": self.willing_to_relocate,
+            "education_level": self.education_level,
+            "domain": self.domain,
+            "job_experience": self.job_experience,
+            "job_description": self.job_description,
+            "training_description": self.training_description,
+            "current_skills": self.current_skills,
+            "growth_skills": self.growth_skills,
+            "new_skills": self.new_skills,
+        }
+
 
 class SkillReferential:
+    __slots__ = ("id", "name", "jobs", "trainings")
+
     id: int
     name: str
     jobs: Optional[str]
@@ -216,3 +312,11 @@ class SkillReferential:
         self.name = name
         self.trainings = trainings
         self.jobs = jobs
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "trainings": self.trainings,
+            "jobs": self.jobs,
+        }
@@ -14,6 +14,8 @@ class PredictedItems(str):
 
 
 class BaseSuggestionResult(ABC):
+    __slots__ = ("persona_id", "predicted_type")
+
     persona_id: str
     predicted_type: str
 
@@ -29,6 +31,8 @@ class BaseSuggestionResult(ABC):
 
 
 class AwarenessSuggestionResult(BaseSuggestionResult):
+    __slots__ = ("predicted_items",)
+
     predicted_items: str
 
     def __init__(self, persona_id: str, predicted_items: str):
@@ -42,6 +46,8 @@ class AwarenessSuggestionResult(BaseSuggestionResult):
 
 
 class JobSuggestionResult:
+    __slots__ = ("job_id", "suggested_trainings")
+
     job_id: str
     suggested_trainings: list[str]
 
@@ -57,6 +63,8 @@ class JobSuggestionResult:
 
 
 class JobsAndTrainingsSuggestionResult(BaseSuggestionResult):
+    __slots__ = ("jobs",)
+
     jobs: list[JobSuggestionResult]
 
     def __init__(self, persona_id: str, jobs: list[JobSuggestionResult] = []):
@@ -70,6 +78,8 @@ class JobsAndTrainingsSuggestionResult(BaseSuggestionResult):
 
 
 class TrainingsOnlySuggestionResult(BaseSuggestionResult):
+    __slots__ = ("trainings",)
+
     trainings: list[str]
 
     def __init__(self, persona_id: str, trainings: list[str] = []):
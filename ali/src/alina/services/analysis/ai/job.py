@@ -1,3 +1,4 @@
+import json
 from pathlib import Path
 from typing import Optional
 
@@ -11,7 +12,7 @@ from alina.models.referential import (
     JobReferential,
     JobSkillRequirementLevel,
 )
-from alina.services.utils.ai import AIManager
+from alina.services.utils.ai import AIManager, get_prompt_version
 from alina.shared.config import Configuration
 
 from ..base.job import BaseJobAnalyzer
@@ -107,6 +108,9 @@ class AIJobAnalyzer(BaseJobAnalyzer):
     def __init__(self, ai_manager: AIManager):
         super().__init__()
         self.agent = ai_manager.build_agent(JOB_ANALYSIS_SYSTEM_PROMPT)
+        self.version = get_prompt_version(
+            JOB_ANALYSIS_SYSTEM_PROMPT, json.dumps(JobInfo.model_json_schema())
+        )
 
     async def analyze(self, path: Path) -> JobReferential:
         with open(path, "r", encoding="utf-8") as file:
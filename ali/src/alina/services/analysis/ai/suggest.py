@@ -1,6 +1,7 @@
 from enum import Enum
-from typing import Optional, Sequence
+from typing import Any, Optional, Sequence
 
+import numpy as np
 from pydantic import BaseModel, Field
 from strands.types.content import ContentBlock, Message
 
@@ -22,10 +23,21 @@ from alina.models.suggestion import (
     TrainingsOnlySuggestionResult,
 )
 from alina.services.utils.ai import AIProvider, get_ai_manager
+from alina.services.utils.eligibility import JobEligibility
+from alina.services.utils.retrieval import get_candidate_index
+from alina.shared.config import Configuration
 
 from ..base.suggest import BaseSuggestionAnalyzer, BaseSuggestionResult
 
 
+def describe_job_for_retrieval(job: JobReferential) -> str:
+    return " ".join([job.description, *(skill.skill for skill in job.skills)])
+
+
+def describe_training_for_retrieval(training: TrainingReferential) -> str:
+    return f"{training.skills_description} {training.target_job}"
+
+
 def format_level_change(level: int) -> str:
     if level in SKILL_LEVELS and level + 1 in SKILL_LEVELS:
         return (
@@ -35,13 +47,45 @@ def format_level_change(level: int) -> str:
 
 
 class AISuggestionAnalyzer(BaseSuggestionAnalyzer):
+    """Suggestion analyzer asking the LLM to choose among the jobs and trainings.
+
+    Before each request, the candidates are narrowed down to the ones that
+    best match the persona (BM25 over the descriptions and skills), so the
+    LLM chooses among at most `candidates` jobs or trainings. The jobs a
+    persona is eligible for (city, education level, experience, domain) are
+    found on a columnar view of the job referential, compiled once per
+    analyzer.
+
+    With the stamps of the referentials (see get_referential_stamp), the
+    analyzers share the candidate indexes of the same referentials.
+    """
+
+    candidates: int
+
     def __init__(
         self,
         jobs: Sequence[JobReferential],
         trainings: Sequence[TrainingReferential],
         ai_provider: AIProvider,
+        candidates: Optional[int] = None,
+        jobs_stamp: Any = None,
+        trainings_stamp: Any = None,
     ):
         super().__init__(jobs, trainings)
+        if candidates is None:
+            candidates = Configuration().ALINA_SUGGEST_CANDIDATES
+        self.candidates = candidates
+        self._jobs_index = get_candidate_index(
+            "jobs", jobs, describe_job_for_retrieval, "jobs", jobs_stamp
+        )
+        self._job_eligibility = JobEligibility(jobs)
+        self._trainings_index = get_candidate_index(
+            "trainings",
+            trainings,
+            describe_training_for_retrieval,
+            "trainings",
+            trainings_stamp,
+        )
         ai_manager = get_ai_manager(ai_provider)
         self.agent = ai_manager.build_agent(
             system_prompt="""
@@ -64,6 +108,20 @@ class AISuggestionAnalyzer(BaseSuggestionAnalyzer):
         else:
             return self._recommend_jobs_and_trainings(persona)
 
+    def _top_jobs(
+        self, query: str, jobs: Sequence[JobReferential]
+    ) -> Sequence[JobReferential]:
+        if not self.candidates:
+            return jobs
+        return self._jobs_index.top(query, self.candidates, jobs)
+
+    def _top_trainings(
+        self, query: str, trainings: Sequence[TrainingReferential]
+    ) -> Sequence[TrainingReferential]:
+        if not self.candidates:
+            return trainings
+        return self._trainings_index.top(query, self.candidates, trainings)
+
     def _get_related_domains(self, domain: int | None) -> list[int]:
         if domain is None:
             return list(DOMAINS.keys())
@@ -110,43 +168,14 @@ class AISuggestionAnalyzer(BaseSuggestionAnalyzer):
     def _recommend_jobs_and_trainings(
         self, persona: PersonaReferential
     ) -> JobsAndTrainingsSuggestionResult:
-        if persona.city and not persona.willing_to_relocate:
-            filtered_jobs = [
-                job for job in self.jobs if job.city == persona.city or job.remote
-            ]
-        else:
-            filtered_jobs = self.jobs
-
-        print(len(filtered_jobs), "jobs after filtering by city")
-        if not filtered_jobs:
+        eligible = self._job_eligibility.mask(persona)
+        print(
+            f"{np.count_nonzero(eligible)} jobs after filtering by city, education level ({persona.education_level}), and experience"
+        )
+        if not eligible.any():
             return JobsAndTrainingsSuggestionResult(persona.id, [])
 
-        education_level = persona.education_level
-        if education_level:
-            filtered_jobs = [
-                job
-                for job in filtered_jobs
-                if job.education_level is None or job.education_level <= education_level
-            ]
-            print(
-                f"{len(filtered_jobs)} jobs after filtering by city and education level ({education_level})"
-            )
-            if not filtered_jobs:
-                return JobsAndTrainingsSuggestionResult(persona.id, [])
-
-        if persona.job_experience is not None:
-            filtered_jobs = [
-                job
-                for job in filtered_jobs
-                if job.experience is None or job.experience <= persona.job_experience
-            ]
-            print(
-                f"{len(filtered_jobs)} jobs after filtering by city, education level, and experience"
-            )
-            if not filtered_jobs:
-                return JobsAndTrainingsSuggestionResult(persona.id, [])
-
-        filtered_jobs = self._get_recommended_jobs(persona, filtered_jobs)
+        filtered_jobs = self._get_recommended_jobs(persona, eligible)
         job_suggestions = []
         for job in filtered_jobs:
             suggested_trainings = self._get_recommended_trainings_for_job(persona, job)
@@ -170,6 +199,16 @@ class AISuggestionAnalyzer(BaseSuggestionAnalyzer):
         ]
         if not filtered_trainings:
             return []
+        filtered_trainings = self._top_trainings(
+            " ".join(
+                [
+                    *(skill.skill for skill in job.skills if skill.required),
+                    persona.current_skills or "",
+                    persona.training_description or "",
+                ]
+            ),
+            filtered_trainings,
+        )
 
         class LearningsModel(BaseModel):
             recommended_learnings: list[str] = Field(
@@ -217,13 +256,20 @@ class AISuggestionAnalyzer(BaseSuggestionAnalyzer):
     def _get_recommended_jobs(
         self,
         persona: PersonaReferential,
-        jobs: Sequence[JobReferential],
+        eligible: np.ndarray,
     ) -> list[JobReferential]:
         related_domains = self._get_related_domains(persona.domain)
-        filtered_jobs = [job for job in jobs if job.domain in related_domains]
+        jobs = self._job_eligibility.select(eligible)
+        filtered_jobs = self._job_eligibility.select(
+            eligible & self._job_eligibility.domain_mask(related_domains)
+        )
         if not filtered_jobs:
             # Fallback to all jobs if none in related domains
             filtered_jobs = jobs
+        filtered_jobs = self._top_jobs(
+            f"{persona.job_description or ''} {persona.current_skills or ''}",
+            filtered_jobs,
+        )
 
         class JobsModel(BaseModel):
             recommended_jobs: list[str] = Field(
@@ -253,7 +299,8 @@ class AISuggestionAnalyzer(BaseSuggestionAnalyzer):
         jobs_result = self.agent.structured_output(
             output_model=JobsModel, prompt=jobs_prompt
         )
-        return [job for job in jobs if job.id in jobs_result.recommended_jobs]
+        recommended_jobs = set(jobs_result.recommended_jobs)
+        return [job for job in jobs if job.id in recommended_jobs]
 
     def _get_standalone_learnings(
         self,
@@ -261,6 +308,18 @@ class AISuggestionAnalyzer(BaseSuggestionAnalyzer):
         trainings: Sequence[TrainingReferential],
         different_domain: bool,
     ) -> list[str]:
+        trainings = self._top_trainings(
+            " ".join(
+                [
+                    persona.growth_skills or "",
+                    persona.new_skills or "",
+                    persona.current_skills or "",
+                    persona.training_description or "",
+                ]
+            ),
+            trainings,
+        )
+
         class LearningsModel(BaseModel):
             recommended_learnings: list[str] = Field(
                 [],
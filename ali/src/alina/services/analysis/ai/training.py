@@ -1,3 +1,4 @@
+import json
 from pathlib import Path
 from typing import Optional
 
@@ -5,7 +6,7 @@ from pydantic import BaseModel, Field
 from strands.agent import Agent
 
 from alina.models.referential import DOMAINS, SKILL_LEVELS, TrainingReferential
-from alina.services.utils.ai import AIManager
+from alina.services.utils.ai import AIManager, get_prompt_version
 from alina.shared.config import Configuration
 
 from ..base.training import BaseTrainingAnalyzer
@@ -79,6 +80,10 @@ class AITrainingAnalyzer(BaseTrainingAnalyzer):
     def __init__(self, ai_manager: AIManager):
         super().__init__()
         self.agent = ai_manager.build_agent(TRAINING_ANALYSIS_SYSTEM_PROMPT)
+        self.version = get_prompt_version(
+            TRAINING_ANALYSIS_SYSTEM_PROMPT,
+            json.dumps(TrainingInfo.model_json_schema()),
+        )
 
     async def analyze(self, path: Path) -> TrainingReferential:
         with open(path, "r", encoding="utf-8") as file:
@@ -9,6 +9,10 @@ class BaseJobAnalyzer(ABC):
     Abstract class for analyzing job data.
     """
 
+    # Identifies the analysis (prompts, output model): files analyzed with
+    # another version are analyzed again by incremental runs
+    version: str = "1"
+
     @abstractmethod
     async def analyze(self, path: Path) -> JobReferential:
         pass
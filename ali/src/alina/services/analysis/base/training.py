@@ -9,6 +9,10 @@ class BaseTrainingAnalyzer(ABC):
     Abstract class for analyzing training data.
     """
 
+    # Identifies the analysis (prompts, output model): files analyzed with
+    # another version are analyzed again by incremental runs
+    version: str = "1"
+
     @abstractmethod
     async def analyze(self, path: Path) -> TrainingReferential:
         pass
@@ -7,6 +7,8 @@ from ..base.job import BaseJobAnalyzer
 
 
 class MockJobAnalyzer(BaseJobAnalyzer):
+    version = "mock"
+
     async def analyze(self, path: Path) -> JobReferential:
         print(f"Mock analyzing job data at {path.stem}")
         await asyncio.sleep(0.1 + (len(path.name) % 5) * 0.1)
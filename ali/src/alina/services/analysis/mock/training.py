@@ -7,6 +7,8 @@ from ..base.training import BaseTrainingAnalyzer
 
 
 class MockTrainingAnalyzer(BaseTrainingAnalyzer):
+    version = "mock"
+
     async def analyze(self, path: Path) -> TrainingReferential:
         online = len(path.name) % 2 == 0
         await asyncio.sleep(0.1 + (len(path.name) % 5) * 0.1)
@@ -0,0 +1,117 @@
+from typing import Any, Callable, Optional, Sequence
+
+from alina.models.referential import JobReferential, SkillReferential
+from alina.services.analysis.ai.suggest import describe_job_for_retrieval
+from alina.services.utils.retrieval import get_candidate_index
+
+# A new selection replaces the current one when they share less than this part
+_SHIFT_THRESHOLD = 0.5
+
+
+def describe_skill_for_retrieval(skill: SkillReferential) -> str:
+    return f"{skill.name} (e.g. for jobs: {skill.jobs})"
+
+
+def _describe_job(job: JobReferential) -> str:
+    return job.description
+
+
+class _Selection:
+    def __init__(
+        self,
+        kind: str,
+        items: Sequence[Any],
+        describe: Callable[[Any], str],
+        limit: Optional[int],
+        embeddings: str,
+        stamp: Any,
+        describe_for_retrieval: Callable[[Any], str],
+    ):
+        self.items = items
+        self.describe = describe
+        self.limit = limit
+        self.positions: Optional[list[int]] = None
+        if limit is None or len(items) <= limit:
+            self.positions = list(range(len(items)))
+        else:
+            self.index = get_candidate_index(
+                kind, items, describe_for_retrieval, embeddings, stamp
+            )
+            # Positions are those of the index, built from the same referential
+            self.items = self.index.items
+
+    def select(self, query: str) -> bool:
+        if self.limit is None or len(self.items) <= self.limit:
+            return False
+        positions = self.index.search(query, self.limit)
+        if not positions:
+            return False
+        if self.positions:
+            shared = len(set(positions) & set(self.positions))
+            if shared >= _SHIFT_THRESHOLD * len(positions):
+                return False
+        # Listed in the order of the referential, so the prompt only changes with the selection
+        self.positions = sorted(positions)
+        return True
+
+    def describe_items(self) -> str:
+        if not self.positions:
+            return " (listed once the person has described their background)"
+        return "\n".join(
+            f" - {self.describe(self.items[position])}" for position in self.positions
+        )
+
+
+class InterviewCatalog:
+    """Skills and jobs of the referential listed in the system prompt of an interviewer.
+
+    Only the skills and jobs most relevant to the interview (the summary of a
+    previous interview, then the answers of the person) are listed. The
+    selection only changes when the interview shifts to other skills or jobs,
+    so the system prompt, and the prompt cache of the provider, stay the same
+    otherwise. A limit of None lists the whole catalog. With the stamps of
+    the referentials (see get_referential_stamp), the interviewers share the
+    indexes of the same referentials.
+    """
+
+    def __init__(
+        self,
+        skills: Sequence[SkillReferential],
+        jobs: Sequence[JobReferential],
+        skills_limit: Optional[int],
+        jobs_limit: Optional[int],
+        skills_stamp: Any = None,
+        jobs_stamp: Any = None,
+    ):
+        self._skills = _Selection(
+            "catalog-skills",
+            skills,
+            describe_skill_for_retrieval,
+            skills_limit,
+            "skills",
+            skills_stamp,
+            describe_skill_for_retrieval,
+        )
+        # Jobs are ranked on the description of their embeddings, and listed
+        # with their description only
+        self._jobs = _Selection(
+            "catalog-jobs",
+            jobs,
+            _describe_job,
+            jobs_limit,
+            "jobs",
+            jobs_stamp,
+            describe_job_for_retrieval,
+        )
+
+    def select(self, query: str) -> bool:
+        """Select the skills and jobs relevant to the query, return True if the selection changed."""
+        skills_changed = self._skills.select(query)
+        jobs_changed = self._jobs.select(query)
+        return skills_changed or jobs_changed
+
+    def describe_skills(self) -> str:
+        return self._skills.describe_items()
+
+    def describe_jobs(self) -> str:
+        return self._jobs.describe_items()
@@ -0,0 +1,79 @@
+from typing import TYPE_CHECKING, Any, Optional
+
+from pydantic import BaseModel
+from strands.agent.conversation_manager import ConversationManager
+from strands.types.content import ContentBlock, Message
+
+if TYPE_CHECKING:
+    from strands import Agent
+
+_DIGEST_HEADER = "Summary of the earlier messages of the interview:"
+
+
+class DigestConversationManager(ConversationManager):
+    """Keep the last turns of an interview verbatim, and a digest of the older ones.
+
+    A turn is the answer of the person and the next message of the assistant.
+    Older turns are replaced by a single message holding the digest: the
+    details collected so far (set by the interviewer after each turn). The
+    prompt sent on each turn then stays bounded, whatever the length of the
+    interview.
+    """
+
+    kept_turns: int
+    digest: Optional[BaseModel]
+
+    def __init__(self, kept_turns: int):
+        super().__init__()
+        self.kept_turns = kept_turns
+        self.digest = None
+
+    @staticmethod
+    def _is_digest(message: Message) -> bool:
+        content = message.get("content", [])
+        return bool(content) and content[0].get("text") == _DIGEST_HEADER
+
+    def _build_digest_message(self) -> Message:
+        assert self.digest is not None
+        return Message(
+            role="user",
+            content=[
+                ContentBlock(text=_DIGEST_HEADER),
+                ContentBlock(
+                    text=f"{self.removed_message_count} messages, with the information collected so far: "
+                    + self.digest.model_dump_json(exclude_none=True)
+                ),
+            ],
+        )
+
+    def count_messages(self, agent: "Agent") -> int:
+        """Return the number of messages of the conversation, including the removed ones."""
+        messages = agent.messages
+        has_digest = bool(messages) and self._is_digest(messages[0])
+        return len(messages) - has_digest + self.removed_message_count
+
+    def apply_management(self, agent: "Agent", **kwargs: Any) -> None:
+        messages = agent.messages
+        start = 1 if messages and self._is_digest(messages[0]) else 0
+        removed = max(0, len(messages) - start - 2 * self.kept_turns)
+        if not removed and (not start or self.digest is None):
+            return
+        self.removed_message_count += removed
+        if self.digest is not None:
+            digest_message = self._build_digest_message()
+        elif start:
+            # Restored history: keep its digest until a new one is set
+            digest_message = messages[0]
+        else:
+            # Nothing collected yet, the older turns are dropped
+            digest_message = None
+        kept_messages = messages[start + removed :]
+        agent.messages[:] = ([digest_message] if digest_message else []) + kept_messages
+
+    def reduce_context(
+        self, agent: "Agent", e: Optional[Exception] = None, **kwargs: Any
+    ) -> None:
+        if self.kept_turns <= 1:
+            raise e or RuntimeError("Unable to reduce the conversation any further")
+        self.kept_turns -= 1
+        self.apply_management(agent)
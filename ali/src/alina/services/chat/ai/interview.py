@@ -1,17 +1,54 @@
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Optional
+
+from pydantic import BaseModel
 from strands import Agent
 from strands.agent.conversation_manager import NullConversationManager
 from strands.types.content import ContentBlock, Message
 
-from alina.services.chat.base.interview import BaseInterviewer, InterviewDetails
+from alina.services.chat.ai.catalog import InterviewCatalog
+from alina.services.chat.ai.conversation import DigestConversationManager
+from alina.services.chat.base.interview import (
+    BaseInterviewer,
+    CompletionPolicy,
+    ExtractedDetails,
+    InterviewDetails,
+    NextMessage,
+)
 from alina.services.utils.ai import AIProvider, get_ai_manager
-from alina.shared.database import read_jobs_analysis, read_skills
+from alina.shared.config import Configuration
+from alina.shared.database import (
+    get_referential_stamp,
+    read_jobs_analysis,
+    read_skills,
+)
 
 
 class BaseAIInterviewer(BaseInterviewer):
+    """Interviewer asking its questions with an agent.
+
+    By default, each turn is a single request producing both the next question
+    and the details of the person. With background extraction, a smaller
+    request only writes the next question, while the details are extracted by
+    another agent in the background and merged once available: the next
+    question is not delayed by the extraction, but the details (and so the
+    completion of the interview) lag behind by about one turn.
+    """
+
     max_messages_per_person: int
     ai_provider: AIProvider
     max_messages_per_person: int
     system_prompt: str
+    welcome_agent: Agent
+    completion_policy: Optional[CompletionPolicy] = None
+    # Turns kept verbatim in the prompt, the older ones are replaced by the
+    # details collected so far (None keeps the whole history)
+    kept_turns: Optional[int] = 3
+    # Skills and jobs listed in the system prompt, the most relevant to the
+    # interview (None lists the whole catalogs)
+    catalog_skills: Optional[int] = 40
+    catalog_jobs: Optional[int] = 25
 
     def __init__(
         self,
@@ -21,21 +58,155 @@ class BaseAIInterviewer(BaseInterviewer):
         super().__init__()
         self.ai_provider = ai_provider
         self.max_messages_per_person = max_messages_per_person
+        self._details: Optional[InterviewDetails] = None
+        self._complete = False
+        self._background_extraction = (
+            Configuration().ALINA_INTERVIEW_EXTRACTION == "background"
+        )
+        self._extraction_agent: Optional[Agent] = None
+        self._extraction_executor: Optional[ThreadPoolExecutor] = None
+        self._extractions: list[Future] = []
+        self.catalog: Optional[InterviewCatalog] = None
+        self._catalog_query: list[str] = []
+
+    def is_complete(self) -> bool:
+        return self._complete
+
+    def get_messages(self) -> list[dict[str, Any]]:
+        return list(self.welcome_agent.messages)
+
+    def get_removed_message_count(self) -> int:
+        return self.welcome_agent.conversation_manager.removed_message_count
+
+    def restore_messages(
+        self, messages: list[dict[str, Any]], removed_message_count: int = 0
+    ) -> None:
+        self.welcome_agent.messages = messages
+        self.welcome_agent.conversation_manager.removed_message_count = (
+            removed_message_count
+        )
 
-    def _initialize_agent(self, system_prompt: str) -> Agent:
+    def _build_system_prompt(self) -> str:
+        # Interviewers listing a catalog build their prompt from the selection
+        return self.welcome_agent.system_prompt or ""
+
+    def _initialize_catalog(self, summary: str, with_jobs: bool):
+        # Stamps taken first: if a referential changes meanwhile, its index is
+        # only built again
+        skills_stamp = get_referential_stamp("skills")
+        jobs_stamp = get_referential_stamp("jobs") if with_jobs else None
+        self.catalog = InterviewCatalog(
+            read_skills(),
+            read_jobs_analysis() if with_jobs else [],
+            self.catalog_skills,
+            self.catalog_jobs,
+            skills_stamp,
+            jobs_stamp,
+        )
+        self._catalog_query = [summary]
+        self.catalog.select(summary)
+
+    def _refresh_catalog(self, agent: Agent, message: str):
+        if self.catalog is None:
+            return
+        self._catalog_query.append(message)
+        if self.catalog.select(" ".join(self._catalog_query)):
+            agent.system_prompt = self._build_system_prompt()
+
+    def _initialize_agent(self, system_prompt: str, digest: bool = True) -> Agent:
         ai_manager = get_ai_manager(self.ai_provider)
         agent = ai_manager.build_agent(system_prompt=system_prompt)
-        agent.conversation_manager = NullConversationManager()
+        if digest and self.kept_turns is not None:
+            agent.conversation_manager = DigestConversationManager(self.kept_turns)
+        else:
+            agent.conversation_manager = NullConversationManager()
         return agent
 
+    @staticmethod
+    def _count_messages(agent: Agent) -> int:
+        if isinstance(agent.conversation_manager, DigestConversationManager):
+            return agent.conversation_manager.count_messages(agent)
+        return len(agent.messages)
+
     def _start_conversation(self, agent: Agent) -> InterviewDetails:
-        interview_details = agent.structured_output(
-            output_model=InterviewDetails,
-            prompt="Your first message is the prompt, to give your name, greet the person and ask for their information.",
-        )
+        prompt = "Your first message is the prompt, to give your name, greet the person and ask for their information."
+        if self._background_extraction:
+            next_message = agent.structured_output(
+                output_model=NextMessage, prompt=prompt
+            )
+            interview_details = InterviewDetails(next_message=next_message.next_message)
+        else:
+            interview_details = agent.structured_output(
+                output_model=InterviewDetails,
+                prompt=prompt,
+            )
         self._append_assistant_message(agent, interview_details)
         return interview_details
 
+    def _update_details(self, interview_details: InterviewDetails):
+        if self.completion_policy:
+            self._complete = self.completion_policy.is_complete(
+                self._details, interview_details
+            )
+        self._details = interview_details
+        conversation_manager = self.welcome_agent.conversation_manager
+        if isinstance(conversation_manager, DigestConversationManager):
+            conversation_manager.digest = interview_details.model_copy(
+                update={"next_message": None}
+            )
+
+    def _extract_details(self, system_prompt: str, messages: list[Any]) -> BaseModel:
+        assert self._extraction_agent is not None
+        self._extraction_agent.system_prompt = system_prompt
+        self._extraction_agent.messages = messages
+        return self._extraction_agent.structured_output(
+            output_model=ExtractedDetails,
+            prompt="Extract the information the person has given so far.",
+        )
+
+    def _merge_extractions(self):
+        # Merge the extractions completed so far, in order, without waiting for the others
+        while self._extractions and self._extractions[0].done():
+            extraction = self._extractions.pop(0)
+            try:
+                extracted = extraction.result()
+            except Exception as e:
+                logging.warning(f"Failed to extract the interview details: {e}")
+                continue
+            details = self._details or InterviewDetails()
+            self._update_details(
+                details.model_copy(update=extracted.model_dump(exclude_none=True))
+            )
+
+    def close(self) -> None:
+        # The extractions of the last turns are merged, not dropped
+        if self._extraction_executor is None:
+            return
+        self._extraction_executor.shutdown(wait=True)
+        self._extraction_executor = None
+        self._merge_extractions()
+
+    def _reply_and_extract(self, agent: Agent, prompt: str) -> InterviewDetails:
+        if self._extraction_agent is None:
+            # The extraction agent is given the messages of each turn, as they are
+            self._extraction_agent = self._initialize_agent(
+                agent.system_prompt, digest=False
+            )
+        if self._extraction_executor is None:
+            self._extraction_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="extraction"
+            )
+        # The extraction reads the conversation up to the last answer of the person
+        self._extractions.append(
+            self._extraction_executor.submit(
+                self._extract_details, agent.system_prompt, list(agent.messages)
+            )
+        )
+        next_message = agent.structured_output(output_model=NextMessage, prompt=prompt)
+        self._merge_extractions()
+        details = self._details or InterviewDetails()
+        return details.model_copy(update={"next_message": next_message.next_message})
+
     def _append_assistant_message(
         self, agent: Agent, interview_details: InterviewDetails
     ):
@@ -52,36 +223,29 @@ class BaseAIInterviewer(BaseInterviewer):
 
     def _send_message(self, agent: Agent, message: str) -> InterviewDetails:
         self._append_user_message(agent, message)
+        self._refresh_catalog(agent, message)
         remaining_messages = max(
-            0, self.max_messages_per_person - len(agent.messages) // 2
+            0, self.max_messages_per_person - self._count_messages(agent) // 2
         )
+        agent.conversation_manager.apply_management(agent)
         if remaining_messages == 0:
             prompt = "You have reached the maximum number of messages allowed. Politely inform the person that the interview is complete and that you will send them the list of results (jobs and/or trainings)."
         else:
-            prompt = f"You have {remaining_messages} messages left to collect the required information, what is your next message?"
+            # The age check is part of the turn, rather than a second request
+            prompt = f"""
+            You have {remaining_messages} messages left to collect the required information, what is your next message?
+            If your confidence in the reported age is 5 or less, or if the person claims to be older than 16 while their educational level is Ensino Fundamental or Ensino Médio, your next message must be a follow-up question to clarify and verify their age.
+            """
 
-        interview_details = agent.structured_output(
-            output_model=InterviewDetails,
-            prompt=prompt,
-        )
-        print(interview_details.model_dump())
-        if (
-            interview_details.confidence_in_age is not None
-            and interview_details.confidence_in_age <= 5
-        ) or (
-            interview_details.age is not None
-            and interview_details.age > 16
-            and interview_details.education_level is not None
-            and interview_details.education_level <= 2
-        ):
-            # If confidence in age is low, ask for clarification
-            clarification_prompt = "We have low confidence in the reported age. Please ask a follow-up question to clarify and verify the interviewee's age."
-            clarification_details = agent.structured_output(
+        if self._background_extraction:
+            interview_details = self._reply_and_extract(agent, prompt)
+        else:
+            interview_details = agent.structured_output(
                 output_model=InterviewDetails,
-                prompt=clarification_prompt,
+                prompt=prompt,
             )
-            if clarification_details.next_message:
-                interview_details.next_message = clarification_details.next_message
+            self._update_details(interview_details)
+        print(interview_details.model_dump())
         self._append_assistant_message(agent, interview_details)
         return interview_details
 
@@ -94,8 +258,21 @@ class BaseAIInterviewer(BaseInterviewer):
         )
 
 
+_PROFILE_FIELDS = (
+    "age",
+    "city",
+    "intent",
+    "education_level",
+    "domain_of_interest",
+    "years_of_experience",
+    "skills",
+)
+
+
 class InitialAIInterviewer(BaseAIInterviewer):
     welcome_agent: Agent
+    completion_policy = CompletionPolicy(_PROFILE_FIELDS)
+    kept_turns = 4
 
     def __init__(self, ai_provider: AIProvider, max_messages_per_person: int = 10):
         super().__init__(ai_provider, max_messages_per_person)
@@ -137,28 +314,30 @@ class InitialAIInterviewer(BaseAIInterviewer):
 
 class TrainingAIInterviewer(BaseAIInterviewer):
     welcome_agent: Agent
+    summary: str
+    completion_policy = CompletionPolicy(["skills"])
 
     def __init__(
         self, ai_provider: AIProvider, summary: str, max_messages_per_person: int = 10
     ):
         super().__init__(ai_provider, max_messages_per_person)
-        skills = read_skills()
-        skills_prompt = "\n".join(
-            f" - {skill.name} (e.g. for jobs: {skill.jobs})" for skill in skills
-        )
+        self.summary = summary
+        self._initialize_catalog(summary, with_jobs=False)
+        self.welcome_agent = self._initialize_agent(self._build_system_prompt())
 
-        self.welcome_agent = self._initialize_agent(
-            system_prompt=f"""
+    def _build_system_prompt(self) -> str:
+        assert self.catalog is not None
+        return f"""
             DESCRIPTION:
                 You are a training-focused front desk agent responsible for directing people to the appropriate service.
                 Your role is to identify which skills the person wants to develop in order to recommend suitable training programs.
                 Your name is Alina.
                 If the person gives you information that is not relevant to your role, politely steer the conversation back to collecting the required information.
-                At the end of the interview, after {max_messages_per_person} messages, you have to know all the skills the person has, and the skills they want to develop.
+                At the end of the interview, after {self.max_messages_per_person} messages, you have to know all the skills the person has, and the skills they want to develop.
             SKILLS LIST:
-                {skills_prompt}
+                {self.catalog.describe_skills()}
             PREVIOUS INTERVIEW SUMMARY:
-                {summary}
+                {self.summary}
             RULES:
                 You must be polite and considerate.
                 All your message should be short and consise: no Markdown, no bullet points, no lists. Just a short paragraph of maximum 3 sentences.
@@ -166,7 +345,6 @@ class TrainingAIInterviewer(BaseAIInterviewer):
                 Do not provide job recommendations yet.
                 You must always respond in English.
             """
-        )
 
     def start_conversation(self) -> InterviewDetails:
         return super()._start_conversation(self.welcome_agent)
@@ -177,36 +355,35 @@ class TrainingAIInterviewer(BaseAIInterviewer):
 
 class JobAIInterviewer(BaseAIInterviewer):
     welcome_agent: Agent
+    summary: str
+    completion_policy = CompletionPolicy(["domain_of_interest", "skills"])
 
     def __init__(
         self, ai_provider: AIProvider, summary: str, max_messages_per_person: int = 10
     ):
         super().__init__(ai_provider, max_messages_per_person)
-        skills = read_skills()
-        skills_prompt = "\n".join(
-            f" - {skill.name} (e.g. for jobs: {skill.jobs})" for skill in skills
-        )
-
-        jobs = read_jobs_analysis()
-        jobs_prompt = "\n".join(f" - {job.description}" for job in jobs)
+        self.summary = summary
+        self._initialize_catalog(summary, with_jobs=True)
+        self.welcome_agent = self._initialize_agent(self._build_system_prompt())
 
-        self.welcome_agent = self._initialize_agent(
-            system_prompt=f"""
+    def _build_system_prompt(self) -> str:
+        assert self.catalog is not None
+        return f"""
             DESCRIPTION:
                 You are a training-focused front desk agent responsible for directing people to the appropriate service.
                 Your role is to identify which jobs the person is interested in and their skills in order to recommend suitable job opportunities.
                 Your name is Alina.
                 If the person gives you information that is not relevant to your role, politely steer the conversation back to collecting the required information.
-                At the end of the interview, after {max_messages_per_person} messages, you have to know:
+                At the end of the interview, after {self.max_messages_per_person} messages, you have to know:
                     - all jobs the person is interested in
                     - all the skills the person has
                     - the skills they want to develop
             SKILLS LIST:
-                {skills_prompt}
+                {self.catalog.describe_skills()}
             JOBS LIST:
-                {jobs_prompt}
+                {self.catalog.describe_jobs()}
             PREVIOUS INTERVIEW SUMMARY:
-                {summary}
+                {self.summary}
             RULES:
                 You must be polite and considerate.
                 All your message should be short and consise: no Markdown, no bullet points, no lists. Just a short paragraph of maximum 3 sentences.
@@ -214,7 +391,6 @@ class JobAIInterviewer(BaseAIInterviewer):
                 Do not provide job recommendations yet.
                 You must always respond in English.
             """
-        )
 
     def start_conversation(self) -> InterviewDetails:
         return super()._start_conversation(self.welcome_agent)
@@ -225,18 +401,18 @@ class JobAIInterviewer(BaseAIInterviewer):
 
 class FullAIInterviewer(BaseAIInterviewer):
     welcome_agent: Agent
+    completion_policy = CompletionPolicy(_PROFILE_FIELDS)
+    kept_turns = 4
 
     def __init__(self, ai_provider: AIProvider, max_messages_per_person: int = 10):
         super().__init__(ai_provider, max_messages_per_person)
-        skills = read_skills()
-        skills_prompt = "\n".join(
-            f" - {skill.name} (e.g. for jobs: {skill.jobs})" for skill in skills
-        )
+        # Without a previous interview, the catalogs are selected from the answers
+        self._initialize_catalog("", with_jobs=True)
+        self.welcome_agent = self._initialize_agent(self._build_system_prompt())
 
-        jobs = read_jobs_analysis()
-        jobs_prompt = "\n".join(f" - {job.description}" for job in jobs)
-        self.welcome_agent = self._initialize_agent(
-            system_prompt=f"""
+    def _build_system_prompt(self) -> str:
+        assert self.catalog is not None
+        return f"""
             DESCRIPTION:
                 You are a front desk agent responsible for directing people to the appropriate service.
                 Your role is to identify basic information about the person in order to pass it on to specialized agents.
@@ -244,7 +420,7 @@ class FullAIInterviewer(BaseAIInterviewer):
                 Your name is Alina.
                 If the person gives you information that is not relevant to your role, politely steer the conversation back to collecting the required information.
                 The people you assist may be of any educational level and any age, but if the person is under 16 years old, you must politely inform them that you cannot assist them further due to age restrictions.
-                At the end of the interview, after {max_messages_per_person} messages, you have to know:
+                At the end of the interview, after {self.max_messages_per_person} messages, you have to know:
                     - all jobs the person is interested in
                     - all the skills the person has
                     - the skills they want to develop
@@ -258,9 +434,9 @@ class FullAIInterviewer(BaseAIInterviewer):
                 - Years of experience in the domain of interest
                 - Skills and proficiency levels (if applicable)
             SKILLS LIST:
-                {skills_prompt}
+                {self.catalog.describe_skills()}
             JOBS LIST:
-                {jobs_prompt}
+                {self.catalog.describe_jobs()}
             RULES:
                 You must be polite and considerate.
                 All your message should be short and consise: no Markdown, no bullet points, no lists. Just a short paragraph of maximum 3 sentences.
@@ -271,7 +447,6 @@ class FullAIInterviewer(BaseAIInterviewer):
                 If the person claims to be older than 16 years old, it's hard to believe they are still in school, especially in ensino fundametal.
                 If in doubt about the authenticity of the information provided (e.g., age, experience, skills), ask follow-up questions to clarify and verify the details.
             """
-        )
 
     def start_conversation(self) -> InterviewDetails:
         return super()._start_conversation(self.welcome_agent)
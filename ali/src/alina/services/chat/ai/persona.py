@@ -1,8 +1,18 @@
+import functools
 import logging
-from typing import Optional
+import threading
+from typing import Any, Optional
 
-from ...utils.aws import aws_signed_request
-from ..base.persona import BasePersonaChatter, Conversation, ConversationMessage, Role
+from alina.shared.config import Configuration
+
+from ...utils.aws import aws_signed_request, get_challenge_api_client
+from ..base.persona import (
+    BaseAsyncPersonaChatter,
+    BasePersonaChatter,
+    Conversation,
+    ConversationMessage,
+    Role,
+)
 
 
 class ChatResponse:
@@ -18,6 +28,84 @@ class ChatResponse:
         self.conversation_count_week = conversation_count_week
 
 
+class ConversationQuota:
+    """Ledger of the conversations started this week with the personas.
+
+    Every chat response reports the number of conversations of the week, the
+    ledger keeps the highest one. With a known weekly limit, schedulers reserve
+    a conversation before starting it, so that conversations running at the
+    same time cannot exceed the limit together.
+    """
+
+    weekly_limit: int
+    conversation_count_week: Optional[int]
+
+    def __init__(self, weekly_limit: int):
+        self.weekly_limit = weekly_limit
+        self.conversation_count_week = None
+        self._reserved = 0
+        self._lock = threading.Lock()
+
+    def record(self, conversation_count_week: int):
+        with self._lock:
+            if (
+                self.conversation_count_week is None
+                or conversation_count_week > self.conversation_count_week
+            ):
+                self.conversation_count_week = conversation_count_week
+
+    @property
+    def remaining(self) -> Optional[int]:
+        """Number of conversations that can still be started (None if unknown)."""
+        if not self.weekly_limit:
+            return None
+        with self._lock:
+            used = (self.conversation_count_week or 0) + self._reserved
+            return max(0, self.weekly_limit - used)
+
+    def reserve(self) -> bool:
+        """Reserve a new conversation, return False if the weekly limit is reached."""
+        with self._lock:
+            used = (self.conversation_count_week or 0) + self._reserved
+            if self.weekly_limit and used >= self.weekly_limit:
+                return False
+            self._reserved += 1
+            return True
+
+    def release(self):
+        """Release a reservation, once the conversation is started (or failed to)."""
+        with self._lock:
+            self._reserved -= 1
+
+
+@functools.cache
+def get_conversation_quota() -> ConversationQuota:
+    """Return the conversation ledger shared by the whole process."""
+    return ConversationQuota(Configuration().ALINA_CHAT_WEEKLY_LIMIT)
+
+
+def _parse_chat_response(data: Any) -> ChatResponse:
+    for key in ["response", "conversation_id", "conversation_count_week"]:
+        if key not in data:
+            raise RuntimeError(f"Chat response missing key '{key}'")
+    get_conversation_quota().record(data["conversation_count_week"])
+    return ChatResponse(
+        response=data["response"],
+        conversation_id=data["conversation_id"],
+        conversation_count_week=data["conversation_count_week"],
+    )
+
+
+def _build_chat_payload(
+    persona_id: str, message: str, conversation_id: str | None
+) -> dict[str, Any]:
+    return {
+        "persona_id": persona_id,
+        "message": message,
+        "conversation_id": conversation_id,
+    }
+
+
 def send_chat_message(
     persona_id: str,
     message: str,
@@ -26,75 +114,109 @@ def send_chat_message(
     """Send a message to a persona and return (response_text, conversation_id).
     Returns None on failure.
     """
-    payload = {
-        "persona_id": persona_id,
-        "message": message,
-        "conversation_id": conversation_id,
-    }
     try:
         resp = aws_signed_request(
             path="chat",
             method="POST",
-            payload=payload,
+            payload=_build_chat_payload(persona_id, message, conversation_id),
         )
         if not resp:
             return None
-        data = resp.json()
-        for key in ["response", "conversation_id", "conversation_count_week"]:
-            if key not in data:
-                raise RuntimeError(f"Chat response missing key '{key}'")
-        return ChatResponse(
-            response=data["response"],
-            conversation_id=data["conversation_id"],
-            conversation_count_week=data["conversation_count_week"],
+        return _parse_chat_response(resp.json())
+    except Exception as e:
+        logging.error(f"Error sending chat message to persona: {e}")
+        return None
+
+
+async def send_chat_message_async(
+    persona_id: str,
+    message: str,
+    conversation_id: str | None = None,
+) -> Optional[ChatResponse]:
+    """Asynchronous variant of send_chat_message."""
+    try:
+        resp = await get_challenge_api_client().request_async(
+            path="chat",
+            method="POST",
+            payload=_build_chat_payload(persona_id, message, conversation_id),
         )
+        return _parse_chat_response(resp.json())
     except Exception as e:
         logging.error(f"Error sending chat message to persona: {e}")
         return None
 
 
+def _get_persona_id_string(persona_identifier: int) -> str:
+    return f"persona_{persona_identifier:03d}"
+
+
+def _open_conversation(
+    persona_id_string: str, first_message: str, response: Optional[ChatResponse]
+) -> Conversation:
+    if not response:
+        raise RuntimeError("Failed to start conversation with persona")
+    conversation = Conversation(persona_id_string, handler=response.conversation_id)
+    conversation.messages.append(
+        ConversationMessage(role=Role.USER, content=first_message)
+    )
+    _record_reply(conversation, response)
+    return conversation
+
+
+def _record_reply(conversation: Conversation, response: Optional[ChatResponse]):
+    if not response:
+        raise RuntimeError("Failed to send message to persona")
+    conversation.week_counter = response.conversation_count_week
+    conversation.messages.append(
+        ConversationMessage(role=Role.PERSONA, content=response.response)
+    )
+
+
 class AIPersonaChatter(BasePersonaChatter):
     def start_conversation(
         self, persona_identifier: int, first_message: str
     ) -> Conversation:
-        persona_id_string = f"persona_{persona_identifier:03d}"
-        response_tuple = send_chat_message(
+        persona_id_string = _get_persona_id_string(persona_identifier)
+        response = send_chat_message(
             persona_id=persona_id_string,
             message=first_message,
             conversation_id=None,
         )
-        if not response_tuple:
-            raise RuntimeError("Failed to start conversation with persona")
-        conversation = Conversation(
-            persona_id_string, handler=response_tuple.conversation_id
-        )
-        conversation.messages.append(
-            ConversationMessage(role=Role.USER, content=first_message)
-        )
-        conversation.messages.append(
-            ConversationMessage(
-                role=Role.PERSONA,
-                content=response_tuple.response,
-            )
-        )
-        return conversation
+        return _open_conversation(persona_id_string, first_message, response)
 
     def send_message(self, conversation: Conversation, message: str) -> None:
         conversation.messages.append(
             ConversationMessage(role=Role.USER, content=message)
         )
-        response_tuple = send_chat_message(
+        response = send_chat_message(
             persona_id=conversation.persona_identifier,
             message=message,
             conversation_id=conversation.handler,
         )
+        _record_reply(conversation, response)
 
-        if not response_tuple:
-            raise RuntimeError("Failed to send message to persona")
 
+class AsyncAIPersonaChatter(BaseAsyncPersonaChatter):
+    """Persona chatter sending its messages from an event loop (see AIPersonaChatter)."""
+
+    async def start_conversation(
+        self, persona_identifier: int, first_message: str
+    ) -> Conversation:
+        persona_id_string = _get_persona_id_string(persona_identifier)
+        response = await send_chat_message_async(
+            persona_id=persona_id_string,
+            message=first_message,
+            conversation_id=None,
+        )
+        return _open_conversation(persona_id_string, first_message, response)
+
+    async def send_message(self, conversation: Conversation, message: str) -> None:
         conversation.messages.append(
-            ConversationMessage(
-                role=Role.PERSONA,
-                content=response_tuple.response,
-            )
+            ConversationMessage(role=Role.USER, content=message)
+        )
+        response = await send_chat_message_async(
+            persona_id=conversation.persona_identifier,
+            message=message,
+            conversation_id=conversation.handler,
         )
+        _record_reply(conversation, response)
@@ -1,8 +1,8 @@
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import Optional
+from typing import Any, Optional, Sequence
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, create_model
 
 
 class Intent(str, Enum):
@@ -71,6 +71,79 @@ class InterviewDetails(BaseModel):
     )
 
 
+class NextMessage(BaseModel):
+    next_message: str = Field(
+        "", description=InterviewDetails.model_fields["next_message"].description
+    )
+
+
+# The details of InterviewDetails alone, extracted without writing the next message
+ExtractedDetails = create_model(
+    "ExtractedDetails",
+    **{
+        name: (field.annotation, field)
+        for name, field in InterviewDetails.model_fields.items()
+        if name != "next_message"
+    },
+)
+
+
+# Above this age, a person is unlikely to still be at school (Ensino
+# Fundamental or Ensino Médio)
+_MAX_SCHOOL_AGE = 16
+_SCHOOL_EDUCATION_LEVELS = (1, 2)
+
+
+class CompletionPolicy:
+    """Decide when an interview has collected enough details to end.
+
+    The interview is complete once the required fields are filled in and
+    unchanged across two consecutive turns. When the age is required, the
+    interviewer must also be confident enough in it, and the age must be
+    consistent with the educational level: otherwise the interviewer asks a
+    question to verify the age (see the prompt of the turn), which must be
+    sent.
+    """
+
+    required_fields: tuple[str, ...]
+    min_confidence_in_age: int
+
+    def __init__(self, required_fields: Sequence[str], min_confidence_in_age: int = 6):
+        self.required_fields = tuple(required_fields)
+        self.min_confidence_in_age = min_confidence_in_age
+
+    @staticmethod
+    def _normalize(value: Any) -> Any:
+        if isinstance(value, str):
+            return " ".join(value.lower().split())
+        return value
+
+    def is_complete(
+        self, previous: Optional[InterviewDetails], current: InterviewDetails
+    ) -> bool:
+        if previous is None:
+            return False
+        for field in self.required_fields:
+            value = self._normalize(getattr(current, field))
+            if value is None or value == "":
+                return False
+            if value != self._normalize(getattr(previous, field)):
+                return False
+        if "age" in self.required_fields:
+            if (
+                current.confidence_in_age is not None
+                and current.confidence_in_age < self.min_confidence_in_age
+            ):
+                return False
+            if (
+                current.age is not None
+                and current.age > _MAX_SCHOOL_AGE
+                and current.education_level in _SCHOOL_EDUCATION_LEVELS
+            ):
+                return False
+        return True
+
+
 class BaseInterviewer(ABC):
     @abstractmethod
     def start_conversation(self) -> InterviewDetails:
@@ -79,3 +152,25 @@ class BaseInterviewer(ABC):
     @abstractmethod
     def send_message(self, message: str) -> InterviewDetails:
         pass
+
+    def is_complete(self) -> bool:
+        """Return True once the interviewer has collected all the details it needs."""
+        return False
+
+    def get_messages(self) -> list[dict[str, Any]]:
+        """Return the messages of the interviewer (JSON serializable), to resume the interview later."""
+        return []
+
+    def get_removed_message_count(self) -> int:
+        """Return the number of older messages removed from get_messages (replaced by a digest)."""
+        return 0
+
+    def restore_messages(
+        self, messages: list[dict[str, Any]], removed_message_count: int = 0
+    ) -> None:
+        """Restore the messages returned by get_messages, and the count of the removed ones."""
+        pass
+
+    def close(self) -> None:
+        """Finish the pending work of the interviewer, once the interview is over."""
+        pass
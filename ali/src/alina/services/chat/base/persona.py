@@ -42,3 +42,19 @@ class BasePersonaChatter(ABC):
     @abstractmethod
     def send_message(self, conversation: Conversation, message: str) -> None:
         pass
+
+
+class BaseAsyncPersonaChatter(ABC):
+    """
+    Abstract class for persona chatting services used from an event loop.
+    """
+
+    @abstractmethod
+    async def start_conversation(
+        self, persona_identifier: int, first_message: str
+    ) -> Conversation:
+        pass
+
+    @abstractmethod
+    async def send_message(self, conversation: Conversation, message: str) -> None:
+        pass
@@ -1,15 +1,45 @@
+import asyncio
+import atexit
+import functools
+import hashlib
+import json
+import logging
+import threading
 from abc import ABC, abstractmethod
+from concurrent.futures import Future
 from enum import Enum
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Dict,
+    Optional,
+    Type,
+    TypeVar,
+)
 
 import boto3
+import httpx
 from botocore.config import Config as BotocoreConfig
+from pydantic import BaseModel
 from strands import Agent
+from strands.agent import AgentResult
 from strands.models import BedrockModel
 from strands.models.mistral import MistralModel
 from strands.models.model import Model
 from strands.models.openai import OpenAIModel
+from strands.telemetry.metrics import EventLoopMetrics
+from strands.types.agent import AgentInput
+from strands.types.exceptions import ModelThrottledException
 
+from alina.services.utils.rate_limit import AdaptiveLimiter
 from alina.shared.config import Configuration
+from alina.shared.response_cache import ResponseCache
+from alina.shared.workspace import get_workspace
+
+T = TypeVar("T", bound=BaseModel)
+R = TypeVar("R")
 
 
 class AIProvider(Enum):
@@ -18,20 +48,335 @@ class AIProvider(Enum):
     AZURE = "azure"
 
 
+@functools.cache
+def _get_response_cache() -> Optional[ResponseCache]:
+    configuration = Configuration()
+    if not configuration.ALINA_LLM_CACHE:
+        return None
+    return ResponseCache(
+        get_workspace().get_llm_cache_file(),
+        ttl=configuration.ALINA_LLM_CACHE_TTL,
+        max_bytes=configuration.ALINA_LLM_CACHE_MAX_MB * 1024 * 1024,
+    )
+
+
+_MAX_ATTEMPTS = 3
+
+_limiters: Dict[tuple[AIProvider, str], AdaptiveLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def _get_limiter(provider: AIProvider, model: Model) -> AdaptiveLimiter:
+    return get_limiter(provider, str(model.get_config().get("model_id", "")))
+
+
+def get_limiter(provider: AIProvider, model_id: str) -> AdaptiveLimiter:
+    """Return the limiter shared by all the requests to a model (LLM or embeddings)."""
+    with _limiters_lock:
+        limiter = _limiters.get((provider, model_id))
+        if limiter is None:
+            configuration = Configuration()
+            limiter = AdaptiveLimiter(
+                f"{provider.value}/{model_id}",
+                max_concurrency=configuration.ALINA_LLM_CONCURRENCY,
+                requests_per_minute=configuration.ALINA_LLM_REQUESTS_PER_MINUTE,
+                tokens_per_minute=configuration.ALINA_LLM_TOKENS_PER_MINUTE,
+            )
+            _limiters[(provider, model_id)] = limiter
+        return limiter
+
+
+def _get_max_tokens(model: Model) -> int:
+    config = model.get_config()
+    max_tokens = config.get("max_tokens") or config.get("params", {}).get("max_tokens")
+    return max_tokens or 0
+
+
+class _LimitedAgent(Agent):
+    """Agent whose requests go through the limiter of its model.
+
+    Throttled structured output requests are retried with an exponential
+    backoff, after the limiter has reduced the concurrency (strands retries
+    the other requests itself). The requests are sent on the request loop of
+    the process, with its pooled HTTP client.
+    """
+
+    def __init__(self, provider: AIProvider, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._provider = provider
+        self._limiter = _get_limiter(provider, self.model)
+
+    def _get_request_document(self, prompt: AgentInput, output_schema: Any) -> str:
+        request = {
+            "provider": self._provider.value,
+            "model": self.model.get_config(),
+            "system_prompt": self.system_prompt,
+            "messages": self.messages + self._convert_prompt_to_messages(prompt),
+            "output_schema": output_schema,
+        }
+        return json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+
+    async def _send(
+        self,
+        request_document: str,
+        send: Callable[[], Awaitable[R]],
+        max_attempts: int = _MAX_ATTEMPTS,
+    ) -> R:
+        # Rough estimate of the tokens of the request: 4 characters per token,
+        # plus the maximum size of the response
+        tokens = len(request_document) // 4 + _get_max_tokens(self.model)
+        for attempt in range(1, max_attempts + 1):
+            try:
+                async with self._limiter.request(tokens):
+                    return await asyncio.wrap_future(submit_request(send()))
+            except ModelThrottledException:
+                if attempt == max_attempts:
+                    raise
+                delay = 2**attempt
+                logging.warning(f"Request throttled, retrying in {delay} seconds")
+                await asyncio.sleep(delay)
+        raise AssertionError("unreachable")
+
+    async def structured_output_async(
+        self, output_model: Type[T], prompt: AgentInput = None
+    ) -> T:
+        return await self._send(
+            self._get_request_document(prompt, output_model.model_json_schema()),
+            lambda: super(_LimitedAgent, self).structured_output_async(
+                output_model, prompt
+            ),
+        )
+
+    async def invoke_async(
+        self, prompt: AgentInput = None, **kwargs: Any
+    ) -> AgentResult:
+        # The event loop of strands already retries throttled requests, and
+        # has appended the prompt to the messages when it gives up: retrying
+        # here would send the prompt twice
+        return await self._send(
+            self._get_request_document(prompt, None),
+            lambda: super(_LimitedAgent, self).invoke_async(prompt, **kwargs),
+            max_attempts=1,
+        )
+
+
+class _CachedAgent(_LimitedAgent):
+    """Agent whose responses are stored in the workspace LLM response cache.
+
+    The cache key covers the provider, the model configuration, the system
+    prompt, the message history and the output schema, so any change to one of
+    them sends a new request. Cached responses do not go through the limiter.
+    """
+
+    def __init__(self, provider: AIProvider, cache: ResponseCache, **kwargs: Any):
+        super().__init__(provider, **kwargs)
+        self._cache = cache
+
+    def _get_cache_key(self, prompt: AgentInput, output_schema: Any) -> str:
+        document = self._get_request_document(prompt, output_schema)
+        return hashlib.sha256(document.encode("utf-8")).hexdigest()
+
+    async def structured_output_async(
+        self, output_model: Type[T], prompt: AgentInput = None
+    ) -> T:
+        key = self._get_cache_key(prompt, output_model.model_json_schema())
+
+        async def compute() -> str:
+            output = await super(_CachedAgent, self).structured_output_async(
+                output_model, prompt
+            )
+            return output.model_dump_json()
+
+        return output_model.model_validate_json(
+            await self._cache.get_or_compute(key, compute)
+        )
+
+    async def invoke_async(
+        self, prompt: AgentInput = None, **kwargs: Any
+    ) -> AgentResult:
+        key = self._get_cache_key(prompt, None)
+        prompt_messages = self._convert_prompt_to_messages(prompt)
+        result: Optional[AgentResult] = None
+
+        async def compute() -> Optional[str]:
+            nonlocal result
+            result = await super(_CachedAgent, self).invoke_async(prompt, **kwargs)
+            if result.stop_reason != "end_turn":
+                return None
+            return json.dumps(result.message, ensure_ascii=False)
+
+        cached = await self._cache.get_or_compute(key, compute)
+        if result is not None:
+            return result
+        if cached is None:
+            # The identical request running concurrently could not be cached
+            return await super().invoke_async(prompt, **kwargs)
+
+        # Same conversation state as if the model had answered
+        message = json.loads(cached)
+        for prompt_message in prompt_messages:
+            self._append_message(prompt_message)
+        self._append_message(message)
+        return AgentResult(
+            stop_reason="end_turn",
+            message=message,
+            metrics=EventLoopMetrics(),
+            state={},
+        )
+
+
+class _SharedAsyncClient(httpx.AsyncClient):
+    """HTTP client shared by several SDK clients, which must not close it."""
+
+    async def aclose(self) -> None:
+        pass
+
+    async def close_shared(self) -> None:
+        await super().aclose()
+
+
+class _RequestLoop:
+    """Event loop of a background thread, which sends all the model requests of the process.
+
+    strands runs each sync call on a new event loop, and connections cannot
+    be shared between loops: sending the requests of every caller (sync or
+    async) on one long-lived loop lets them share one pooled HTTP client and
+    its open connections. The client is closed when the process exits.
+    """
+
+    def __init__(self, max_connections: int):
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        )
+        self._client: Optional[_SharedAsyncClient] = None
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(
+            target=self.loop.run_forever, name="model-requests", daemon=True
+        ).start()
+        atexit.register(self._close)
+
+    def submit(self, coroutine: Coroutine[Any, Any, R]) -> Future[R]:
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def get_client(self) -> Optional[httpx.AsyncClient]:
+        """Return the pooled client, when running on the loop (None otherwise)."""
+        try:
+            if asyncio.get_running_loop() is not self.loop:
+                return None
+        except RuntimeError:
+            return None
+        # Only the loop thread creates the client, no lock needed
+        if self._client is None:
+            self._client = _SharedAsyncClient(limits=self._limits, timeout=120)
+        return self._client
+
+    def _close(self):
+        if self._client is not None:
+            try:
+                self.submit(self._client.close_shared()).result(timeout=5)
+            except Exception as e:
+                logging.debug(f"Failed to close the pooled HTTP client: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+@functools.cache
+def _get_request_loop() -> _RequestLoop:
+    return _RequestLoop(Configuration().ALINA_LLM_CONCURRENCY)
+
+
+def submit_request(coroutine: Coroutine[Any, Any, R]) -> Future[R]:
+    """Run a coroutine sending model requests on the request loop of the process.
+
+    Sync callers wait for the result of the returned future, async callers
+    await asyncio.wrap_future of it.
+    """
+    return _get_request_loop().submit(coroutine)
+
+
+def get_pooled_http_client() -> Optional[httpx.AsyncClient]:
+    """Return the async HTTP client shared by the model requests (see submit_request).
+
+    SDK clients built on it must not close it. None outside of the request loop.
+    """
+    return _get_request_loop().get_client()
+
+
+class _PooledMistralModel(MistralModel):
+    # The model opens a Mistral client per request, give it the pooled HTTP client
+
+    @property
+    def client_args(self) -> Dict[str, Any]:
+        http_client = get_pooled_http_client()
+        if http_client is None:
+            return self._client_args
+        return {**self._client_args, "async_client": http_client}
+
+    @client_args.setter
+    def client_args(self, client_args: Dict[str, Any]):
+        self._client_args = client_args
+
+
+class _PooledOpenAIModel(OpenAIModel):
+    # The model opens an OpenAI client per request, give it the pooled HTTP client
+
+    @property
+    def client_args(self) -> Dict[str, Any]:
+        http_client = get_pooled_http_client()
+        if http_client is None:
+            return self._client_args
+        return {**self._client_args, "http_client": http_client}
+
+    @client_args.setter
+    def client_args(self, client_args: Dict[str, Any]):
+        self._client_args = client_args
+
+
+_models: Dict[AIProvider, Model] = {}
+_models_lock = threading.Lock()
+
+
 class AIManager(ABC):
-    def build_agent(self, system_prompt: str) -> Agent:
-        return Agent(
-            model=self._build_model(),
+    provider: AIProvider
+
+    def build_agent(self, system_prompt: str, use_cache: bool = True) -> Agent:
+        cache = _get_response_cache() if use_cache else None
+        if cache is None:
+            return _LimitedAgent(
+                self.provider,
+                model=self.get_model(),
+                system_prompt=system_prompt,
+                callback_handler=None,
+            )
+        return _CachedAgent(
+            self.provider,
+            cache,
+            model=self.get_model(),
             system_prompt=system_prompt,
             callback_handler=None,
         )
 
+    def get_model(self) -> Model:
+        """Return the model of the provider, built once and shared by all agents.
+
+        Models keep no conversation state, and their clients are thread-safe,
+        so sharing them reuses sessions and open connections across agents.
+        """
+        with _models_lock:
+            model = _models.get(self.provider)
+            if model is None:
+                model = self._build_model()
+                _models[self.provider] = model
+            return model
+
     @abstractmethod
     def _build_model(self) -> Model:
         pass
 
 
 class _BedrockAIManager(AIManager):
+    provider = AIProvider.BEDROCK
+
     def _build_model(self) -> Model:
         configuration = Configuration()
         session = boto3.Session(
@@ -42,7 +387,7 @@ class _BedrockAIManager(AIManager):
         boto_client_config = BotocoreConfig(
             read_timeout=120,
             connect_timeout=120,
-            max_pool_connections=10,
+            max_pool_connections=configuration.ALINA_LLM_CONCURRENCY,
             retries={"max_attempts": 2},
         )
         return BedrockModel(
@@ -57,10 +402,12 @@ class _BedrockAIManager(AIManager):
 
 
 class _MistralAIManager(AIManager):
+    provider = AIProvider.MISTRAL
+
     def _build_model(self) -> Model:
         configuration = Configuration()
 
-        return MistralModel(
+        return _PooledMistralModel(
             api_key=configuration.MISTRAL_API_KEY,
             model_id=configuration.MISTRAL_MODEL_ID,
             max_tokens=2000,
@@ -70,11 +417,13 @@ class _MistralAIManager(AIManager):
 
 
 class _AzureAIManager(AIManager):
+    provider = AIProvider.AZURE
+
     def _build_model(self) -> Model:
         configuration = Configuration()
 
         base_url = f"{configuration.AZURE_API_BASE.rstrip('/')}/openai/deployments/{configuration.AZURE_DEPLOYMENT_NAME}/"
-        return OpenAIModel(
+        return _PooledOpenAIModel(
             model_id=configuration.AZURE_DEPLOYMENT_NAME,
             client_args={
                 "base_url": base_url,
@@ -88,6 +437,12 @@ class _AzureAIManager(AIManager):
         )
 
 
+def get_prompt_version(*parts: str) -> str:
+    """Return a short hash identifying a prompt (system prompt, output schema...)."""
+    digest = hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+    return f"ai-{digest[:16]}"
+
+
 def get_ai_manager(name: AIProvider) -> AIManager:
     if name == AIProvider.BEDROCK:
         return _BedrockAIManager()
@@ -1,80 +1,262 @@
+import asyncio
+import contextlib
+import functools
 import json
-from typing import Any, Optional
+import logging
+import random
+import threading
+import time
+import weakref
+from typing import Any, AsyncIterator, Optional
 
 import boto3
+import httpx
 import requests
 from botocore.auth import SigV4Auth
 from botocore.awsrequest import AWSRequest
+from requests.adapters import HTTPAdapter
 
 from ...shared.config import Configuration
 
 configuration = Configuration()
 
+# Server errors are only retried for GET requests: a POST (chat message,
+# submission) may have been processed before failing
+_RETRIED_STATUSES = {429, 500, 502, 503, 504}
 
-def aws_signed_request(
-    path: str,
-    method: str,
-    payload: Optional[Any] = None,
-) -> Optional[requests.Response]:
-    """Make a SigV4 signed request to the challenge API.
 
-    Lean error handling: raises RuntimeError on failure.
+def _serialize_payload(path: str, payload: Optional[Any]) -> Optional[str]:
+    # Normalize payload into raw JSON string (boto3 signing sends raw body)
+    if payload is None:
+        return None
+    try:
+        if isinstance(payload, (dict, list)):
+            return json.dumps(payload)
+        elif isinstance(payload, (str, bytes)):
+            return payload if isinstance(payload, str) else payload.decode("utf-8")
+        else:  # Fallback attempt json serialization
+            return json.dumps(payload)
+    except Exception as e:  # pragma: no cover
+        raise RuntimeError(f"Failed to serialize payload for path '{path}'") from e
 
-    Args:
-        path: API path segment (e.g. "chat", "submit", "health")
-        method: HTTP verb (GET/POST)
-        payload: dict / list / JSON-string / None
 
-    Returns:
-        Response object
+class ChallengeApiClient:
+    """Long-lived client of the challenge API.
+
+    The boto3 session (and so the credentials, refreshed when they expire) and
+    the HTTP connection pool are shared by all requests. Requests are signed
+    with SigV4, time out after `timeout` seconds, and are retried with an
+    exponential backoff and full jitter when throttled (429), or on server
+    and network errors for GET requests.
+
+    request_async sends the same requests from an event loop. Within
+    async_session, they share an httpx connection pool (one per event loop,
+    since connections cannot be shared between loops), closed when the
+    session ends; outside of a session, each request opens its own client.
     """
-    # Normalize payload into raw JSON string (boto3 signing sends raw body)
-    body = None
-    if payload is not None:
-        try:
-            if isinstance(payload, (dict, list)):
-                body = json.dumps(payload)
-            elif isinstance(payload, (str, bytes)):
-                body = payload if isinstance(payload, str) else payload.decode("utf-8")
-            else:  # Fallback attempt json serialization
-                body = json.dumps(payload)
-        except Exception as e:  # pragma: no cover
-            raise RuntimeError(f"Failed to serialize payload for path '{path}'") from e
 
-    try:
-        session = boto3.Session(region_name=configuration.AWS_REGION)
-        credentials = session.get_credentials()
+    base_url: str
+    region: str
+    timeout: float
+    max_attempts: int
+
+    def __init__(
+        self,
+        base_url: str,
+        region: str,
+        timeout: float,
+        max_attempts: int,
+        pool_size: int,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.region = region
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self._boto_session = boto3.Session(region_name=region)
+        self._http_session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self._http_session.mount("https://", adapter)
+        self._http_session.mount("http://", adapter)
+        self._async_limits = httpx.Limits(
+            max_connections=pool_size, max_keepalive_connections=pool_size
+        )
+        # Client of each event loop, with the number of sessions using it
+        self._async_clients: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, tuple[httpx.AsyncClient, int]
+        ] = weakref.WeakKeyDictionary()
+        self._async_clients_lock = threading.Lock()
+
+    def _sign(self, method: str, url: str, body: Optional[str]) -> AWSRequest:
+        credentials = self._boto_session.get_credentials()
         if not credentials:
             raise RuntimeError(
                 "AWS credentials not found (configure with aws configure)"
             )
-
-        headers = {"Content-Type": "application/json"}
         request = AWSRequest(
-            url=f"{configuration.AWS_BASE_URL.rstrip('/')}/{path}",
-            method=method.upper(),
+            url=url,
+            method=method,
             data=body,
-            headers=headers,
+            headers={"Content-Type": "application/json"},
         )
-        SigV4Auth(credentials, "execute-api", configuration.AWS_REGION).add_auth(
-            request
+        # Frozen credentials are refreshed by boto3 when they are about to expire
+        SigV4Auth(
+            credentials.get_frozen_credentials(), "execute-api", self.region
+        ).add_auth(request)
+        return request
+
+    def _get_retry_delay(self, attempt: int) -> float:
+        return random.uniform(0, min(30, 2**attempt))
+
+    def _is_retried(self, method: str, status_code: int) -> bool:
+        return status_code == 429 or (
+            method == "GET" and status_code in _RETRIED_STATUSES
         )
 
+    def _build_async_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(limits=self._async_limits, timeout=self.timeout)
+
+    @contextlib.asynccontextmanager
+    async def async_session(self) -> AsyncIterator[None]:
+        """Share a connection pool between the requests sent from the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._async_clients_lock:
+            client, sessions = self._async_clients.get(loop, (None, 0))
+            if client is None:
+                client = self._build_async_client()
+            self._async_clients[loop] = (client, sessions + 1)
         try:
-            response = requests.request(
-                method=str(request.method),
-                url=str(request.url),
-                headers=dict(request.headers),
-                data=request.body,
+            yield
+        finally:
+            with self._async_clients_lock:
+                client, sessions = self._async_clients[loop]
+                if sessions > 1:
+                    self._async_clients[loop] = (client, sessions - 1)
+                else:
+                    del self._async_clients[loop]
+            if sessions == 1:
+                await client.aclose()
+
+    def request(
+        self, path: str, method: str, payload: Optional[Any] = None
+    ) -> requests.Response:
+        """Send a signed request, raising RuntimeError on failure."""
+        method = method.upper()
+        url = f"{self.base_url}/{path}"
+        body = _serialize_payload(path, payload)
+        for attempt in range(1, self.max_attempts + 1):
+            # Sign each attempt, the signature includes the request date
+            request = self._sign(method, url, body)
+            can_retry = attempt < self.max_attempts
+            try:
+                response = self._http_session.request(
+                    method=method,
+                    url=url,
+                    headers=dict(request.headers),
+                    data=request.body,
+                    timeout=self.timeout,
+                )
+            except requests.RequestException as e:
+                if not (can_retry and method == "GET"):
+                    raise RuntimeError(
+                        f"Network error during request to '{path}'"
+                    ) from e
+                logging.warning(f"Network error during request to '{path}': {e}")
+            else:
+                if response.status_code == 200:
+                    return response
+                if not (can_retry and self._is_retried(method, response.status_code)):
+                    raise RuntimeError(
+                        f"API call '{path}' failed: status={response.status_code} body={response.text[:300]}"
+                    )
+            delay = self._get_retry_delay(attempt)
+            logging.warning(
+                f"Retrying request to '{path}' in {delay:.1f} seconds (attempt {attempt}/{self.max_attempts})"
             )
-        except requests.RequestException as e:
-            raise RuntimeError(f"Network error during request to '{path}'") from e
+            time.sleep(delay)
+        raise AssertionError("unreachable")
 
-        if response.status_code == 200:
-            return response
-        raise RuntimeError(
-            f"API call '{path}' failed: status={response.status_code} body={response.text[:300]}"
-        )
+    async def request_async(
+        self, path: str, method: str, payload: Optional[Any] = None
+    ) -> httpx.Response:
+        """Send a signed request from an event loop, raising RuntimeError on failure."""
+        with self._async_clients_lock:
+            client, _ = self._async_clients.get(asyncio.get_running_loop(), (None, 0))
+        if client is None:
+            async with self._build_async_client() as client:
+                return await self._send_async(client, path, method, payload)
+        return await self._send_async(client, path, method, payload)
+
+    async def _send_async(
+        self,
+        client: httpx.AsyncClient,
+        path: str,
+        method: str,
+        payload: Optional[Any],
+    ) -> httpx.Response:
+        method = method.upper()
+        url = f"{self.base_url}/{path}"
+        body = _serialize_payload(path, payload)
+        for attempt in range(1, self.max_attempts + 1):
+            request = self._sign(method, url, body)
+            can_retry = attempt < self.max_attempts
+            try:
+                response = await client.request(
+                    method=method,
+                    url=url,
+                    headers=dict(request.headers),
+                    content=request.body,
+                )
+            except httpx.HTTPError as e:
+                if not (can_retry and method == "GET"):
+                    raise RuntimeError(
+                        f"Network error during request to '{path}'"
+                    ) from e
+                logging.warning(f"Network error during request to '{path}': {e}")
+            else:
+                if response.status_code == 200:
+                    return response
+                if not (can_retry and self._is_retried(method, response.status_code)):
+                    raise RuntimeError(
+                        f"API call '{path}' failed: status={response.status_code} body={response.text[:300]}"
+                    )
+            delay = self._get_retry_delay(attempt)
+            logging.warning(
+                f"Retrying request to '{path}' in {delay:.1f} seconds (attempt {attempt}/{self.max_attempts})"
+            )
+            await asyncio.sleep(delay)
+        raise AssertionError("unreachable")
+
+
+@functools.cache
+def get_challenge_api_client() -> ChallengeApiClient:
+    """Return the challenge API client shared by the whole process."""
+    return ChallengeApiClient(
+        base_url=configuration.AWS_BASE_URL,
+        region=configuration.AWS_REGION,
+        timeout=configuration.ALINA_API_TIMEOUT,
+        max_attempts=configuration.ALINA_API_MAX_ATTEMPTS,
+        pool_size=configuration.ALINA_CHAT_CONCURRENCY,
+    )
+
+
+def aws_signed_request(
+    path: str,
+    method: str,
+    payload: Optional[Any] = None,
+) -> Optional[requests.Response]:
+    """Make a SigV4 signed request to the challenge API.
+
+    Lean error handling: raises RuntimeError on failure.
 
+    Args:
+        path: API path segment (e.g. "chat", "submit", "health")
+        method: HTTP verb (GET/POST)
+        payload: dict / list / JSON-string / None
+
+    Returns:
+        Response object
+    """
+    try:
+        return get_challenge_api_client().request(path, method, payload)
     except Exception as e:
         raise RuntimeError(f"Unexpected error during signed request to '{path}'") from e
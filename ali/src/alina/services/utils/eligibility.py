@@ -0,0 +1,96 @@
+from typing import Dict, Sequence
+
+import numpy as np
+
+from alina.models.referential import JobReferential, PersonaReferential
+
+# Limits compared with <=: a job without requirement fits every persona, and a
+# persona without level fits every job
+_NO_REQUIREMENT = np.iinfo(np.int64).min
+_NO_LIMIT = np.iinfo(np.int64).max
+
+# City code of a persona without city constraint (jobs without city get -1)
+_ANY_CITY = -2
+
+
+class JobEligibility:
+    """Columnar view of the jobs of a referential, to find the jobs a persona is eligible for.
+
+    The job attributes the filters use are compiled once into NumPy arrays: a
+    code per city, the remote flag, the education level, the experience and
+    the domain. The eligibility of a batch of personas is then a persona × job
+    boolean matrix built by a few vectorized comparisons, instead of loops
+    over the job objects for each persona.
+    """
+
+    jobs: Sequence[JobReferential]
+
+    def __init__(self, jobs: Sequence[JobReferential]):
+        self.jobs = jobs
+        self._city_codes: Dict[str, int] = {}
+        for job in jobs:
+            if job.city:
+                self._city_codes.setdefault(job.city, len(self._city_codes))
+        self._city = np.array(
+            [self._city_codes[job.city] if job.city else -1 for job in jobs],
+            dtype=np.int64,
+        )
+        self._remote = np.array([bool(job.remote) for job in jobs], dtype=bool)
+        self._education_level = np.array(
+            [
+                _NO_REQUIREMENT if job.education_level is None else job.education_level
+                for job in jobs
+            ],
+            dtype=np.int64,
+        )
+        self._experience = np.array(
+            [
+                _NO_REQUIREMENT if job.experience is None else job.experience
+                for job in jobs
+            ],
+            dtype=np.int64,
+        )
+        self._domain = np.array(
+            [-1 if job.domain is None else job.domain for job in jobs],
+            dtype=np.int64,
+        )
+
+    def _get_city_code(self, persona: PersonaReferential) -> int:
+        if not persona.city or persona.willing_to_relocate:
+            return _ANY_CITY
+        # A city without job gets a code no job has: only remote jobs fit
+        return self._city_codes.get(persona.city, len(self._city_codes))
+
+    def mask_many(self, personas: Sequence[PersonaReferential]) -> np.ndarray:
+        """Return the persona × job matrix of eligibility (city or remote, education level and experience)."""
+        city = np.array(
+            [self._get_city_code(persona) for persona in personas], dtype=np.int64
+        )[:, np.newaxis]
+        education_level = np.array(
+            [persona.education_level or _NO_LIMIT for persona in personas],
+            dtype=np.int64,
+        )[:, np.newaxis]
+        experience = np.array(
+            [
+                _NO_LIMIT if persona.job_experience is None else persona.job_experience
+                for persona in personas
+            ],
+            dtype=np.int64,
+        )[:, np.newaxis]
+        return (
+            ((city == _ANY_CITY) | (self._city == city) | self._remote)
+            & (self._education_level <= education_level)
+            & (self._experience <= experience)
+        )
+
+    def mask(self, persona: PersonaReferential) -> np.ndarray:
+        """Return the eligibility of the persona to each job."""
+        return self.mask_many([persona])[0]
+
+    def domain_mask(self, domains: Sequence[int]) -> np.ndarray:
+        """Return whether each job belongs to one of the domains."""
+        return np.isin(self._domain, np.asarray(domains, dtype=np.int64))
+
+    def select(self, mask: np.ndarray) -> list[JobReferential]:
+        """Return the jobs of the mask, in the order of the referential."""
+        return [self.jobs[position] for position in np.flatnonzero(mask)]
@@ -0,0 +1,543 @@
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import os
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, TypeVar
+
+import boto3
+import numpy as np
+from botocore.config import Config as BotocoreConfig
+from botocore.exceptions import ClientError
+from mistralai import Mistral
+from mistralai.utils import BackoffStrategy, RetryConfig
+from openai import AsyncOpenAI
+from strands.types.exceptions import ModelThrottledException
+
+from alina.services.utils.ai import (
+    AIProvider,
+    get_limiter,
+    get_pooled_http_client,
+    submit_request,
+)
+from alina.services.utils.text import tokenize
+from alina.shared.config import Configuration
+from alina.shared.workspace import get_workspace
+
+R = TypeVar("R")
+
+_DEFAULT_MODELS = {
+    "bedrock": "amazon.titan-embed-text-v2:0",
+    "mistral": "mistral-embed",
+    "azure": "text-embedding-3-small",
+}
+
+
+class EmbeddingProvider(ABC):
+    """Compute the embeddings of texts, as L2-normalized float32 rows.
+
+    The name identifies the provider and its model: vectors computed by
+    another provider are not comparable.
+    """
+
+    name: str
+
+    @abstractmethod
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        pass
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def _hash_feature(feature: str, dimension: int) -> tuple[int, float]:
+    digest = zlib.crc32(feature.encode("utf-8"))
+    return digest % dimension, 1.0 if digest & 0x80000000 else -1.0
+
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    """Embeddings computed locally, without model nor network.
+
+    The words of a text and their character trigrams are hashed into a fixed
+    number of dimensions, with a sign that cancels collisions out on average.
+    Words sharing trigrams (plurals, inflections, compound words) get close
+    vectors, which lexical retrieval misses; this is no substitute for the
+    semantics of a model.
+    """
+
+    dimension: int
+
+    def __init__(self, dimension: int = 512):
+        self.dimension = dimension
+        self.name = f"local/hashing-{dimension}"
+
+    def _get_features(self, text: str) -> tuple[list[int], list[float]]:
+        indices: list[int] = []
+        weights: list[float] = []
+        for word in tokenize(text):
+            features = [(word, 1.0)]
+            bounded = f"<{word}>"
+            features += [(bounded[i : i + 3], 0.5) for i in range(len(bounded) - 2)]
+            for feature, weight in features:
+                index, sign = _hash_feature(feature, self.dimension)
+                indices.append(index)
+                weights.append(sign * weight)
+        return indices, weights
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            indices, weights = self._get_features(text)
+            vectors[row] = np.bincount(
+                indices, weights=weights, minlength=self.dimension
+            )
+        return _normalize(vectors)
+
+
+def _is_throttled(error: Exception) -> bool:
+    if isinstance(error, ClientError):
+        return error.response.get("Error", {}).get("Code") == "ThrottlingException"
+    return getattr(error, "status_code", None) == 429
+
+
+class _RemoteEmbeddingProvider(EmbeddingProvider):
+    """Embeddings of a model of an LLM provider.
+
+    Requests go through the limiter shared with the LLM requests to the same
+    provider and model, and run on the request loop with its pooled HTTP
+    client. The batches are sent concurrently, as far as the limiter allows.
+    """
+
+    batch_size: int = 64
+
+    def __init__(self, provider: AIProvider, model_id: str):
+        self.name = f"{provider.value}/{model_id}"
+        self._limiter = get_limiter(provider, model_id)
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        return submit_request(self._embed_async(texts)).result()
+
+    async def _embed_async(self, texts: Sequence[str]) -> np.ndarray:
+        batches = await asyncio.gather(
+            *(
+                self._embed_batch_async(texts[start : start + self.batch_size])
+                for start in range(0, len(texts), self.batch_size)
+            )
+        )
+        return _normalize(
+            np.concatenate([np.asarray(batch, dtype=np.float32) for batch in batches])
+        )
+
+    async def _send(self, texts: Sequence[str], send: Callable[[], Awaitable[R]]) -> R:
+        # Rough estimate of the tokens of the request: 4 characters per token
+        tokens = sum(len(text) for text in texts) // 4
+        async with self._limiter.request(tokens):
+            try:
+                return await send()
+            except Exception as e:
+                if _is_throttled(e):
+                    # Reported to the limiter, which reduces the concurrency
+                    raise ModelThrottledException(str(e)) from e
+                raise
+
+    @abstractmethod
+    async def _embed_batch_async(self, texts: Sequence[str]) -> np.ndarray:
+        pass
+
+
+class BedrockEmbeddingProvider(_RemoteEmbeddingProvider):
+    """Embeddings of an Amazon Titan text embeddings model.
+
+    The model embeds one text per request, so the texts of a batch are sent
+    concurrently.
+    """
+
+    model_id: str
+
+    def __init__(self, model_id: str):
+        super().__init__(AIProvider.BEDROCK, model_id)
+        configuration = Configuration()
+        if not configuration.BEDROCK_REGION:
+            raise ValueError("BEDROCK_REGION environment variable is not set")
+        self.model_id = model_id
+        self.batch_size = 4 * configuration.ALINA_LLM_CONCURRENCY
+        # boto3 has no async client, its requests run in threads
+        self._client = boto3.client(
+            "bedrock-runtime",
+            region_name=configuration.BEDROCK_REGION,
+            aws_access_key_id=configuration.BEDROCK_ACCESS_KEY_ID or None,
+            aws_secret_access_key=configuration.BEDROCK_SECRET_ACCESS_KEY or None,
+            config=BotocoreConfig(
+                max_pool_connections=configuration.ALINA_LLM_CONCURRENCY,
+                retries={"max_attempts": 5, "mode": "adaptive"},
+            ),
+        )
+
+    def _embed_text(self, text: str) -> list[float]:
+        response = self._client.invoke_model(
+            modelId=self.model_id,
+            body=json.dumps({"inputText": text}),
+            contentType="application/json",
+            accept="application/json",
+        )
+        return json.loads(response["body"].read())["embedding"]
+
+    async def _embed_batch_async(self, texts: Sequence[str]) -> np.ndarray:
+        return np.array(
+            await asyncio.gather(
+                *(
+                    self._send(
+                        [text],
+                        functools.partial(asyncio.to_thread, self._embed_text, text),
+                    )
+                    for text in texts
+                )
+            )
+        )
+
+
+class MistralEmbeddingProvider(_RemoteEmbeddingProvider):
+    """Embeddings of a Mistral embeddings model."""
+
+    model_id: str
+
+    def __init__(self, model_id: str):
+        super().__init__(AIProvider.MISTRAL, model_id)
+        self.model_id = model_id
+        self._client: Optional[Mistral] = None
+
+    def _get_client(self) -> Mistral:
+        # Built on the request loop, with its pooled HTTP client
+        if self._client is None:
+            self._client = Mistral(
+                api_key=Configuration().MISTRAL_API_KEY,
+                async_client=get_pooled_http_client(),
+                timeout_ms=120_000,
+                # Throttled requests are retried with an exponential backoff
+                retry_config=RetryConfig(
+                    "backoff", BackoffStrategy(1_000, 60_000, 2, 300_000), True
+                ),
+            )
+        return self._client
+
+    async def _embed_batch_async(self, texts: Sequence[str]) -> np.ndarray:
+        response = await self._send(
+            texts,
+            lambda: self._get_client().embeddings.create_async(
+                model=self.model_id, inputs=list(texts)
+            ),
+        )
+        data = sorted(response.data, key=lambda item: item.index or 0)
+        return np.array([item.embedding for item in data])
+
+
+class AzureEmbeddingProvider(_RemoteEmbeddingProvider):
+    """Embeddings of an Azure OpenAI embeddings deployment."""
+
+    deployment: str
+
+    def __init__(self, deployment: str):
+        super().__init__(AIProvider.AZURE, deployment)
+        configuration = Configuration()
+        if not (configuration.AZURE_API_BASE and configuration.AZURE_API_KEY):
+            raise ValueError("Azure OpenAI is not properly configured.")
+        self.deployment = deployment
+        self._client: Optional[AsyncOpenAI] = None
+
+    def _get_client(self) -> AsyncOpenAI:
+        # Built on the request loop, with its pooled HTTP client
+        if self._client is None:
+            configuration = Configuration()
+            self._client = AsyncOpenAI(
+                base_url=f"{configuration.AZURE_API_BASE.rstrip('/')}/openai/deployments/{self.deployment}/",
+                api_key=configuration.AZURE_API_KEY,
+                default_query={"api-version": configuration.AZURE_API_VERSION},
+                timeout=120,
+                max_retries=5,
+                http_client=get_pooled_http_client(),
+            )
+        return self._client
+
+    async def _embed_batch_async(self, texts: Sequence[str]) -> np.ndarray:
+        response = await self._send(
+            texts,
+            lambda: self._get_client().embeddings.create(
+                model=self.deployment, input=list(texts)
+            ),
+        )
+        data = sorted(response.data, key=lambda item: item.index)
+        return np.array([item.embedding for item in data])
+
+
+@functools.cache
+def get_embedding_provider() -> Optional[EmbeddingProvider]:
+    """Return the embedding provider of the configuration (None when embeddings are off)."""
+    configuration = Configuration()
+    kind = configuration.ALINA_EMBEDDINGS
+    if kind == "off":
+        return None
+    if kind == "local":
+        return HashingEmbeddingProvider()
+    model = configuration.ALINA_EMBEDDING_MODEL or _DEFAULT_MODELS[kind]
+    if kind == "bedrock":
+        return BedrockEmbeddingProvider(model)
+    elif kind == "mistral":
+        return MistralEmbeddingProvider(model)
+    else:
+        return AzureEmbeddingProvider(model)
+
+
+@functools.lru_cache(maxsize=256)
+def _embed_query(provider: EmbeddingProvider, query: str) -> np.ndarray:
+    # The same query is often searched in several referentials (skills and jobs)
+    vector = provider.embed([query])[0]
+    vector.flags.writeable = False
+    return vector
+
+
+def cosine_top_k(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    k: int,
+    rows: Optional[np.ndarray] = None,
+    batch_size: int = 8192,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return the k vectors closest to each query, best first, and their cosine similarity.
+
+    Vectors and queries are L2-normalized, so the similarity is a dot product.
+    When rows is given, only these rows of vectors are searched, and the
+    returned indices are positions in rows. The vectors are read by batches,
+    so a memory-mapped matrix is never loaded at once.
+    """
+    count = len(vectors) if rows is None else len(rows)
+    k = min(k, count)
+    best_indices = np.empty((len(queries), 0), dtype=np.int64)
+    best_scores = np.empty((len(queries), 0), dtype=np.float32)
+    for start in range(0, count, batch_size):
+        stop = min(start + batch_size, count)
+        batch = vectors[start:stop] if rows is None else vectors[rows[start:stop]]
+        indices = np.concatenate(
+            [
+                best_indices,
+                np.broadcast_to(np.arange(start, stop), (len(queries), stop - start)),
+            ],
+            axis=1,
+        )
+        scores = np.concatenate([best_scores, queries @ batch.T], axis=1)
+        if scores.shape[1] > k:
+            kept = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            indices = np.take_along_axis(indices, kept, axis=1)
+            scores = np.take_along_axis(scores, kept, axis=1)
+        best_indices, best_scores = indices, scores
+    order = np.argsort(-best_scores, axis=1, kind="stable")
+    return (
+        np.take_along_axis(best_indices, order, axis=1),
+        np.take_along_axis(best_scores, order, axis=1),
+    )
+
+
+def _hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+class EmbeddingStore:
+    """Embeddings of the items of a referential, stored in the workspace.
+
+    The vectors are a .npy matrix (one L2-normalized float32 row per item),
+    memory-mapped when loaded: searches read the rows they need from the page
+    cache instead of loading the matrix. The JSON index holds the provider of
+    the vectors and, for each row, the id of the item and the hash of its
+    text, so only new or modified items are embedded again.
+    """
+
+    provider: str
+    ids: list[str]
+    hashes: list[str]
+    vectors: np.ndarray
+
+    def __init__(
+        self, provider: str, ids: list[str], hashes: list[str], vectors: np.ndarray
+    ):
+        self.provider = provider
+        self.ids = ids
+        self.hashes = hashes
+        self.vectors = vectors
+
+    @classmethod
+    def load(cls, kind: str) -> Optional["EmbeddingStore"]:
+        workspace = get_workspace()
+        index_file = workspace.get_embeddings_index_file(kind)
+        vectors_file = workspace.get_embeddings_file(kind)
+        if not index_file.exists() or not vectors_file.exists():
+            return None
+        with open(index_file, encoding="utf-8") as f:
+            index = json.load(f)
+        vectors = np.load(vectors_file, mmap_mode="r")
+        if vectors.ndim != 2 or len(vectors) != len(index["ids"]):
+            logging.warning(f"The embeddings of the {kind} are inconsistent, ignored")
+            return None
+        return cls(index["provider"], index["ids"], index["hashes"], vectors)
+
+    def save(self, kind: str):
+        workspace = get_workspace()
+        index_file = workspace.get_embeddings_index_file(kind)
+        vectors_file = workspace.get_embeddings_file(kind)
+        vectors_file.parent.mkdir(parents=True, exist_ok=True)
+        # Replaced files keep the memory maps already open valid
+        temporary_vectors_file = vectors_file.with_suffix(".tmp.npy")
+        np.save(temporary_vectors_file, self.vectors)
+        os.replace(temporary_vectors_file, vectors_file)
+        temporary_index_file = index_file.with_suffix(".tmp")
+        with open(temporary_index_file, "w", encoding="utf-8") as f:
+            json.dump(
+                {"provider": self.provider, "ids": self.ids, "hashes": self.hashes}, f
+            )
+        os.replace(temporary_index_file, index_file)
+
+
+def update_embeddings(kind: str, items: Sequence[Any], describe: Callable[[Any], str]):
+    """Embed the new or modified items of a referential, and store their embeddings.
+
+    Items are identified by their id. Nothing is done when embeddings are off.
+    """
+    provider = get_embedding_provider()
+    if provider is None or not items:
+        return
+    store = EmbeddingStore.load(kind)
+    previous_rows: dict[tuple[str, str], int] = {}
+    if store is not None and store.provider == provider.name:
+        previous_rows = {
+            key: row for row, key in enumerate(zip(store.ids, store.hashes))
+        }
+    ids = [str(item.id) for item in items]
+    texts = [describe(item) for item in items]
+    hashes = [_hash_text(text) for text in texts]
+    rows = [previous_rows.get(key) for key in zip(ids, hashes)]
+    missing = [position for position, row in enumerate(rows) if row is None]
+    if store is not None and not missing and rows == list(range(len(store.ids))):
+        return
+    logging.info(
+        f"Embedding {len(missing)} new or modified {kind} out of {len(items)} with {provider.name}"
+    )
+    kept = [position for position, row in enumerate(rows) if row is not None]
+    new_vectors = (
+        provider.embed([texts[position] for position in missing]) if missing else None
+    )
+    dimension = (
+        new_vectors.shape[1] if new_vectors is not None else store.vectors.shape[1]
+    )
+    vectors = np.empty((len(items), dimension), dtype=np.float32)
+    if kept:
+        vectors[kept] = store.vectors[[rows[position] for position in kept]]
+    if new_vectors is not None:
+        vectors[missing] = new_vectors
+    EmbeddingStore(provider.name, ids, hashes, vectors).save(kind)
+
+
+# Stored embeddings loaded once, and again when their files are replaced
+_stores: Dict[str, tuple[Any, Optional[EmbeddingStore]]] = {}
+_stores_lock = threading.Lock()
+
+
+def _get_store_stamp(kind: str) -> Optional[tuple[int, int, int, int]]:
+    workspace = get_workspace()
+    try:
+        index_stat = workspace.get_embeddings_index_file(kind).stat()
+        vectors_stat = workspace.get_embeddings_file(kind).stat()
+    except FileNotFoundError:
+        return None
+    return (
+        index_stat.st_mtime_ns,
+        index_stat.st_size,
+        vectors_stat.st_mtime_ns,
+        vectors_stat.st_size,
+    )
+
+
+def _get_store(kind: str) -> Optional[EmbeddingStore]:
+    stamp = _get_store_stamp(kind)
+    if stamp is None:
+        return None
+    with _stores_lock:
+        cached = _stores.get(kind)
+        if cached is None or cached[0] != stamp:
+            cached = (stamp, EmbeddingStore.load(kind))
+            _stores[kind] = cached
+        return cached[1]
+
+
+class ItemVectors:
+    """Stored embeddings of a sequence of items, searched by position of the items."""
+
+    def __init__(
+        self, provider: EmbeddingProvider, store: EmbeddingStore, rows: np.ndarray
+    ):
+        self._provider = provider
+        self._store = store
+        # Row of the embedding of each item, -1 for the items without embedding
+        self._rows = rows
+
+    def search(
+        self, query: str, k: int, allowed: Optional[set[int]] = None
+    ) -> list[int]:
+        """Return the positions of the k items closest to the query, best first.
+
+        When allowed is given, only these positions are considered.
+        """
+        positions = np.flatnonzero(self._rows >= 0)
+        if allowed is not None:
+            positions = positions[
+                np.isin(positions, np.fromiter(allowed, dtype=np.int64))
+            ]
+        if not len(positions) or not query.strip():
+            return []
+        indices, _ = cosine_top_k(
+            self._store.vectors,
+            _embed_query(self._provider, query)[np.newaxis, :],
+            k,
+            rows=self._rows[positions],
+        )
+        return positions[indices[0]].tolist()
+
+
+def get_item_vectors(
+    kind: str, items: Sequence[Any], describe: Callable[[Any], str]
+) -> Optional[ItemVectors]:
+    """Return the stored embeddings of the items of a referential.
+
+    describe must give the texts the embeddings were computed from (see
+    update_embeddings): items whose text changed since, like the items
+    without embedding, are only ranked lexically. Returns None when
+    embeddings are off, or were not computed by the provider of the
+    configuration.
+    """
+    provider = get_embedding_provider()
+    if provider is None:
+        return None
+    store = _get_store(kind)
+    if store is None or store.provider != provider.name:
+        logging.warning(
+            f"No embeddings of the {kind} computed with {provider.name}, only lexical retrieval is used"
+        )
+        return None
+    rows_by_key = {key: row for row, key in enumerate(zip(store.ids, store.hashes))}
+    rows = np.array(
+        [
+            rows_by_key.get((str(item.id), _hash_text(describe(item))), -1)
+            for item in items
+        ],
+        dtype=np.int64,
+    )
+    missing = int((rows < 0).sum())
+    if missing:
+        logging.warning(
+            f"{missing} {kind} have no embeddings or outdated ones, they are only ranked lexically"
+        )
+    return ItemVectors(provider, store, rows)
@@ -1,10 +1,26 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any, Callable, Optional, Sequence, TypeVar
 
+from alina.services.chat.ai.persona import get_conversation_quota
 from alina.services.chat.base.interview import BaseInterviewer
-from alina.services.chat.base.persona import BasePersonaChatter, Conversation, Role
+from alina.services.chat.base.persona import (
+    BaseAsyncPersonaChatter,
+    BasePersonaChatter,
+    Conversation,
+    ConversationMessage,
+    Role,
+)
 from alina.services.utils.ai import AIProvider, get_ai_manager
+from alina.services.utils.aws import get_challenge_api_client
+from alina.shared.checkpoint import CheckpointLog
+from alina.shared.executor import ItemResult, run_concurrently
 from alina.shared.workspace import Workspace
 
+T = TypeVar("T")
+
 
 def summarize(interview_content: str, ai: AIProvider) -> str:
     ai_manager = get_ai_manager(ai)
@@ -27,3 +43,246 @@ def write_interview(path: Path, conversation: Conversation):
                 f.write(f"**Assistant:** {msg.content}\n\n")
             else:
                 f.write(f"**User:** {msg.content}\n\n")
+
+
+class InterviewJournal:
+    """Per-turn checkpoint of an interview, to resume it if it is interrupted.
+
+    After each turn, the journal records the conversation id, the messages of
+    the interviewer agent (and the count of the older messages replaced by
+    their digest) and the chat messages. Resuming restores the state of the
+    last recorded turn, and continues the same conversation with the
+    persona, without starting (and counting) a new one.
+    """
+
+    def __init__(self, file_path: Path):
+        self._log = CheckpointLog(file_path)
+
+    def record(self, interviewer: BaseInterviewer, conversation: Conversation):
+        document = {
+            "conversation_id": conversation.handler,
+            "persona_identifier": conversation.persona_identifier,
+            "week_counter": conversation.week_counter,
+            "agent_messages": interviewer.get_messages(),
+            "removed_message_count": interviewer.get_removed_message_count(),
+            "chat_messages": [
+                {"role": message.role.value, "content": message.content}
+                for message in conversation.messages
+            ],
+        }
+        self._log.append("conversation", json.dumps(document, ensure_ascii=False))
+
+    def restore(self, interviewer: BaseInterviewer) -> Optional[Conversation]:
+        """Restore the interviewer from the last recorded turn, and return the conversation (None without journal)."""
+        document = self._log.replay().get("conversation")
+        if document is None:
+            return None
+        interviewer.restore_messages(
+            document["agent_messages"], document.get("removed_message_count", 0)
+        )
+        conversation = Conversation(
+            document["persona_identifier"], handler=document["conversation_id"]
+        )
+        conversation.week_counter = document["week_counter"]
+        conversation.messages = [
+            ConversationMessage(role=Role(message["role"]), content=message["content"])
+            for message in document["chat_messages"]
+        ]
+        return conversation
+
+    def remove(self):
+        self._log.remove()
+
+
+class InterviewTask:
+    """An interview to run: prepare builds the interviewer and the persona chatter.
+
+    With a journal file, each turn of the interview is recorded in it.
+    """
+
+    persona_id: int
+    transcript_file: Path
+    prepare: Callable[
+        [], tuple[BaseInterviewer, BasePersonaChatter | BaseAsyncPersonaChatter]
+    ]
+    journal_file: Optional[Path]
+
+    def __init__(
+        self,
+        persona_id: int,
+        transcript_file: Path,
+        prepare: Callable[
+            [], tuple[BaseInterviewer, BasePersonaChatter | BaseAsyncPersonaChatter]
+        ],
+        journal_file: Optional[Path] = None,
+    ):
+        self.persona_id = persona_id
+        self.transcript_file = transcript_file
+        self.prepare = prepare
+        self.journal_file = journal_file
+
+    def __str__(self) -> str:
+        return f"interview of persona #{self.persona_id}"
+
+
+class InterviewOrchestrator:
+    """Run several persona interviews at once.
+
+    Each interview has its own interviewer (and so its own agent). Interviewers
+    and synchronous persona chatters are blocking, so their calls run in a
+    thread pool; asynchronous chatters run on the event loop. The concurrent
+    calls to the LLM and to the chat API are bounded separately. No interview
+    starts once the weekly conversation quota is reached. An interview ends
+    after max_messages, or as soon as the interviewer has all the details it
+    needs, and its transcript is written right away.
+
+    Each turn is recorded in the journal of the task. With resume, an
+    interrupted interview continues from its last recorded turn; otherwise
+    its journal is discarded and the interview starts over.
+    """
+
+    parallel_interviews: int
+    max_messages: int
+    resume: bool
+
+    def __init__(
+        self,
+        parallel_interviews: int,
+        llm_concurrency: int,
+        chat_concurrency: int,
+        max_messages: int = 20,
+        resume: bool = False,
+    ):
+        self.parallel_interviews = parallel_interviews
+        self.max_messages = max_messages
+        self.resume = resume
+        self._llm_calls = asyncio.Semaphore(llm_concurrency)
+        self._chat_calls = asyncio.Semaphore(chat_concurrency)
+        self._quota_probe = asyncio.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=min(parallel_interviews, llm_concurrency + chat_concurrency),
+            thread_name_prefix="interview",
+        )
+
+    async def _call(
+        self, semaphore: asyncio.Semaphore, function: Callable[..., T], *args
+    ) -> T:
+        async with semaphore:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, function, *args
+            )
+
+    async def _chat(
+        self,
+        persona_chatter: BasePersonaChatter | BaseAsyncPersonaChatter,
+        function: Callable[..., Any],
+        *args,
+    ) -> Any:
+        if isinstance(persona_chatter, BaseAsyncPersonaChatter):
+            async with self._chat_calls:
+                return await function(*args)
+        return await self._call(self._chat_calls, function, *args)
+
+    async def _start_conversation(
+        self,
+        task: InterviewTask,
+        interviewer: BaseInterviewer,
+        persona_chatter: BasePersonaChatter | BaseAsyncPersonaChatter,
+    ) -> Optional[Conversation]:
+        quota = get_conversation_quota()
+        if not quota.reserve():
+            raise RuntimeError(
+                f"Weekly conversation limit ({quota.weekly_limit}) reached, interview not started"
+            )
+        try:
+            interview_details = await self._call(
+                self._llm_calls, interviewer.start_conversation
+            )
+            return await self._chat(
+                persona_chatter,
+                persona_chatter.start_conversation,
+                task.persona_id,
+                interview_details.next_message,
+            )
+        finally:
+            quota.release()
+
+    async def _start(
+        self,
+        task: InterviewTask,
+        interviewer: BaseInterviewer,
+        persona_chatter: BasePersonaChatter | BaseAsyncPersonaChatter,
+    ) -> Optional[Conversation]:
+        quota = get_conversation_quota()
+        if quota.weekly_limit and quota.conversation_count_week is None:
+            # The count of the week is only known from a chat response: start
+            # conversations one at a time until it is
+            async with self._quota_probe:
+                if quota.conversation_count_week is None:
+                    return await self._start_conversation(
+                        task, interviewer, persona_chatter
+                    )
+        return await self._start_conversation(task, interviewer, persona_chatter)
+
+    async def _interview(self, task: InterviewTask) -> Optional[Conversation]:
+        print(f"Interviewing persona #{task.persona_id}")
+        # Preparing may call the LLM (e.g. to summarize a previous interview)
+        interviewer, persona_chatter = await self._call(self._llm_calls, task.prepare)
+        journal = InterviewJournal(task.journal_file) if task.journal_file else None
+        conversation = None
+        if journal and self.resume:
+            conversation = journal.restore(interviewer)
+        elif journal:
+            journal.remove()
+        if conversation:
+            print(
+                f"Resuming interview of persona #{task.persona_id} after {len(conversation.messages) // 2} messages"
+            )
+        else:
+            conversation = await self._start(task, interviewer, persona_chatter)
+            if conversation and journal:
+                journal.record(interviewer, conversation)
+        try:
+            while conversation and len(conversation.messages) < self.max_messages:
+                print(
+                    f" #{task.persona_id}: {len(conversation.messages) // 2} messages exchanged..."
+                )
+                interview_details = await self._call(
+                    self._llm_calls,
+                    interviewer.send_message,
+                    conversation.messages[-1].content,
+                )
+                if interviewer.is_complete():
+                    # The details are stable, the interview ends before the next question
+                    break
+                await self._chat(
+                    persona_chatter,
+                    persona_chatter.send_message,
+                    conversation,
+                    interview_details.next_message,
+                )
+                if journal:
+                    journal.record(interviewer, conversation)
+        finally:
+            await self._call(self._llm_calls, interviewer.close)
+
+        if conversation:
+            print(f"Interview with persona #{task.persona_id} completed.")
+            write_interview(task.transcript_file, conversation)
+            if journal:
+                journal.remove()
+        return conversation
+
+    async def run(self, tasks: Sequence[InterviewTask]) -> list[ItemResult]:
+        """Run the interviews, a failed interview does not stop the others."""
+        try:
+            # The chat requests of all the interviews share a connection pool
+            async with get_challenge_api_client().async_session():
+                return await run_concurrently(
+                    tasks,
+                    self._interview,
+                    self.parallel_interviews,
+                    description="interviews",
+                )
+        finally:
+            self._executor.shutdown(wait=False)
@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Optional
+
+from strands.types.exceptions import ModelThrottledException
+
+# Concurrency is decreased when the average latency exceeds its baseline by this factor
+_LATENCY_TOLERANCE = 2.0
+_LATENCY_SMOOTHING = 0.2
+_THROTTLING_DECREASE = 0.5
+_LATENCY_DECREASE = 0.9
+
+
+class TokenBucket:
+    """Rate limit of a quantity (requests, tokens) per minute.
+
+    Reservations are granted in order: a request that exceeds the available
+    tokens drives the bucket negative, and waits until it is refilled.
+    """
+
+    per_minute: int
+
+    def __init__(self, per_minute: int):
+        self.per_minute = per_minute
+        self._tokens = float(per_minute)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, amount: int) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.per_minute,
+                self._tokens + (now - self._updated) * self.per_minute / 60,
+            )
+            self._updated = now
+            # A request larger than the bucket only waits for a full bucket
+            self._tokens -= min(amount, self.per_minute)
+            if self._tokens >= 0:
+                return 0
+            return -self._tokens * 60 / self.per_minute
+
+    async def acquire(self, amount: int = 1):
+        delay = self._reserve(amount)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class AdaptiveLimiter:
+    """Rate and concurrency limiter of the requests sent to one model.
+
+    Requests per minute and tokens per minute are limited by token buckets (0
+    disables them). The number of concurrent requests adapts AIMD-style: it
+    grows by one after a full window of successful requests, and is cut when
+    the model throttles or when its latency grows well above its baseline.
+    The limiter can be shared by threads and event loops.
+    """
+
+    name: str
+    max_concurrency: int
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+    ):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self._requests = (
+            TokenBucket(requests_per_minute) if requests_per_minute else None
+        )
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._limit = float(max_concurrency)
+        self._in_flight = 0
+        self._waiters: Deque[Future] = deque()
+        self._latency: Optional[float] = None
+        self._baseline_latency: Optional[float] = None
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def concurrency(self) -> int:
+        return max(1, int(self._limit))
+
+    def _wake_waiters(self):
+        # Must be called with the lock held
+        while self._waiters and self._in_flight < self.concurrency:
+            waiter = self._waiters.popleft()
+            if waiter.set_running_or_notify_cancel():
+                self._in_flight += 1
+                waiter.set_result(None)
+
+    async def _acquire_slot(self):
+        with self._lock:
+            if not self._waiters and self._in_flight < self.concurrency:
+                self._in_flight += 1
+                return
+            waiter: Future = Future()
+            self._waiters.append(waiter)
+        try:
+            await asyncio.wrap_future(waiter)
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was granted while the task was being cancelled
+                self._release_slot()
+            raise
+
+    def _release_slot(self):
+        with self._lock:
+            self._in_flight -= 1
+            self._wake_waiters()
+
+    def _decrease(self, factor: float, reason: str):
+        # Must be called with the lock held. Decrease at most once per latency
+        # period, so a burst of failures of the same window counts once.
+        now = time.monotonic()
+        if now - self._last_decrease < (self._latency or 1.0):
+            return
+        self._last_decrease = now
+        previous = self.concurrency
+        self._limit = max(1.0, self._limit * factor)
+        if self.concurrency != previous:
+            logging.info(
+                f"{self.name}: {reason}, concurrency reduced from {previous} to {self.concurrency}"
+            )
+
+    def _on_success(self, latency: float):
+        with self._lock:
+            if self._latency is None:
+                self._latency = latency
+            else:
+                self._latency += _LATENCY_SMOOTHING * (latency - self._latency)
+            if self._baseline_latency is None:
+                self._baseline_latency = self._latency
+            else:
+                # Let the baseline drift up slowly, in case the model got slower for good
+                self._baseline_latency = min(
+                    self._latency, self._baseline_latency * 1.01
+                )
+            if self._latency > _LATENCY_TOLERANCE * self._baseline_latency:
+                self._decrease(_LATENCY_DECREASE, "latency is growing")
+            elif self._limit < self.max_concurrency:
+                self._limit = min(self.max_concurrency, self._limit + 1 / self._limit)
+            self._wake_waiters()
+
+    def _on_throttled(self):
+        with self._lock:
+            self._decrease(_THROTTLING_DECREASE, "requests throttled")
+
+    @asynccontextmanager
+    async def request(self, tokens: int = 0) -> AsyncIterator[None]:
+        """Wait for the rate limits and a concurrency slot to send a request."""
+        if self._requests is not None:
+            await self._requests.acquire()
+        if self._tokens is not None and tokens:
+            await self._tokens.acquire(tokens)
+        await self._acquire_slot()
+        start = time.monotonic()
+        try:
+            yield
+        except ModelThrottledException:
+            self._on_throttled()
+            raise
+        else:
+            self._on_success(time.monotonic() - start)
+        finally:
+            self._release_slot()
@@ -0,0 +1,203 @@
+import heapq
+import logging
+import math
+import threading
+from array import array
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, Generic, Optional, Sequence, TypeVar
+
+from alina.services.utils.embedding import ItemVectors, get_item_vectors
+from alina.services.utils.text import tokenize
+
+T = TypeVar("T")
+
+
+class LexicalIndex:
+    """BM25 index of a collection of short documents (skills, jobs, trainings).
+
+    The BM25 weights are computed once, as a sparse term × document matrix:
+    each term keeps the positions of its documents and their weights, so a
+    query only sums the columns of its terms. search returns the positions of
+    the documents that best match a query; documents sharing no term with the
+    query are never returned.
+    """
+
+    k1: float
+    b: float
+
+    def __init__(self, documents: Sequence[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        term_counts = [Counter(tokenize(document)) for document in documents]
+        lengths = [sum(counts.values()) for counts in term_counts]
+        average_length = sum(lengths) / len(lengths) if lengths else 0
+        postings: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        for position, counts in enumerate(term_counts):
+            for term, count in counts.items():
+                postings[term].append((position, count))
+
+        self._size = len(documents)
+        self._positions: dict[str, array] = {}
+        self._weights: dict[str, array] = {}
+        for term, term_postings in postings.items():
+            idf = math.log(
+                1 + (self._size - len(term_postings) + 0.5) / (len(term_postings) + 0.5)
+            )
+            self._positions[term] = array("i", (p for p, _ in term_postings))
+            self._weights[term] = array(
+                "d",
+                (
+                    idf
+                    * count
+                    * (k1 + 1)
+                    / (
+                        count
+                        + k1 * (1 - b + b * lengths[position] / (average_length or 1))
+                    )
+                    for position, count in term_postings
+                ),
+            )
+
+    def __len__(self) -> int:
+        return self._size
+
+    def search(
+        self, query: str, k: int, allowed: Optional[set[int]] = None
+    ) -> list[int]:
+        """Return the positions of the k best documents for the query, best first.
+
+        When allowed is given, only these positions are considered.
+        """
+        scores: dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            positions = self._positions.get(term)
+            if positions is None:
+                continue
+            for position, weight in zip(positions, self._weights[term]):
+                if allowed is None or position in allowed:
+                    scores[position] += weight
+        # Ties are broken by position, so results are stable
+        return heapq.nsmallest(
+            k, scores, key=lambda position: (-scores[position], position)
+        )
+
+
+# Constant of the reciprocal rank fusion, which damps the weight of the first ranks
+_FUSION_CONSTANT = 60
+
+
+def _fuse(rankings: Sequence[list[int]], k: int) -> list[int]:
+    scores: dict[int, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, position in enumerate(ranking):
+            scores[position] += 1 / (_FUSION_CONSTANT + rank + 1)
+    return heapq.nsmallest(
+        k, scores, key=lambda position: (-scores[position], position)
+    )
+
+
+class CandidateIndex(Generic[T]):
+    """Index of referential items, to pre-select the candidates given to the LLM.
+
+    Items are ranked by BM25 and, when their embeddings are given, by the
+    cosine similarity of their embeddings: both rankings are merged by
+    reciprocal rank fusion. Items are identified by their id.
+    """
+
+    items: Sequence[T]
+    vectors: Optional[ItemVectors]
+
+    def __init__(
+        self,
+        items: Sequence[T],
+        describe: Callable[[T], str],
+        vectors: Optional[ItemVectors] = None,
+    ):
+        self.items = items
+        self.index = LexicalIndex([describe(item) for item in items])
+        self.vectors = vectors
+        self._positions = {item.id: position for position, item in enumerate(items)}
+
+    def search(
+        self, query: str, k: int, allowed: Optional[set[int]] = None
+    ) -> list[int]:
+        """Return the positions of the k items that best match the query, best first.
+
+        When allowed is given, only these positions are considered.
+        """
+        lexical = self.index.search(query, k, allowed)
+        if self.vectors is None:
+            return lexical
+        try:
+            semantic = self.vectors.search(query, k, allowed)
+        except Exception as e:
+            logging.warning(f"Query embedding failed, lexical retrieval only: {e}")
+            return lexical
+        return _fuse([lexical, semantic], k)
+
+    def top(
+        self, query: str, k: int, candidates: Optional[Sequence[T]] = None
+    ) -> list[T]:
+        """Return the k candidates (all the items by default) that best match the query.
+
+        Candidates matching no term of the query complete the list when there
+        are fewer than k matches. The candidates keep their order, so prompts
+        built from them stay stable. Candidates are matched to the items by
+        id, so they may come from another read of the referential: the ones
+        missing from the index only complete the list.
+        """
+        if candidates is None:
+            candidates = self.items
+        if len(candidates) <= k:
+            return list(candidates)
+        allowed = {
+            self._positions[candidate.id]
+            for candidate in candidates
+            if candidate.id in self._positions
+        }
+        selected = {
+            self.items[position].id for position in self.search(query, k, allowed)
+        }
+        for candidate in candidates:
+            if len(selected) >= k:
+                break
+            selected.add(candidate.id)
+        return [candidate for candidate in candidates if candidate.id in selected]
+
+
+# One index per kind of referential, replaced when the referential changes
+_indexes: Dict[str, tuple[Any, CandidateIndex]] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_candidate_index(
+    kind: str,
+    items: Sequence[T],
+    describe: Callable[[T], str],
+    embeddings: Optional[str] = None,
+    stamp: Any = None,
+) -> CandidateIndex[T]:
+    """Return the index of a referential.
+
+    embeddings names the stored embeddings of the items (jobs, trainings or
+    skills), used when embeddings are enabled: describe must then be the
+    description they were computed from. stamp identifies the content
+    of the referential (see get_referential_stamp): the index is built once
+    per stamp, and replaced when the stamp changes. Without stamp, the index
+    is built for these items only.
+    """
+    if stamp is None:
+        return _build_candidate_index(items, describe, embeddings)
+    with _indexes_lock:
+        cached = _indexes.get(kind)
+        if cached is None or cached[0] != stamp:
+            cached = (stamp, _build_candidate_index(items, describe, embeddings))
+            _indexes[kind] = cached
+        return cached[1]
+
+
+def _build_candidate_index(
+    items: Sequence[T], describe: Callable[[T], str], embeddings: Optional[str]
+) -> CandidateIndex[T]:
+    vectors = get_item_vectors(embeddings, items, describe) if embeddings else None
+    return CandidateIndex(items, describe, vectors)
@@ -0,0 +1,25 @@
+import re
+import unicodedata
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Frequent English and Portuguese words, which do not discriminate documents
+_STOP_WORDS = frozenset(
+    """
+    a an and are as at be by for from has have in is it its of on or that the
+    their they this to was were will with you your i am my me we our
+    o os as um uma uns umas e de do da dos das em no na nos nas por para com
+    que se ao aos eu meu minha sou tenho
+    """.split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Split a text into lowercase terms, without accents nor stop words."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return [
+        token
+        for token in _TOKEN_PATTERN.findall(text)
+        if len(token) > 1 and token not in _STOP_WORDS
+    ]
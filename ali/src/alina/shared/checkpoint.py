@@ -0,0 +1,67 @@
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import IO, Any, Dict, Optional
+
+
+class CheckpointLog:
+    """Append-only JSON Lines log of the progress of a command.
+
+    Each line holds the (key, JSON document) of one processed item. Replaying
+    the log keeps the last document of each key, so an interrupted command can
+    resume where it stopped. The log is removed once the command has written
+    its final artifacts.
+    """
+
+    file_path: Path
+
+    def __init__(self, file_path: Path):
+        self.file_path = file_path
+        self._file: Optional[IO[str]] = None
+        self._lock = threading.Lock()
+
+    def append(self, key: str, document: str):
+        """Append the JSON document of an item (the document must be a single line)."""
+        line = f'{{"key": {json.dumps(key)}, "data": {document}}}\n'
+        with self._lock:
+            if self._file is None:
+                self.file_path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.file_path, "a", encoding="utf-8")
+                if self._file.tell() > 0 and not self._ends_with_newline():
+                    # Do not glue the new record to a truncated one
+                    self._file.write("\n")
+            self._file.write(line)
+            self._file.flush()
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.file_path, "rb") as file:
+            file.seek(-1, 2)
+            return file.read(1) == b"\n"
+
+    def replay(self) -> Dict[str, Any]:
+        """Return the last decoded document of each key, in order of first appearance."""
+        items: Dict[str, Any] = {}
+        if not self.file_path.exists():
+            return items
+        with open(self.file_path, "r", encoding="utf-8") as file:
+            for line_number, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A line can be truncated if the command was killed while writing it
+                    logging.warning(
+                        f"Ignoring invalid line {line_number} of {self.file_path}"
+                    )
+                    continue
+                items[record["key"]] = record["data"]
+        return items
+
+    def remove(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self.file_path.unlink(missing_ok=True)
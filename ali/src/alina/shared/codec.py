@@ -0,0 +1,144 @@
+import gzip
+import json
+import logging
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+# Optional native backends, the standard library is used when they are missing
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    try:
+        import zstandard as zstd
+    except ImportError:
+        zstd = None
+
+COMPRESSION_SUFFIXES = {
+    "none": "",
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+
+
+def _compress(data: bytes, compression: str) -> bytes:
+    if compression == "gzip":
+        return gzip.compress(data, compresslevel=6)
+    if compression == "zstd":
+        return zstd.compress(data)
+    return data
+
+
+def _decompress(data: bytes, file_path: Path) -> bytes:
+    if file_path.suffix == ".gz":
+        return gzip.decompress(data)
+    if file_path.suffix == ".zst":
+        if zstd is None:
+            raise RuntimeError(
+                f"Cannot read {file_path}: install zstandard to read zstd files"
+            )
+        return zstd.decompress(data)
+    return data
+
+
+class JsonCodec:
+    """Encoding of the workspace JSON files.
+
+    The indented format is always written by the standard library, so files stay
+    byte-identical to the ones written so far: files that were written with
+    their non-ASCII characters escaped are saved with ensure_ascii. The
+    compact format, and all
+    decoding, use orjson when it is installed. Files can be compressed (gzip or
+    zstd), in which case the compression suffix is added to their name.
+    """
+
+    backend: str
+    compact: bool
+    compression: str
+
+    def __init__(
+        self,
+        backend: str = "auto",
+        compact: bool = False,
+        compression: str = "none",
+        default: Optional[Callable[[Any], Any]] = None,
+    ):
+        if backend == "auto":
+            backend = "orjson" if orjson is not None else "json"
+        elif backend == "orjson" and orjson is None:
+            logging.warning("orjson is not installed, using the json module")
+            backend = "json"
+        if compression == "zstd" and zstd is None:
+            logging.warning("zstandard is not installed, using gzip compression")
+            compression = "gzip"
+        self.backend = backend
+        self.compact = compact
+        self.compression = compression
+        self._default = default
+
+    def encode(
+        self, value: Any, compact: Optional[bool] = None, ensure_ascii: bool = False
+    ) -> bytes:
+        if compact is None:
+            compact = self.compact
+        if not compact:
+            return json.dumps(
+                value, ensure_ascii=ensure_ascii, indent=4, default=self._default
+            ).encode("utf-8")
+        if self.backend == "orjson":
+            return orjson.dumps(
+                value, default=self._default, option=orjson.OPT_NON_STR_KEYS
+            )
+        return json.dumps(
+            value,
+            ensure_ascii=ensure_ascii,
+            separators=(",", ":"),
+            default=self._default,
+        ).encode("utf-8")
+
+    def decode(self, data: bytes | str) -> Any:
+        if self.backend == "orjson":
+            return orjson.loads(data)
+        return json.loads(data)
+
+    def get_file(self, file_path: Path) -> Path:
+        """Return the path of a file written with the configured compression."""
+        suffix = COMPRESSION_SUFFIXES[self.compression]
+        return file_path.with_name(file_path.name + suffix)
+
+    def find_file(self, file_path: Path) -> Optional[Path]:
+        """Return the existing variant (plain or compressed) of a file, if any."""
+        preferred = self.get_file(file_path)
+        if preferred.exists():
+            return preferred
+        for suffix in COMPRESSION_SUFFIXES.values():
+            candidate = file_path.with_name(file_path.name + suffix)
+            if candidate.exists():
+                return candidate
+        return None
+
+    def save(self, value: Any, file_path: Path, ensure_ascii: bool = False) -> Path:
+        target = self.get_file(file_path)
+        with open(target, "wb") as file:
+            file.write(
+                _compress(
+                    self.encode(value, ensure_ascii=ensure_ascii), self.compression
+                )
+            )
+        # Only keep one variant of each file
+        for suffix in COMPRESSION_SUFFIXES.values():
+            candidate = file_path.with_name(file_path.name + suffix)
+            if candidate != target:
+                candidate.unlink(missing_ok=True)
+        return target
+
+    def load(self, file_path: Path) -> Any:
+        found = self.find_file(file_path)
+        if found is None:
+            raise FileNotFoundError(f"File not found: {file_path}")
+        with open(found, "rb") as file:
+            return self.decode(_decompress(file.read(), found))
@@ -25,6 +25,47 @@ class Configuration:
     AZURE_API_VERSION: str
     AZURE_DEPLOYMENT_NAME: str
 
+    # Preferences for the workspace storage ("json" files or "sqlite" database)
+    ALINA_STORE: str
+
+    # Preferences for the workspace JSON files
+    ALINA_JSON_BACKEND: str
+    ALINA_JSON_FORMAT: str
+    ALINA_JSON_COMPRESSION: str
+
+    # Maximum number of concurrent LLM requests
+    ALINA_LLM_CONCURRENCY: int
+
+    # Maximum number of concurrent requests to the challenge chat API
+    ALINA_CHAT_CONCURRENCY: int
+
+    # Weekly limit of conversations with the personas (0 when unknown)
+    ALINA_CHAT_WEEKLY_LIMIT: int
+
+    # Preferences for the requests to the challenge API
+    ALINA_API_TIMEOUT: float
+    ALINA_API_MAX_ATTEMPTS: int
+
+    # Quotas of the LLM provider (0 when unknown)
+    ALINA_LLM_REQUESTS_PER_MINUTE: int
+    ALINA_LLM_TOKENS_PER_MINUTE: int
+
+    # Preferences for the LLM response cache
+    ALINA_LLM_CACHE: bool
+    ALINA_LLM_CACHE_TTL: int
+    ALINA_LLM_CACHE_MAX_MB: int
+
+    # Jobs and trainings pre-selected for each LLM recommendation (0 sends them all)
+    ALINA_SUGGEST_CANDIDATES: int
+
+    # Extraction of the interview details ("inline" with the next question, or in the "background")
+    ALINA_INTERVIEW_EXTRACTION: str
+
+    # Embeddings of the referentials, for the candidate retrieval ("off", "local", "bedrock", "mistral" or "azure")
+    ALINA_EMBEDDINGS: str
+    # Embedding model (Azure deployment) of the provider, its default model when empty
+    ALINA_EMBEDDING_MODEL: str
+
     def __init__(self):
         self.AWS_BASE_URL = os.getenv("AWS_BASE_URL", "")
         if not self.AWS_BASE_URL:
@@ -54,6 +95,121 @@ class Configuration:
         self.AZURE_API_VERSION = os.getenv("AZURE_API_VERSION", "")
         self.AZURE_DEPLOYMENT_NAME = os.getenv("AZURE_DEPLOYMENT_NAME", "")
 
+        self.ALINA_STORE = os.getenv("ALINA_STORE", "json").lower()
+        if self.ALINA_STORE not in ("json", "sqlite"):
+            raise ValueError("ALINA_STORE environment variable must be json or sqlite")
+
+        self.ALINA_JSON_BACKEND = os.getenv("ALINA_JSON_BACKEND", "auto").lower()
+        if self.ALINA_JSON_BACKEND not in ("auto", "orjson", "json"):
+            raise ValueError(
+                "ALINA_JSON_BACKEND environment variable must be auto, orjson or json"
+            )
+        self.ALINA_JSON_FORMAT = os.getenv("ALINA_JSON_FORMAT", "indented").lower()
+        if self.ALINA_JSON_FORMAT not in ("indented", "compact"):
+            raise ValueError(
+                "ALINA_JSON_FORMAT environment variable must be indented or compact"
+            )
+        self.ALINA_JSON_COMPRESSION = os.getenv(
+            "ALINA_JSON_COMPRESSION", "none"
+        ).lower()
+        if self.ALINA_JSON_COMPRESSION not in ("none", "gzip", "zstd"):
+            raise ValueError(
+                "ALINA_JSON_COMPRESSION environment variable must be none, gzip or zstd"
+            )
+
+        try:
+            self.ALINA_LLM_CONCURRENCY = int(os.getenv("ALINA_LLM_CONCURRENCY", "10"))
+        except ValueError:
+            raise ValueError(
+                "ALINA_LLM_CONCURRENCY environment variable must be an integer"
+            )
+        if self.ALINA_LLM_CONCURRENCY < 1:
+            raise ValueError(
+                "ALINA_LLM_CONCURRENCY environment variable must be at least 1"
+            )
+
+        try:
+            self.ALINA_CHAT_CONCURRENCY = int(os.getenv("ALINA_CHAT_CONCURRENCY", "5"))
+        except ValueError:
+            raise ValueError(
+                "ALINA_CHAT_CONCURRENCY environment variable must be an integer"
+            )
+        if self.ALINA_CHAT_CONCURRENCY < 1:
+            raise ValueError(
+                "ALINA_CHAT_CONCURRENCY environment variable must be at least 1"
+            )
+
+        try:
+            self.ALINA_CHAT_WEEKLY_LIMIT = int(
+                os.getenv("ALINA_CHAT_WEEKLY_LIMIT", "0")
+            )
+        except ValueError:
+            raise ValueError(
+                "ALINA_CHAT_WEEKLY_LIMIT environment variable must be an integer"
+            )
+
+        try:
+            self.ALINA_API_TIMEOUT = float(os.getenv("ALINA_API_TIMEOUT", "120"))
+            self.ALINA_API_MAX_ATTEMPTS = int(os.getenv("ALINA_API_MAX_ATTEMPTS", "3"))
+        except ValueError:
+            raise ValueError(
+                "ALINA_API_TIMEOUT and ALINA_API_MAX_ATTEMPTS environment variables must be numbers"
+            )
+        if self.ALINA_API_MAX_ATTEMPTS < 1:
+            raise ValueError(
+                "ALINA_API_MAX_ATTEMPTS environment variable must be at least 1"
+            )
+
+        try:
+            self.ALINA_LLM_REQUESTS_PER_MINUTE = int(
+                os.getenv("ALINA_LLM_REQUESTS_PER_MINUTE", "0")
+            )
+            self.ALINA_LLM_TOKENS_PER_MINUTE = int(
+                os.getenv("ALINA_LLM_TOKENS_PER_MINUTE", "0")
+            )
+        except ValueError:
+            raise ValueError(
+                "ALINA_LLM_REQUESTS_PER_MINUTE and ALINA_LLM_TOKENS_PER_MINUTE environment variables must be integers"
+            )
+
+        llm_cache = os.getenv("ALINA_LLM_CACHE", "on").lower()
+        if llm_cache not in ("on", "off"):
+            raise ValueError("ALINA_LLM_CACHE environment variable must be on or off")
+        self.ALINA_LLM_CACHE = llm_cache == "on"
+        try:
+            self.ALINA_LLM_CACHE_TTL = int(os.getenv("ALINA_LLM_CACHE_TTL", "604800"))
+            self.ALINA_LLM_CACHE_MAX_MB = int(
+                os.getenv("ALINA_LLM_CACHE_MAX_MB", "256")
+            )
+        except ValueError:
+            raise ValueError(
+                "ALINA_LLM_CACHE_TTL and ALINA_LLM_CACHE_MAX_MB environment variables must be integers"
+            )
+
+        try:
+            self.ALINA_SUGGEST_CANDIDATES = int(
+                os.getenv("ALINA_SUGGEST_CANDIDATES", "30")
+            )
+        except ValueError:
+            raise ValueError(
+                "ALINA_SUGGEST_CANDIDATES environment variable must be an integer"
+            )
+
+        self.ALINA_INTERVIEW_EXTRACTION = os.getenv(
+            "ALINA_INTERVIEW_EXTRACTION", "inline"
+        ).lower()
+        if self.ALINA_INTERVIEW_EXTRACTION not in ("inline", "background"):
+            raise ValueError(
+                "ALINA_INTERVIEW_EXTRACTION environment variable must be inline or background"
+            )
+
+        self.ALINA_EMBEDDINGS = os.getenv("ALINA_EMBEDDINGS", "off").lower()
+        if self.ALINA_EMBEDDINGS not in ("off", "local", "bedrock", "mistral", "azure"):
+            raise ValueError(
+                "ALINA_EMBEDDINGS environment variable must be off, local, bedrock, mistral or azure"
+            )
+        self.ALINA_EMBEDDING_MODEL = os.getenv("ALINA_EMBEDDING_MODEL", "")
+
     @property
     def bedrock_configured(self) -> bool:
         return all(
@@ -0,0 +1,135 @@
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+# Pack file layout: magic, index length (unsigned 64-bit, little endian), JSON
+# index, then the content of the markdown files one after the other. The index
+# maps each identifier (file name without extension) to (offset, length) in
+# the content section, and the modification time (ns) and size of the file.
+_MAGIC = b"ALINAMD2"
+_HEADER = struct.Struct("<8sQ")
+
+
+def pack_markdown_folder(folder: Path, pack_file: Path) -> int:
+    """Pack all markdown files of a folder into a single file.
+
+    Returns the number of packed files.
+    """
+    entries: Dict[str, list[int]] = {}
+    contents = []
+    offset = 0
+    for md_file in sorted(folder.glob("*.md")):
+        stat = md_file.stat()
+        content = md_file.read_bytes()
+        entries[md_file.stem] = [offset, len(content), stat.st_mtime_ns, stat.st_size]
+        contents.append(content)
+        offset += len(content)
+    index = json.dumps(
+        {"folder": str(folder.resolve()), "files": entries}, ensure_ascii=False
+    ).encode("utf-8")
+
+    pack_file.parent.mkdir(parents=True, exist_ok=True)
+    temporary_file = pack_file.with_name(f".{pack_file.name}.tmp")
+    with open(temporary_file, "wb") as file:
+        file.write(_HEADER.pack(_MAGIC, len(index)))
+        file.write(index)
+        for content in contents:
+            file.write(content)
+    os.replace(temporary_file, pack_file)
+    logging.info(f"Packed {len(entries)} files of {folder} into {pack_file}")
+    return len(entries)
+
+
+class MarkdownCorpus:
+    """Read access to the markdown files (jobs, trainings) of a data folder.
+
+    When the folder has been packed (see pack_markdown_folder), the files are
+    sliced from the memory-mapped pack file instead of being opened one by one.
+    Files missing from the pack, or modified since it was built (their
+    modification time or size differs), are read from the folder. Deleted
+    files are not returned.
+    """
+
+    folder: Path
+
+    def __init__(self, folder: Path, pack_file: Optional[Path] = None):
+        self.folder = folder
+        self._mmap: Optional[mmap.mmap] = None
+        self._entries: Dict[str, list[int]] = {}
+        self._data_offset = 0
+        if pack_file is not None and pack_file.exists():
+            self._open_pack(pack_file)
+
+    def _open_pack(self, pack_file: Path):
+        with open(pack_file, "rb") as file:
+            pack = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_length = _HEADER.unpack_from(pack, 0)
+        if magic != _MAGIC:
+            logging.warning(
+                f"Ignoring {pack_file}: not a markdown pack file of this version, run pack-data again"
+            )
+            pack.close()
+            return
+        index = json.loads(pack[_HEADER.size : _HEADER.size + index_length])
+        if Path(index["folder"]) != self.folder.resolve():
+            logging.warning(
+                f"Ignoring {pack_file}: it was built from {index['folder']}, not {self.folder}"
+            )
+            pack.close()
+            return
+        self._mmap = pack
+        self._entries = index["files"]
+        self._data_offset = _HEADER.size + index_length
+
+    @property
+    def packed(self) -> bool:
+        return self._mmap is not None
+
+    def get_bytes(self, item_id: str) -> Optional[bytes | memoryview]:
+        md_file = self.folder / f"{item_id}.md"
+        try:
+            stat = md_file.stat()
+        except FileNotFoundError:
+            return None
+        entry = self._entries.get(item_id)
+        if (
+            entry is not None
+            and self._mmap is not None
+            and entry[2:] == [stat.st_mtime_ns, stat.st_size]
+        ):
+            start = self._data_offset + entry[0]
+            return memoryview(self._mmap)[start : start + entry[1]]
+        return md_file.read_bytes()
+
+    def get(self, item_id: str) -> Optional[str]:
+        """Return the markdown content of a job or training (e.g. "tr012")."""
+        content = self.get_bytes(item_id)
+        if content is None:
+            return None
+        text = str(content, "utf-8")
+        if "\r" in text:
+            # Same newlines as a file opened in text mode
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text
+
+
+_corpora: Dict[tuple[Path, Optional[Path]], MarkdownCorpus] = {}
+_corpora_lock = threading.Lock()
+
+
+def get_markdown_corpus(
+    folder: Path, pack_file: Optional[Path] = None
+) -> MarkdownCorpus:
+    """Return the corpus of a folder, opened once per process."""
+    with _corpora_lock:
+        key = (folder, pack_file)
+        corpus = _corpora.get(key)
+        if corpus is None:
+            corpus = MarkdownCorpus(folder, pack_file)
+            _corpora[key] = corpus
+        return corpus
@@ -1,8 +1,9 @@
-import json
 import logging
+import sys
+import threading
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Sequence
+from typing import Any, Callable, Dict, Generic, List, Optional, Sequence, TypeVar
 
 from alina.models.referential import (
     JobReferential,
@@ -22,31 +23,239 @@ from alina.models.suggestion import (
     PredictionType,
     TrainingsOnlySuggestionResult,
 )
-from alina.shared.workspace import Workspace
+from alina.shared.checkpoint import CheckpointLog
+from alina.shared.codec import JsonCodec
+from alina.shared.config import Configuration
+from alina.shared.store import WorkspaceStore
+from alina.shared.workspace import get_workspace
 
+configuration = Configuration()
 
-def _save_result_to_json_file(result: Any, file_path: Path):
-    with open(file_path, "w", encoding="utf-8") as file:
-        json.dump(
-            result,
-            file,
-            ensure_ascii=False,
-            indent=4,
-            default=lambda x: getattr(x, "__dict__", str(x)),
+T = TypeVar("T")
+
+_workspace_store: Optional[WorkspaceStore] = None
+_workspace_store_lock = threading.Lock()
+
+
+def get_workspace_store() -> Optional[WorkspaceStore]:
+    """Return the SQLite store of the workspace, or None when using JSON files."""
+    global _workspace_store
+    if configuration.ALINA_STORE != "sqlite":
+        return None
+    db_file = get_workspace().get_store_db_file()
+    with _workspace_store_lock:
+        if _workspace_store is None or _workspace_store.db_file != db_file:
+            _workspace_store = WorkspaceStore(db_file)
+        return _workspace_store
+
+
+# Models encode themselves through to_dict, which keeps the key order of the
+# JSON files (the order in which their constructor assigns the attributes).
+_MODEL_TYPES = (
+    TrainingReferential,
+    JobReferential,
+    JobSkillRequirementLevel,
+    PersonaReferential,
+    SkillReferential,
+    BaseSuggestionResult,
+    JobSuggestionResult,
+)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, _MODEL_TYPES):
+        return value.to_dict()
+    return getattr(value, "__dict__", str(value))
+
+
+# Workspace files are read and written through this codec (see the ALINA_JSON_*
+# settings), and so are the documents of the SQLite store.
+_codec = JsonCodec(
+    backend=configuration.ALINA_JSON_BACKEND,
+    compact=configuration.ALINA_JSON_FORMAT == "compact",
+    compression=configuration.ALINA_JSON_COMPRESSION,
+    default=_json_default,
+)
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """Share a single copy of strings repeated across items (cities, locales...)."""
+    return sys.intern(value) if value is not None else None
+
+
+def _to_json_document(item: Any) -> str:
+    return _codec.encode(item, compact=True).decode("utf-8")
+
+
+def _from_json_document(document: str) -> Any:
+    return _codec.decode(document)
+
+
+def _load_json_file(file_path: Path) -> Any:
+    return _codec.load(file_path)
+
+
+def _get_persona_id(item: Any) -> Optional[str]:
+    persona_id = (
+        item.get("persona_id")
+        if isinstance(item, dict)
+        else getattr(item, "persona_id", None)
+    )
+    return str(persona_id) if persona_id is not None else None
+
+
+class _CachedReferential(Generic[T]):
+    """Parsed content of a referential file, with an index by identifier."""
+
+    stamp: Any
+    items: list[T]
+    by_id: Dict[Any, T]
+
+    def __init__(self, stamp: Any, items: list[T], by_id: Dict[Any, T]):
+        self.stamp = stamp
+        self.items = items
+        self.by_id = by_id
+
+
+# Referentials are parsed once per process, and parsed again only when their
+# file modification time or size (or their store revision) changes.
+_referential_cache: Dict[Any, _CachedReferential] = {}
+_referential_cache_lock = threading.Lock()
+
+
+def _get_file_stamp(file_path: Path) -> Optional[tuple[str, int, int]]:
+    found = _codec.find_file(file_path)
+    if found is None:
+        return None
+    try:
+        stat = found.stat()
+    except FileNotFoundError:
+        return None
+    return found.name, stat.st_mtime_ns, stat.st_size
+
+
+def _get_referential_stamp(name: str, file_path: Path) -> tuple[Any, Any]:
+    """Return the cache key of a referential and its stamp (None when it does not exist yet)."""
+    store = get_workspace_store()
+    if store:
+        revision = store.get_revision(name)
+        return (store.db_file, name), revision or None
+    return file_path, _get_file_stamp(file_path)
+
+
+def _read_referential(
+    name: str, file_path: Path, convert_item: Callable[[dict], T]
+) -> Optional[_CachedReferential[T]]:
+    """Read a referential (jobs, trainings, skills, personas) through the process-wide cache.
+
+    Returns None when the referential does not exist yet.
+    """
+    store = get_workspace_store()
+    with _referential_cache_lock:
+        cache_key, stamp = _get_referential_stamp(name, file_path)
+        if stamp is None:
+            _referential_cache.pop(cache_key, None)
+            return None
+        cached = _referential_cache.get(cache_key)
+        if cached is not None and cached.stamp == stamp:
+            return cached
+
+        if store:
+            if name == "personas":
+                documents = [data for _, data in store.read_items(name)]
+            else:
+                documents = store.read_referential(name)
+            data = [_from_json_document(document) for document in documents]
+        else:
+            data = _load_json_file(file_path)
+        items = [convert_item(item) for item in data]
+        cached = _CachedReferential(stamp, items, {item.id: item for item in items})
+        _referential_cache[cache_key] = cached
+        return cached
+
+
+def _read_required_referential(
+    name: str, file_path: Path, convert_item: Callable[[dict], T]
+) -> _CachedReferential[T]:
+    cached = _read_referential(name, file_path, convert_item)
+    if cached is None:
+        raise FileNotFoundError(f"Referential {name} not found ({file_path})")
+    return cached
+
+
+def get_referential_stamp(name: str) -> Any:
+    """Return the stamp of a referential (jobs, trainings or skills).
+
+    The stamp changes with the content of the referential: caches built from
+    a referential are keyed on it, and replaced when it changes.
+    """
+    workspace = get_workspace()
+    file_paths = {
+        "jobs": workspace.get_jobs_db_file(),
+        "trainings": workspace.get_trainings_db_file(),
+        "skills": workspace.get_skills_db_file(),
+    }
+    return _get_referential_stamp(name, file_paths[name])
+
+
+def clear_referential_cache():
+    with _referential_cache_lock:
+        _referential_cache.clear()
+
+
+# Commands processing personas one by one record each result in a checkpoint
+# log, and write their final artifacts once at the end of the run.
+_checkpoint_logs: Dict[Path, CheckpointLog] = {}
+_checkpoint_logs_lock = threading.Lock()
+
+
+def _get_checkpoint_log(command: str) -> CheckpointLog:
+    file_path = get_workspace().get_checkpoint_file(command)
+    with _checkpoint_logs_lock:
+        checkpoint_log = _checkpoint_logs.get(file_path)
+        if checkpoint_log is None:
+            checkpoint_log = CheckpointLog(file_path)
+            _checkpoint_logs[file_path] = checkpoint_log
+        return checkpoint_log
+
+
+def _save_result_to_json_file(
+    result: Any, file_path: Path, ensure_ascii: bool = False
+) -> Path:
+    saved_file = _codec.save(result, file_path, ensure_ascii)
+    logging.info(f"Saved to {saved_file}")
+    with _referential_cache_lock:
+        _referential_cache.pop(file_path, None)
+    return saved_file
+
+
+def _save_referential(name: str, results: Sequence[Any], file_path: Path):
+    store = get_workspace_store()
+    if store:
+        store.replace_referential(
+            name, [(str(item.id), _to_json_document(item)) for item in results]
         )
-        logging.info(f"Saved to {file_path}")
+        logging.info(f"Saved {name} to {store.db_file}")
+    else:
+        _save_result_to_json_file(results, file_path)
 
 
 def save_training_analysis(results: Sequence[TrainingReferential]):
-    _save_result_to_json_file(results, Workspace().get_trainings_db_file())
+    _save_referential("trainings", results, get_workspace().get_trainings_db_file())
 
 
 def save_job_analysis(results: Sequence[JobReferential]):
-    _save_result_to_json_file(results, Workspace().get_jobs_db_file())
+    _save_referential("jobs", results, get_workspace().get_jobs_db_file())
 
 
 def save_personas_analysis(results: Sequence[PersonaReferential]):
-    _save_result_to_json_file(results, Workspace().get_personas_db_file())
+    store = get_workspace_store()
+    if store:
+        store.replace_items(
+            "personas", [(item.id, _to_json_document(item)) for item in results]
+        )
+    else:
+        _save_result_to_json_file(results, get_workspace().get_personas_db_file())
 
 
 def _convert_persona_analysis_item(item: dict) -> PersonaReferential:
@@ -56,7 +265,7 @@ def _convert_persona_analysis_item(item: dict) -> PersonaReferential:
     return PersonaReferential(
         id=item["id"],
         age=item["age"],
-        city=item.get("city"),
+        city=_intern(item.get("city")),
         intent=intent,
         willing_to_relocate=item.get("willing_to_relocate"),
         education_level=item.get("education_level"),
@@ -71,103 +280,212 @@ def _convert_persona_analysis_item(item: dict) -> PersonaReferential:
 
 
 def read_personas_analysis() -> list[PersonaReferential]:
-    personas_db_file = Workspace().get_personas_db_file()
-    if not personas_db_file.exists():
+    cached = _read_referential(
+        "personas",
+        get_workspace().get_personas_db_file(),
+        _convert_persona_analysis_item,
+    )
+    if cached is None:
         return []
-    with open(personas_db_file, "r", encoding="utf-8") as file:
-        data = json.load(file)
-        personas = []
-        for item in data:
-            persona = _convert_persona_analysis_item(item)
-            personas.append(persona)
-        return personas
+    return list(cached.items)
+
+
+def get_persona(persona_id: str) -> Optional[PersonaReferential]:
+    cached = _read_required_referential(
+        "personas",
+        get_workspace().get_personas_db_file(),
+        _convert_persona_analysis_item,
+    )
+    return cached.by_id.get(persona_id)
+
+
+def read_in_progress_personas_analysis() -> Dict[str, PersonaReferential]:
+    return {
+        persona_id: _convert_persona_analysis_item(item)
+        for persona_id, item in _get_checkpoint_log("presuggest").replay().items()
+    }
+
 
+def save_in_progress_persona_analysis(result: PersonaReferential):
+    _get_checkpoint_log("presuggest").append(result.id, _to_json_document(result))
 
-def read_persona_analysis(persona_id: str) -> Optional[PersonaReferential]:
-    personas_db_file = Workspace().get_personas_db_file()
-    with open(personas_db_file, "r", encoding="utf-8") as file:
-        data = json.load(file)
-        for item in data:
-            if item["id"] == persona_id:
-                return _convert_persona_analysis_item(item)
-    return None
+
+def clear_in_progress_personas_analysis():
+    _get_checkpoint_log("presuggest").remove()
+
+
+def _convert_training_analysis_item(item: dict) -> TrainingReferential:
+    return TrainingReferential(
+        id=item["id"],
+        online=item["online"],
+        locale=_intern(item["locale"]),
+        duration_weeks=item["duration_weeks"],
+        certification=item["certification"],
+        domain=item["domain"],
+        skills_description=item.get("skills_description"),
+        level_change=_intern(item.get("level_change")),
+        city=_intern(item.get("city")),
+        target_job=item.get("target_job"),
+    )
 
 
 def read_trainings_analysis() -> Sequence[TrainingReferential]:
-    trainings_db_file = Workspace().get_trainings_db_file()
-    with open(trainings_db_file, "r", encoding="utf-8") as file:
-        data = json.load(file)
-        trainings = []
-        for item in data:
-            training = TrainingReferential(
-                id=item["id"],
-                online=item["online"],
-                locale=item["locale"],
-                duration_weeks=item["duration_weeks"],
-                certification=item["certification"],
-                domain=item["domain"],
-                skills_description=item.get("skills_description"),
-                level_change=item.get("level_change"),
-                city=item.get("city"),
-                target_job=item.get("target_job"),
-            )
-            trainings.append(training)
-        return trainings
+    cached = _read_required_referential(
+        "trainings",
+        get_workspace().get_trainings_db_file(),
+        _convert_training_analysis_item,
+    )
+    return list(cached.items)
+
+
+def get_training(training_id: str) -> Optional[TrainingReferential]:
+    cached = _read_required_referential(
+        "trainings",
+        get_workspace().get_trainings_db_file(),
+        _convert_training_analysis_item,
+    )
+    return cached.by_id.get(training_id)
+
+
+def _convert_job_analysis_item(item: dict) -> JobReferential:
+    skills = [
+        JobSkillRequirementLevel(
+            skill=_intern(skill_item["skill"]),
+            level=skill_item["level"],
+            required=skill_item["required"],
+        )
+        for skill_item in item["skills"]
+    ]
+    return JobReferential(
+        id=item["id"],
+        remote=item["remote"],
+        domain=item["domain"],
+        education_level=item.get("education_level"),
+        languages=[_intern(language) for language in item["languages"]],
+        experience=item["experience"],
+        skills=skills,
+        city=_intern(item.get("city")),
+        description=item.get("description"),
+    )
 
 
 def read_jobs_analysis() -> Sequence[JobReferential]:
-    jobs_db_file = Workspace().get_jobs_db_file()
-    with open(jobs_db_file, "r", encoding="utf-8") as file:
-        data = json.load(file)
-        jobs = []
-        for item in data:
-            skills = [
-                JobSkillRequirementLevel(
-                    skill=skill_item["skill"],
-                    level=skill_item["level"],
-                    required=skill_item["required"],
-                )
-                for skill_item in item["skills"]
-            ]
-            job = JobReferential(
-                id=item["id"],
-                remote=item["remote"],
-                domain=item["domain"],
-                education_level=item.get("education_level"),
-                languages=item["languages"],
-                experience=item["experience"],
-                skills=skills,
-                city=item.get("city"),
-                description=item.get("description"),
-            )
-            jobs.append(job)
-        return jobs
+    cached = _read_required_referential(
+        "jobs", get_workspace().get_jobs_db_file(), _convert_job_analysis_item
+    )
+    return list(cached.items)
+
+
+def get_job(job_id: str) -> Optional[JobReferential]:
+    cached = _read_required_referential(
+        "jobs", get_workspace().get_jobs_db_file(), _convert_job_analysis_item
+    )
+    return cached.by_id.get(job_id)
+
+
+def read_analysis_hashes(kind: str) -> Dict[str, Dict[str, str]]:
+    """Return the content hash and analyzer version of each analyzed file of a kind (jobs, trainings)."""
+    analysis_hashes_file = get_workspace().get_analysis_hashes_file()
+    if _codec.find_file(analysis_hashes_file) is None:
+        return {}
+    return _load_json_file(analysis_hashes_file).get(kind, {})
+
+
+def save_analysis_hashes(kind: str, hashes: Dict[str, Dict[str, str]]):
+    analysis_hashes_file = get_workspace().get_analysis_hashes_file()
+    all_hashes = {}
+    if _codec.find_file(analysis_hashes_file) is not None:
+        all_hashes = _load_json_file(analysis_hashes_file)
+    all_hashes[kind] = hashes
+    _save_result_to_json_file(all_hashes, analysis_hashes_file)
 
 
 def read_manual_intents() -> Dict[str, ManualUserIntent]:
-    manual_intents_db_file = Workspace().get_manual_intents_db_file()
-    if not manual_intents_db_file.exists():
+    manual_intents_db_file = get_workspace().get_manual_intents_db_file()
+    if _codec.find_file(manual_intents_db_file) is None:
         return {}
-    with open(manual_intents_db_file, "r", encoding="utf-8") as file:
-        data = json.load(file)
-        intents = {}
-        for persona_id, intent_str in data.items():
-            intents[persona_id] = ManualUserIntent(intent_str)
-        return intents
+    data = _load_json_file(manual_intents_db_file)
+    intents = {}
+    for persona_id, intent_str in data.items():
+        intents[persona_id] = ManualUserIntent(intent_str)
+    return intents
+
+
+def read_training_suggestions() -> Dict[str, Dict]:
+    store = get_workspace_store()
+    if store:
+        return {
+            persona_id: _from_json_document(data)
+            for persona_id, data in store.read_items("training_suggestions")
+        }
+    training_suggestions_file = get_workspace().get_training_suggestions_file()
+    if _codec.find_file(training_suggestions_file) is None:
+        return {}
+    return _load_json_file(training_suggestions_file)
 
 
-def save_suggestions(results: Sequence[BaseSuggestionResult]):
-    _save_result_to_json_file(results, Workspace().get_next_suggestion_file())
+def save_training_suggestions(training_suggestions: Dict[str, Dict]):
+    store = get_workspace_store()
+    if store:
+        store.replace_items(
+            "training_suggestions",
+            [
+                (persona_id, _to_json_document(suggestion))
+                for persona_id, suggestion in training_suggestions.items()
+            ],
+        )
+    else:
+        # This file has always been written with escaped non-ASCII characters
+        _save_result_to_json_file(
+            training_suggestions,
+            get_workspace().get_training_suggestions_file(),
+            ensure_ascii=True,
+        )
+
+
+def read_in_progress_training_suggestions() -> Dict[str, Dict]:
+    return _get_checkpoint_log("suggest_training").replay()
+
+
+def save_in_progress_training_suggestion(persona_id: str, training_suggestion: Dict):
+    _get_checkpoint_log("suggest_training").append(
+        persona_id, _to_json_document(training_suggestion)
+    )
+
+
+def clear_in_progress_training_suggestions():
+    _get_checkpoint_log("suggest_training").remove()
+
+
+def save_suggestions(results: Sequence[BaseSuggestionResult | Dict]):
+    store = get_workspace_store()
+    if store:
+        index = store.add_set(
+            "suggestions",
+            [(_get_persona_id(item), _to_json_document(item)) for item in results],
+        )
+        logging.info(f"Saved suggestions #{index} to {store.db_file}")
+    else:
+        workspace = get_workspace()
+        saved_file = _save_result_to_json_file(
+            results, workspace.get_next_suggestion_file()
+        )
+        workspace.get_suggestions_manifest().record(saved_file)
 
 
 def read_last_suggestions() -> Sequence[BaseSuggestionResult]:
-    last_suggestion_file = Workspace().get_last_suggestion_file()
-    with open(last_suggestion_file, "r", encoding="utf-8") as file:
-        data = json.load(file)
-        suggestions = []
-        for item in data:
-            suggestions.append(_to_base_suggestion_result(item))
-        return suggestions
+    store = get_workspace_store()
+    if store:
+        indexes = store.get_set_indexes("suggestions")
+        if not indexes:
+            raise FileNotFoundError("No suggestion files found.")
+        data = [
+            _from_json_document(document)
+            for document in store.read_set("suggestions", indexes[-1]) or []
+        ]
+    else:
+        data = _load_json_file(get_workspace().get_last_suggestion_file())
+    return [_to_base_suggestion_result(item) for item in data]
 
 
 def _to_base_suggestion_result(data: dict) -> BaseSuggestionResult:
@@ -192,55 +510,235 @@ def _to_base_suggestion_result(data: dict) -> BaseSuggestionResult:
     raise ValueError(f"Unknown prediction type: {data['predicted_type']}")
 
 
-def read_in_progress_suggestions(persona_id: int) -> Optional[BaseSuggestionResult]:
-    persona_suggestion_file = Workspace().get_in_progress_suggestion_file(persona_id)
-    if not persona_suggestion_file.exists():
-        return None
-    with open(persona_suggestion_file, "r", encoding="utf-8") as file:
-        data = json.load(file)
-        return _to_base_suggestion_result(data)
-    return None
+def read_in_progress_suggestions() -> Dict[str, BaseSuggestionResult]:
+    return {
+        persona_id: _to_base_suggestion_result(item)
+        for persona_id, item in _get_checkpoint_log("suggest").replay().items()
+    }
 
 
-def save_in_progress_suggestions(
-    persona_id: int, suggestion_result: BaseSuggestionResult
-):
-    persona_suggestion_file = Workspace().get_in_progress_suggestion_file(persona_id)
-    persona_suggestion_file.parent.mkdir(parents=True, exist_ok=True)
-    _save_result_to_json_file(suggestion_result, persona_suggestion_file)
+def save_in_progress_suggestions(suggestion_result: BaseSuggestionResult):
+    _get_checkpoint_log("suggest").append(
+        str(suggestion_result.persona_id), _to_json_document(suggestion_result)
+    )
 
 
 def clear_in_progress_suggestions():
-    in_progress_folder = Workspace().get_in_progress_suggestion_folder()
-    if in_progress_folder.exists():
-        for file in in_progress_folder.glob("*.json"):
-            file.unlink()
-        in_progress_folder.rmdir()
+    _get_checkpoint_log("suggest").remove()
 
 
 def save_submission(results: List[Dict]):
-    next_submission_file = Workspace().get_next_submission_file()
-    if not next_submission_file.parent.exists():
-        next_submission_file.parent.mkdir(parents=True, exist_ok=True)
-    _save_result_to_json_file(results, next_submission_file)
+    store = get_workspace_store()
+    if store:
+        index = store.add_set(
+            "submissions",
+            [(_get_persona_id(item), _to_json_document(item)) for item in results],
+        )
+        logging.info(f"Saved submission #{index} to {store.db_file}")
+        return
+    workspace = get_workspace()
+    saved_file = _save_result_to_json_file(
+        results, workspace.get_next_submission_file()
+    )
+    workspace.get_submissions_manifest().record(saved_file)
+
+
+def get_submission_indexes() -> list[int]:
+    store = get_workspace_store()
+    if store:
+        return store.get_set_indexes("submissions")
+    return get_workspace().get_submission_indexes()
+
+
+def read_submission(index: int) -> Optional[List[Dict]]:
+    store = get_workspace_store()
+    if store:
+        documents = store.read_set("submissions", index)
+        if documents is None:
+            return None
+        return [_from_json_document(document) for document in documents]
+    submission_file = get_workspace().get_submission_file(index)
+    if _codec.find_file(submission_file) is None:
+        return None
+    return _load_json_file(submission_file)
+
+
+def read_submissions_history() -> Optional[List[Dict]]:
+    submissions_file = get_workspace().get_submissions_file()
+    if _codec.find_file(submissions_file) is None:
+        return None
+    return _load_json_file(submissions_file)
+
+
+def save_submissions_history(entries: Sequence[Any]):
+    _save_result_to_json_file(
+        entries, get_workspace().get_submissions_file(), ensure_ascii=True
+    )
 
 
 def save_skills(skills: list[SkillReferential]):
-    skills_db_file = Workspace().get_skills_db_file()
-    _save_result_to_json_file(skills, skills_db_file)
+    _save_referential("skills", skills, get_workspace().get_skills_db_file())
+
+
+def _convert_skill_item(item: dict) -> SkillReferential:
+    return SkillReferential(
+        id=item["id"],
+        name=item["name"],
+        jobs=item.get("jobs"),
+        trainings=item.get("trainings", []),
+    )
 
 
 def read_skills() -> list[SkillReferential]:
-    skills_db_file = Workspace().get_skills_db_file()
-    with open(skills_db_file, "r", encoding="utf-8") as file:
-        data = json.load(file)
-        skills = []
-        for item in data:
-            skill = SkillReferential(
-                id=item["id"],
-                name=item["name"],
-                jobs=item.get("jobs"),
-                trainings=item.get("trainings", []),
+    cached = _read_required_referential(
+        "skills", get_workspace().get_skills_db_file(), _convert_skill_item
+    )
+    return list(cached.items)
+
+
+def get_skill(skill_id: int) -> Optional[SkillReferential]:
+    cached = _read_required_referential(
+        "skills", get_workspace().get_skills_db_file(), _convert_skill_item
+    )
+    return cached.by_id.get(skill_id)
+
+
+def rebuild_workspace_manifests():
+    """Rebuild the manifests of the suggestion and submission folders."""
+    workspace = get_workspace()
+    workspace.get_suggestions_manifest().rebuild()
+    workspace.get_submissions_manifest().rebuild()
+
+
+def export_store_to_json_files():
+    """Write the content of the SQLite store to the workspace JSON files."""
+    store = get_workspace_store()
+    if not store:
+        raise RuntimeError("The SQLite store is not enabled (set ALINA_STORE=sqlite)")
+    workspace = get_workspace()
+
+    referential_files = {
+        "jobs": workspace.get_jobs_db_file(),
+        "trainings": workspace.get_trainings_db_file(),
+        "skills": workspace.get_skills_db_file(),
+    }
+    for kind, file_path in referential_files.items():
+        if store.has_referential(kind):
+            _save_result_to_json_file(
+                [_from_json_document(data) for data in store.read_referential(kind)],
+                file_path,
+            )
+
+    personas = store.read_items("personas")
+    if personas:
+        _save_result_to_json_file(
+            [_from_json_document(data) for _, data in personas],
+            workspace.get_personas_db_file(),
+        )
+
+    training_suggestions = store.read_items("training_suggestions")
+    if training_suggestions:
+        _save_result_to_json_file(
+            {
+                persona_id: _from_json_document(data)
+                for persona_id, data in training_suggestions
+            },
+            workspace.get_training_suggestions_file(),
+            ensure_ascii=True,
+        )
+
+    for table, get_file, manifest in [
+        (
+            "suggestions",
+            workspace.get_suggestion_file,
+            workspace.get_suggestions_manifest(),
+        ),
+        (
+            "submissions",
+            workspace.get_submission_file,
+            workspace.get_submissions_manifest(),
+        ),
+    ]:
+        for index in store.get_set_indexes(table):
+            file_path = get_file(index)
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            saved_file = _save_result_to_json_file(
+                [
+                    _from_json_document(data)
+                    for data in store.read_set(table, index) or []
+                ],
+                file_path,
+            )
+            manifest.record(saved_file)
+
+
+def import_json_files_to_store():
+    """Load the workspace JSON files into the SQLite store."""
+    store = get_workspace_store()
+    if not store:
+        raise RuntimeError("The SQLite store is not enabled (set ALINA_STORE=sqlite)")
+    workspace = get_workspace()
+
+    referential_files = {
+        "jobs": workspace.get_jobs_db_file(),
+        "trainings": workspace.get_trainings_db_file(),
+        "skills": workspace.get_skills_db_file(),
+    }
+    for kind, file_path in referential_files.items():
+        if _codec.find_file(file_path):
+            store.replace_referential(
+                kind,
+                [
+                    (str(item["id"]), _to_json_document(item))
+                    for item in _load_json_file(file_path)
+                ],
+            )
+            logging.info(f"Imported {file_path}")
+
+    personas_file = workspace.get_personas_db_file()
+    if _codec.find_file(personas_file):
+        store.replace_items(
+            "personas",
+            [
+                (item["id"], _to_json_document(item))
+                for item in _load_json_file(personas_file)
+            ],
+        )
+        logging.info(f"Imported {personas_file}")
+
+    training_suggestions_file = workspace.get_training_suggestions_file()
+    if _codec.find_file(training_suggestions_file):
+        store.replace_items(
+            "training_suggestions",
+            [
+                (persona_id, _to_json_document(suggestion))
+                for persona_id, suggestion in _load_json_file(
+                    training_suggestions_file
+                ).items()
+            ],
+        )
+        logging.info(f"Imported {training_suggestions_file}")
+
+    for table, indexes, get_file in [
+        (
+            "suggestions",
+            workspace.get_suggestion_indexes(),
+            workspace.get_suggestion_file,
+        ),
+        (
+            "submissions",
+            workspace.get_submission_indexes(),
+            workspace.get_submission_file,
+        ),
+    ]:
+        for index in indexes:
+            file_path = get_file(index)
+            store.add_set(
+                table,
+                [
+                    (_get_persona_id(item), _to_json_document(item))
+                    for item in _load_json_file(file_path)
+                ],
+                file_index=index,
             )
-            skills.append(skill)
-        return skills
+            logging.info(f"Imported {file_path}")
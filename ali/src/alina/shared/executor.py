@@ -0,0 +1,72 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Generic, Optional, Sequence, TypeVar
+
+I = TypeVar("I")
+R = TypeVar("R")
+
+
+class ItemResult(Generic[I, R]):
+    """Outcome of the processing of one item: its result, or the error it raised."""
+
+    __slots__ = ("item", "result", "error")
+
+    item: I
+    result: Optional[R]
+    error: Optional[Exception]
+
+    def __init__(
+        self, item: I, result: Optional[R] = None, error: Optional[Exception] = None
+    ):
+        self.item = item
+        self.result = result
+        self.error = error
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+
+async def run_concurrently(
+    items: Sequence[I],
+    function: Callable[[I], Awaitable[R]],
+    concurrency: int,
+    size: Optional[Callable[[I], int]] = None,
+    description: str = "items",
+) -> list[ItemResult[I, R]]:
+    """Process items with up to `concurrency` calls of function in flight.
+
+    A new item starts as soon as one finishes, so a slow item does not hold
+    back the others. When size is given, the largest items start first (the
+    slowest ones then do not end up alone at the end of the run). An item that
+    raises an error is logged and does not stop the others. Results are
+    returned in the order of the items.
+    """
+    results: list[Optional[ItemResult[I, R]]] = [None] * len(items)
+    order = list(range(len(items)))
+    if size is not None:
+        order.sort(key=lambda index: size(items[index]), reverse=True)
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for index in order:
+        queue.put_nowait(index)
+    done = 0
+    log_interval = max(1, len(items) // 10)
+
+    async def worker():
+        nonlocal done
+        while not queue.empty():
+            index = queue.get_nowait()
+            item = items[index]
+            try:
+                results[index] = ItemResult(item, result=await function(item))
+            except Exception as error:
+                logging.error(f"Failed to process {item}: {error}", exc_info=error)
+                results[index] = ItemResult(item, error=error)
+            done += 1
+            if done % log_interval == 0 or done == len(items):
+                logging.info(f"Processed {done}/{len(items)} {description}")
+
+    async with asyncio.TaskGroup() as tg:
+        for _ in range(min(concurrency, len(items))):
+            tg.create_task(worker())
+    return [result for result in results if result is not None]
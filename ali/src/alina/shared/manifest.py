@@ -0,0 +1,105 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict
+
+MANIFEST_FILE_NAME = "manifest.json"
+
+_manifest_lock = threading.RLock()
+
+
+def _get_file_index(file_name: str) -> int:
+    # e.g. submission_012.json or suggestions_003.json.gz
+    return int(file_name.split(".")[0].split("_")[1])
+
+
+def _describe_file(file_path: Path) -> Dict[str, Any]:
+    with open(file_path, "rb") as file:
+        content = file.read()
+    return {
+        "name": file_path.name,
+        "sha256": hashlib.sha256(content).hexdigest(),
+        "size": len(content),
+        "modified": datetime.fromtimestamp(file_path.stat().st_mtime).isoformat(
+            timespec="seconds"
+        ),
+    }
+
+
+class FolderManifest:
+    """Index of the numbered files of a workspace folder (suggestions, submissions).
+
+    The manifest.json file of the folder records the current maximum index, and
+    the name, hash, size and modification date of each file, so that listing the
+    files does not require scanning the folder. It is rebuilt from the folder
+    content when missing (or with the rebuild-manifests command after editing
+    the folder by hand).
+    """
+
+    folder: Path
+    prefix: str
+
+    def __init__(self, folder: Path, prefix: str):
+        self.folder = folder
+        self.prefix = prefix
+
+    @property
+    def manifest_file(self) -> Path:
+        return self.folder / MANIFEST_FILE_NAME
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.manifest_file, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            pass
+        except json.JSONDecodeError:
+            logging.warning(f"Invalid manifest {self.manifest_file}, rebuilding it")
+        if not self.folder.exists():
+            return {"max_index": 0, "files": {}}
+        return self.rebuild()
+
+    def _write(self, manifest: Dict[str, Any]):
+        # Write to a temporary file first, so the manifest is replaced atomically
+        self.folder.mkdir(parents=True, exist_ok=True)
+        temporary_file = self.manifest_file.with_name(f".{MANIFEST_FILE_NAME}.tmp")
+        with open(temporary_file, "w", encoding="utf-8") as file:
+            json.dump(manifest, file, ensure_ascii=False, indent=4)
+        os.replace(temporary_file, self.manifest_file)
+
+    def rebuild(self) -> Dict[str, Any]:
+        """Build the manifest again from the files present in the folder."""
+        files: Dict[str, Dict[str, Any]] = {}
+        for file_path in sorted(self.folder.glob(f"{self.prefix}_*.json*")):
+            files[str(_get_file_index(file_path.name))] = _describe_file(file_path)
+        manifest = {
+            "max_index": max((int(index) for index in files), default=0),
+            "files": dict(sorted(files.items(), key=lambda item: int(item[0]))),
+        }
+        with _manifest_lock:
+            self._write(manifest)
+        logging.info(f"Rebuilt {self.manifest_file} ({len(files)} files)")
+        return manifest
+
+    def get_indexes(self) -> list[int]:
+        return sorted(int(index) for index in self._read()["files"])
+
+    def get_max_index(self) -> int:
+        return self._read()["max_index"]
+
+    def record(self, file_path: Path):
+        """Add (or update) a file that has just been written to the folder."""
+        index = _get_file_index(file_path.name)
+        entry = _describe_file(file_path)
+        with _manifest_lock:
+            manifest = self._read()
+            manifest["files"][str(index)] = entry
+            manifest["files"] = dict(
+                sorted(manifest["files"].items(), key=lambda item: int(item[0]))
+            )
+            manifest["max_index"] = max(manifest["max_index"], index)
+            self._write(manifest)
@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+"""
+
+
+class ResponseCache:
+    """SQLite-backed cache of LLM responses, shared by all the agents of the workspace.
+
+    Entries expire after ttl seconds (0 to keep them forever). When the total
+    size of the cached responses exceeds max_bytes, the least recently used
+    entries are evicted. Identical requests running at the same time (in any
+    thread or event loop of the process) are sent only once.
+    """
+
+    db_file: Path
+    ttl: int
+    max_bytes: int
+
+    def __init__(self, db_file: Path, ttl: int, max_bytes: int):
+        self.db_file = db_file
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._pending: Dict[str, Future] = {}
+        self._pending_lock = threading.Lock()
+        self._get_connection().executescript(_SCHEMA)
+
+    def _get_connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            self.db_file.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.db_file, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str) -> Optional[str]:
+        connection = self._get_connection()
+        row = connection.execute(
+            "SELECT value, created FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, created = row
+        now = time.time()
+        with connection:
+            if self.ttl and now - created > self.ttl:
+                connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            connection.execute(
+                "UPDATE responses SET accessed = ? WHERE key = ?", (now, key)
+            )
+        return value
+
+    def put(self, key: str, value: str):
+        size = len(value.encode("utf-8"))
+        now = time.time()
+        connection = self._get_connection()
+        with connection:
+            connection.execute(
+                """
+                INSERT INTO responses (key, value, size, created, accessed)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    value = excluded.value,
+                    size = excluded.size,
+                    created = excluded.created,
+                    accessed = excluded.accessed
+                """,
+                (key, value, size, now, now),
+            )
+            self._evict(connection)
+
+    def _evict(self, connection: sqlite3.Connection):
+        if self.ttl:
+            connection.execute(
+                "DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,)
+            )
+        (total_size,) = connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if total_size <= self.max_bytes:
+            return
+        evicted_keys = []
+        for key, size in connection.execute(
+            "SELECT key, size FROM responses ORDER BY accessed"
+        ):
+            if total_size <= self.max_bytes:
+                break
+            evicted_keys.append((key,))
+            total_size -= size
+        connection.executemany("DELETE FROM responses WHERE key = ?", evicted_keys)
+        logging.debug(f"Evicted {len(evicted_keys)} responses from {self.db_file}")
+
+    def clear(self):
+        connection = self._get_connection()
+        with connection:
+            connection.execute("DELETE FROM responses")
+        connection.execute("VACUUM")
+
+    async def get_or_compute(
+        self, key: str, compute: Callable[[], Awaitable[Optional[str]]]
+    ) -> Optional[str]:
+        """Return the cached response of a request, computing it if needed.
+
+        The response is stored unless compute returns None. Concurrent callers
+        of the same key wait for the first one instead of computing it again
+        (they get None if it could not be cached, and must compute it themselves).
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        with self._pending_lock:
+            pending = self._pending.get(key)
+            is_leader = pending is None
+            if is_leader:
+                pending = Future()
+                self._pending[key] = pending
+        if not is_leader:
+            return await asyncio.wrap_future(pending)
+
+        try:
+            value = await compute()
+            if value is not None:
+                self.put(key, value)
+            pending.set_result(value)
+            return value
+        except BaseException as error:
+            pending.set_exception(error)
+            raise
+        finally:
+            with self._pending_lock:
+                del self._pending[key]
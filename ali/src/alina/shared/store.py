@@ -0,0 +1,257 @@
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+# Items are stored as JSON documents (the same ones as in the workspace JSON
+# files), with their identifiers extracted into indexed columns.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS referentials (
+    kind TEXT NOT NULL,
+    id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (kind, id)
+);
+CREATE INDEX IF NOT EXISTS referentials_position ON referentials (kind, position);
+
+CREATE TABLE IF NOT EXISTS personas (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS personas_position ON personas (position);
+
+CREATE TABLE IF NOT EXISTS training_suggestions (
+    persona_id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS suggestions (
+    file_index INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    persona_id TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (file_index, position)
+);
+CREATE INDEX IF NOT EXISTS suggestions_persona ON suggestions (persona_id);
+
+CREATE TABLE IF NOT EXISTS submissions (
+    file_index INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    persona_id TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (file_index, position)
+);
+CREATE INDEX IF NOT EXISTS submissions_persona ON submissions (persona_id);
+
+-- Every set index, including the sets without items
+CREATE TABLE IF NOT EXISTS sets (
+    kind TEXT NOT NULL,
+    file_index INTEGER NOT NULL,
+    PRIMARY KEY (kind, file_index)
+);
+
+CREATE TABLE IF NOT EXISTS revisions (
+    name TEXT PRIMARY KEY,
+    revision INTEGER NOT NULL
+);
+"""
+
+_KEYED_TABLES = {
+    "personas": "id",
+    "training_suggestions": "persona_id",
+}
+_SET_TABLES = ("suggestions", "submissions")
+
+
+class WorkspaceStore:
+    """SQLite-backed storage of the workspace state.
+
+    Each thread uses its own connection; every write runs in a transaction.
+    """
+
+    db_file: Path
+
+    def __init__(self, db_file: Path):
+        self.db_file = db_file
+        self._local = threading.local()
+        with self._transaction() as connection:
+            connection.executescript(_SCHEMA)
+            # Stores created before the sets table list their sets from the items
+            for table in _SET_TABLES:
+                connection.execute(
+                    f"INSERT OR IGNORE INTO sets (kind, file_index) SELECT DISTINCT ?, file_index FROM {table}",
+                    (table,),
+                )
+
+    def _get_connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            self.db_file.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.db_file, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        connection = self._get_connection()
+        with connection:
+            yield connection
+
+    def _bump_revision(self, connection: sqlite3.Connection, name: str):
+        connection.execute(
+            """
+            INSERT INTO revisions (name, revision) VALUES (?, 1)
+            ON CONFLICT (name) DO UPDATE SET revision = revision + 1
+            """,
+            (name,),
+        )
+
+    def get_revision(self, name: str) -> int:
+        row = (
+            self._get_connection()
+            .execute("SELECT revision FROM revisions WHERE name = ?", (name,))
+            .fetchone()
+        )
+        return row[0] if row else 0
+
+    # Referentials (jobs, trainings, skills) are always replaced as a whole
+
+    def replace_referential(self, kind: str, items: list[tuple[str, str]]):
+        """Replace all items of a referential with (id, JSON document) pairs."""
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM referentials WHERE kind = ?", (kind,))
+            connection.executemany(
+                "INSERT INTO referentials (kind, id, position, data) VALUES (?, ?, ?, ?)",
+                [
+                    (kind, item_id, position, data)
+                    for position, (item_id, data) in enumerate(items)
+                ],
+            )
+            self._bump_revision(connection, kind)
+
+    def read_referential(self, kind: str) -> list[str]:
+        rows = (
+            self._get_connection()
+            .execute(
+                "SELECT data FROM referentials WHERE kind = ? ORDER BY position",
+                (kind,),
+            )
+            .fetchall()
+        )
+        return [row[0] for row in rows]
+
+    def has_referential(self, kind: str) -> bool:
+        row = (
+            self._get_connection()
+            .execute("SELECT 1 FROM referentials WHERE kind = ? LIMIT 1", (kind,))
+            .fetchone()
+        )
+        return row is not None
+
+    # Keyed tables (personas, training suggestions) only write the rows that changed
+
+    def replace_items(self, table: str, items: list[tuple[str, str]]):
+        """Replace the content of a keyed table, writing only changed rows."""
+        key_column = _KEYED_TABLES[table]
+        with self._transaction() as connection:
+            changes_before = connection.total_changes
+            connection.execute(
+                f"DELETE FROM {table} WHERE {key_column} NOT IN (SELECT value FROM json_each(?))",
+                (json.dumps([item_id for item_id, _ in items]),),
+            )
+            connection.executemany(
+                f"""
+                INSERT INTO {table} ({key_column}, position, data) VALUES (?, ?, ?)
+                ON CONFLICT ({key_column}) DO UPDATE SET
+                    position = excluded.position,
+                    data = excluded.data
+                WHERE position != excluded.position OR data != excluded.data
+                """,
+                [
+                    (item_id, position, data)
+                    for position, (item_id, data) in enumerate(items)
+                ],
+            )
+            if connection.total_changes != changes_before:
+                self._bump_revision(connection, table)
+
+    def read_items(self, table: str) -> list[tuple[str, str]]:
+        key_column = _KEYED_TABLES[table]
+        return (
+            self._get_connection()
+            .execute(f"SELECT {key_column}, data FROM {table} ORDER BY position")
+            .fetchall()
+        )
+
+    # Sets (suggestions, submissions) are numbered like the workspace files
+
+    def add_set(
+        self,
+        table: str,
+        items: list[tuple[Optional[str], str]],
+        file_index: Optional[int] = None,
+    ) -> int:
+        """Store a new set of (persona id, JSON document) pairs.
+
+        Returns the index of the set (the next available one by default). An
+        empty set keeps its index, like the empty JSON file of the other backend.
+        """
+        if table not in _SET_TABLES:
+            raise ValueError(f"Unknown set table: {table}")
+        with self._transaction() as connection:
+            if file_index is None:
+                (file_index,) = connection.execute(
+                    "SELECT COALESCE(MAX(file_index), 0) + 1 FROM sets WHERE kind = ?",
+                    (table,),
+                ).fetchone()
+            else:
+                connection.execute(
+                    f"DELETE FROM {table} WHERE file_index = ?", (file_index,)
+                )
+            connection.execute(
+                "INSERT OR IGNORE INTO sets (kind, file_index) VALUES (?, ?)",
+                (table, file_index),
+            )
+            connection.executemany(
+                f"INSERT INTO {table} (file_index, position, persona_id, data) VALUES (?, ?, ?, ?)",
+                [
+                    (file_index, position, persona_id, data)
+                    for position, (persona_id, data) in enumerate(items)
+                ],
+            )
+            self._bump_revision(connection, table)
+        return file_index
+
+    def get_set_indexes(self, table: str) -> list[int]:
+        if table not in _SET_TABLES:
+            raise ValueError(f"Unknown set table: {table}")
+        rows = (
+            self._get_connection()
+            .execute(
+                "SELECT file_index FROM sets WHERE kind = ? ORDER BY file_index",
+                (table,),
+            )
+            .fetchall()
+        )
+        return [row[0] for row in rows]
+
+    def read_set(self, table: str, file_index: int) -> Optional[list[str]]:
+        if table not in _SET_TABLES:
+            raise ValueError(f"Unknown set table: {table}")
+        connection = self._get_connection()
+        if not connection.execute(
+            "SELECT 1 FROM sets WHERE kind = ? AND file_index = ?", (table, file_index)
+        ).fetchone():
+            return None
+        rows = connection.execute(
+            f"SELECT data FROM {table} WHERE file_index = ? ORDER BY position",
+            (file_index,),
+        ).fetchall()
+        return [row[0] for row in rows]
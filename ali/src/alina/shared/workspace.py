@@ -1,7 +1,17 @@
+import functools
+import os
 from pathlib import Path
 
+from alina.shared.manifest import FolderManifest
 
+
+@functools.cache
 def get_workspace_folder() -> Path:
+    # An explicit folder takes precedence over the lookup from the current directory
+    workspace_folder = os.getenv("ALINA_WORKSPACE")
+    if workspace_folder:
+        return Path(workspace_folder).expanduser().resolve()
+
     # Iterate until a .git folder is found
     current_path = Path.cwd()
     for parent in [current_path] + list(current_path.parents):
@@ -28,6 +38,9 @@ class Workspace:
     def get_data_jobs_folder(self) -> Path:
         return self.get_data_folder() / "jobs"
 
+    def get_data_pack_file(self, kind: str) -> Path:
+        return self.folder / "packs" / f"{kind}.pack"
+
     def get_submissions_file(self) -> Path:
         return self.folder / "submissions.json"
 
@@ -43,9 +56,30 @@ class Workspace:
     def get_skills_db_file(self) -> Path:
         return self.folder / "skills.json"
 
+    def get_analysis_hashes_file(self) -> Path:
+        return self.folder / "analysis_hashes.json"
+
     def get_manual_intents_db_file(self) -> Path:
         return self.folder / "manual-intents.json"
 
+    def get_store_db_file(self) -> Path:
+        return self.folder / "alina.db"
+
+    def get_llm_cache_file(self) -> Path:
+        return self.folder / "llm_cache.db"
+
+    def get_embeddings_file(self, kind: str) -> Path:
+        return self.folder / "embeddings" / f"{kind}.npy"
+
+    def get_embeddings_index_file(self, kind: str) -> Path:
+        return self.folder / "embeddings" / f"{kind}.json"
+
+    def get_checkpoint_file(self, command: str) -> Path:
+        return self.folder / "checkpoints" / f"{command}.jsonl"
+
+    def get_interview_journal_file(self, command: str, persona_id: int) -> Path:
+        return self.folder / "checkpoints" / command / f"persona_{persona_id:03d}.jsonl"
+
     def get_interview_file(self, persona_id: int) -> Path:
         return self.folder / "interviews" / f"persona_{persona_id:03d}.md"
 
@@ -69,28 +103,27 @@ class Workspace:
     def get_suggestions_folder(self):
         return self.folder / "suggestions"
 
+    def get_suggestion_file(self, index: int) -> Path:
+        return self.get_suggestions_folder() / f"suggestions_{index:03d}.json"
+
+    def get_suggestions_manifest(self) -> FolderManifest:
+        return FolderManifest(self.get_suggestions_folder(), "suggestions")
+
+    def get_suggestion_indexes(self) -> list[int]:
+        return self.get_suggestions_manifest().get_indexes()
+
     def get_next_suggestion_file(self) -> Path:
         folder = self.get_suggestions_folder()
         if not folder.exists():
             folder.mkdir(parents=True, exist_ok=True)
-        existing_files = list(folder.glob("suggestions_*.json"))
-        max_index = max([int(f.stem.split("_")[1]) for f in existing_files] or [0])
+        max_index = self.get_suggestions_manifest().get_max_index()
         return folder / f"suggestions_{max_index + 1:03d}.json"
 
-    def get_in_progress_suggestion_folder(self) -> Path:
-        return self.get_suggestions_folder() / "in_progress"
-
-    def get_in_progress_suggestion_file(self, persona_id: int) -> Path:
-        folder = self.get_in_progress_suggestion_folder()
-        return folder / f"persona_{persona_id:03d}_suggestions.json"
-
     def get_last_suggestion_file(self) -> Path:
-        folder = self.get_suggestions_folder()
-        existing_files = list(folder.glob("suggestions_*.json"))
-        if not existing_files:
+        indexes = self.get_suggestion_indexes()
+        if not indexes:
             raise FileNotFoundError("No suggestion files found.")
-        max_index = max([int(f.stem.split("_")[1]) for f in existing_files])
-        return folder / f"suggestions_{max_index:03d}.json"
+        return self.get_suggestion_file(indexes[-1])
 
     def get_submissions_folder(self) -> Path:
         return self.folder / "submissions"
@@ -98,10 +131,21 @@ class Workspace:
     def get_submission_file(self, index: int) -> Path:
         return self.get_submissions_folder() / f"submission_{index:03d}.json"
 
+    def get_submissions_manifest(self) -> FolderManifest:
+        return FolderManifest(self.get_submissions_folder(), "submission")
+
+    def get_submission_indexes(self) -> list[int]:
+        return self.get_submissions_manifest().get_indexes()
+
     def get_next_submission_file(self) -> Path:
         folder = self.get_submissions_folder()
         if not folder.exists():
             folder.mkdir(parents=True, exist_ok=True)
-        existing_files = list(folder.glob("submission_*.json"))
-        max_index = max([int(f.stem.split("_")[1]) for f in existing_files] or [0])
+        max_index = self.get_submissions_manifest().get_max_index()
         return folder / f"submission_{max_index + 1:03d}.json"
+
+
+@functools.cache
+def get_workspace() -> Workspace:
+    """Return the workspace shared by the whole process."""
+    return Workspace()